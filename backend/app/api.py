@@ -5,17 +5,25 @@ This module provides HTTP endpoints for file upload, job status tracking,
 and file download.
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, redirect
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 import os
 import logging
 
-from app.file_manager import FileManager
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from app.file_manager import FileManager, PDF_MAGIC, new_content_hasher
 from app.job_manager import JobManager
 from app.redis_client import RedisClient, get_redis_client
 from app.tasks import convert_pdf_task
+from app.logging_config import configure_logging
 from app.exceptions import (
     ConversionError,
     FileUploadError,
@@ -24,9 +32,34 @@ from app.exceptions import (
 )
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes and decodes with orjson.
+    
+    Calls that pass stdlib-only options (indent, cls, ...) fall back to
+    the default json-based implementation.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string."""
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(
+            obj, default=self.default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes."""
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
 
 def create_app(config=None):
     """
@@ -40,6 +73,10 @@ def create_app(config=None):
     """
     app = Flask(__name__)
     
+    # orjson is optional; without it Flask's stdlib json provider is kept
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    
     # Load configuration
     if config:
         app.config.from_object(config)
@@ -54,11 +91,19 @@ def create_app(config=None):
     CORS(app, resources={
         r"/api/*": {
             "origins": "*",  # Change to specific origins in production
-            "methods": ["GET", "POST", "OPTIONS"],
+            "methods": ["GET", "POST", "PUT", "OPTIONS"],
             "allow_headers": ["Content-Type"]
         }
     })
     
+    # Compress JSON responses on the polling path (br, else gzip).
+    # Downloads are already-compressed .docx files and stay untouched.
+    app.config.setdefault('COMPRESS_MIMETYPES', ['application/json'])
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_ALGORITHM', ['br', 'gzip'])
+    app.config.setdefault('COMPRESS_STREAMS', False)
+    Compress(app)
+    
     # Set maximum file upload size (50MB)
     app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB in bytes
     
@@ -67,7 +112,7 @@ def create_app(config=None):
     redis_client.initialize(app_config)
     
     # Initialize managers
-    file_manager = FileManager()
+    file_manager = FileManager(s3_bucket=app.config.get('S3_BUCKET'))
     job_manager = JobManager(redis_client.get_client())
     
     # Error handlers
@@ -98,7 +143,7 @@ def create_app(config=None):
     @app.errorhandler(500)
     def internal_server_error(error):
         """Handle 500 Internal Server Error."""
-        logger.error(f"Internal server error: {error}", exc_info=True)
+        logger.error("Internal server error: %s", error, exc_info=True)
         return jsonify({
             "error": "Internal Server Error",
             "message": "An unexpected error occurred"
@@ -119,6 +164,143 @@ def create_app(config=None):
             "service": "PDF to Word Converter API"
         }), 200
     
+    def _validate_pdf_filename(filename: str) -> str:
+        """
+        Validate an uploaded filename and return its secured form.
+        
+        Raises:
+            FileUploadError: If the filename is empty or not a PDF
+        """
+        # Check if filename is empty
+        if not filename:
+            raise FileUploadError("No file selected")
+        
+        # Validate file type (must be PDF)
+        if not filename.lower().endswith('.pdf'):
+            raise FileUploadError("Invalid file type. Only PDF files are accepted")
+        
+        # Secure the filename
+        return secure_filename(filename)
+    
+    def _validate_pdf_header(header: bytes) -> None:
+        """
+        Reject uploads whose content does not start with the PDF header.
+        
+        Raises:
+            FileUploadError: If the magic bytes are missing
+        """
+        if not header.startswith(PDF_MAGIC):
+            raise FileUploadError("Invalid file content. The file is not a PDF")
+    
+    def _create_and_queue_job(filename: str, store_file):
+        """
+        Create a job, store its input file and queue the conversion task.
+        
+        If the stored bytes match an earlier upload whose job has not
+        failed, the new job is discarded and the earlier job is reused.
+        
+        Args:
+            filename: Secured original filename
+            store_file: Callable taking the job_id and returning the stored
+                        path and its content hash
+            
+        Returns:
+            Tuple of (job_id, existing job status or None if newly queued)
+            
+        Raises:
+            FileUploadError: If storing the file fails
+            ConversionError: If creating the job or queueing the task fails
+        """
+        # Create the job first to get a unique job ID
+        try:
+            job_id = job_manager.create_job(filename)
+            logger.info("Created job %s for file %s", job_id, filename, extra={"job_id": job_id})
+        except Exception as e:
+            raise ConversionError(f"Failed to create job: {str(e)}")
+        
+        # Store the uploaded file using the job_id
+        try:
+            file_path, content_hash = store_file(job_id)
+            logger.info("Stored file for job %s at %s", job_id, file_path, extra={"job_id": job_id})
+        except Exception as e:
+            # Clean up job if file storage fails
+            try:
+                job_manager.mark_failed(job_id, f"File storage failed: {str(e)}")
+            except:
+                pass
+            raise FileUploadError(f"Failed to store uploaded file: {str(e)}")
+        
+        # Reuse the job of an identical earlier upload (best effort: a Redis
+        # hiccup here just means converting the file again)
+        try:
+            existing = job_manager.find_job_by_content_hash(content_hash)
+            if existing is not None:
+                file_manager.delete_job_files(job_id)
+                job_manager.delete_job(job_id)
+                logger.info(
+                    "Upload for job %s duplicates job %s", job_id, existing['job_id'],
+                    extra={"job_id": existing['job_id']}
+                )
+                return existing['job_id'], existing
+            
+            job_manager.remember_content_hash(content_hash, job_id)
+        except Exception as e:
+            logger.warning("Duplicate upload check failed for job %s: %s", job_id, e)
+        
+        # Queue the conversion task
+        try:
+            convert_pdf_task.delay(job_id)
+            logger.info("Queued conversion task for job %s", job_id, extra={"job_id": job_id})
+        except Exception as e:
+            # Clean up if task queueing fails
+            job_manager.mark_failed(job_id, f"Task queueing failed: {str(e)}")
+            file_manager.delete_job_files(job_id)
+            raise ConversionError(f"Failed to queue conversion task: {str(e)}")
+        
+        return job_id, None
+    
+    def _upload_accepted(job_id: str, existing=None):
+        """
+        Build the response returned for a successful upload.
+        
+        A new job gets 202 Accepted; a duplicate of an earlier upload gets
+        200 with that job's current status.
+        """
+        if existing is not None:
+            return jsonify({
+                "job_id": job_id,
+                "status": existing['status'],
+                "message": "Identical file already uploaded. Reusing its conversion."
+            }), 200
+        
+        return jsonify({
+            "job_id": job_id,
+            "status": "pending",
+            "message": "File uploaded successfully. Conversion queued."
+        }), 202  # 202 Accepted
+    
+    def _upload_error(error: Exception):
+        """Map an exception raised during upload to a JSON error response."""
+        if isinstance(error, FileUploadError):
+            logger.warning("File upload error: %s", error)
+            return jsonify({
+                "error": "File Upload Error",
+                "message": str(error)
+            }), 400
+        
+        if isinstance(error, ConversionError):
+            logger.error("Conversion error: %s", error)
+            return jsonify({
+                "error": "Conversion Error",
+                "message": str(error)
+            }), 500
+        
+        logger.error("Unexpected error during upload: %s", error, exc_info=True)
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": "An unexpected error occurred during file upload"
+        }), 500
+    
     @app.route('/api/upload', methods=['POST'])
     def upload_file():
         """
@@ -144,74 +326,98 @@ def create_app(config=None):
                 raise FileUploadError("No file provided in request")
             
             file = request.files['file']
+            filename = _validate_pdf_filename(file.filename)
             
-            # Check if filename is empty
-            if file.filename == '':
-                raise FileUploadError("No file selected")
+            # Peek at the header before a job or any file is created
+            _validate_pdf_header(file.stream.read(len(PDF_MAGIC)))
+            file.stream.seek(0)
             
-            # Validate file type (must be PDF)
-            if not file.filename.lower().endswith('.pdf'):
-                raise FileUploadError("Invalid file type. Only PDF files are accepted")
+            def store_and_hash(job_id: str):
+                file_path = file_manager.store_upload(file, job_id)
+                return file_path, file_manager.hash_file(file_path)
             
-            # Secure the filename
-            filename = secure_filename(file.filename)
+            job_id, existing = _create_and_queue_job(filename, store_and_hash)
+            return _upload_accepted(job_id, existing)
             
-            # Create the job first to get a unique job ID
-            try:
-                job_id = job_manager.create_job(filename)
-                logger.info(f"Created job {job_id} for file {filename}")
-            except Exception as e:
-                raise ConversionError(f"Failed to create job: {str(e)}")
+        except Exception as e:
+            return _upload_error(e)
+    
+    @app.route('/api/upload/<filename>', methods=['PUT'])
+    def upload_file_stream(filename):
+        """
+        Upload a PDF file for conversion as a raw request body.
+        
+        The body is copied to disk in 64 KiB chunks straight from the WSGI
+        input stream, so memory use stays constant regardless of PDF size
+        and the file is written once instead of being spooled by the
+        multipart parser first. The multipart endpoint remains available
+        for clients that can only send form data.
+        
+        Args:
+            filename: Original filename of the PDF
             
-            # Store the uploaded file using the job_id
-            try:
-                file_path = file_manager.store_upload(file, job_id)
-                logger.info(f"Stored file for job {job_id} at {file_path}")
-            except Exception as e:
-                # Clean up job if file storage fails
-                try:
-                    job_manager.mark_failed(job_id, f"File storage failed: {str(e)}")
-                except:
-                    pass
-                raise FileUploadError(f"Failed to store uploaded file: {str(e)}")
-            
-            # Queue the conversion task
-            try:
-                convert_pdf_task.delay(job_id)
-                logger.info(f"Queued conversion task for job {job_id}")
-            except Exception as e:
-                # Clean up if task queueing fails
-                job_manager.mark_failed(job_id, f"Task queueing failed: {str(e)}")
+        Returns:
+            JSON response with job_id and status
+            
+        Requirements:
+            - 9.3: Validate file type and size
+            - 9.4: Accept PDF files up to 50MB
+            - 9.5: Return error for invalid file types
+            - 9.6: Return unique job identifier
+            - 13.1: Queue conversion task
+        """
+        content_length = request.content_length
+        if content_length is not None and content_length > app.config['MAX_CONTENT_LENGTH']:
+            raise RequestEntityTooLarge()
+        
+        def stream_to_disk(job_id: str, first_chunk: bytes):
+            # Hash each chunk on its way to disk for duplicate detection
+            hasher = new_content_hasher()
+            with file_manager.open_upload_stream(job_id) as out:
+                out.write(first_chunk)
+                hasher.update(first_chunk)
+                while chunk := request.stream.read(file_manager.UPLOAD_CHUNK_SIZE):
+                    out.write(chunk)
+                    hasher.update(chunk)
+                file_path = out.name
+            
+            # Catch truncated uploads before a worker picks them up
+            if not file_manager.has_pdf_trailer(file_path):
                 file_manager.delete_job_files(job_id)
-                raise ConversionError(f"Failed to queue conversion task: {str(e)}")
+                raise FileUploadError("Uploaded PDF is truncated (missing %%EOF trailer)")
             
-            # Return job response
-            return jsonify({
-                "job_id": job_id,
-                "status": "pending",
-                "message": "File uploaded successfully. Conversion queued."
-            }), 202  # 202 Accepted
+            return file_path, hasher.hexdigest()
+        
+        try:
+            if not content_length:
+                raise FileUploadError("No file provided in request")
             
-        except FileUploadError as e:
-            logger.warning(f"File upload error: {e}")
-            return jsonify({
-                "error": "File Upload Error",
-                "message": str(e)
-            }), 400
+            filename = _validate_pdf_filename(filename)
             
-        except ConversionError as e:
-            logger.error(f"Conversion error: {e}")
-            return jsonify({
-                "error": "Conversion Error",
-                "message": str(e)
-            }), 500
+            # Validate the magic bytes before a job or any file is created
+            first_chunk = request.stream.read(file_manager.UPLOAD_CHUNK_SIZE)
+            _validate_pdf_header(first_chunk)
+            
+            job_id, existing = _create_and_queue_job(
+                filename,
+                lambda job_id: stream_to_disk(job_id, first_chunk)
+            )
+            return _upload_accepted(job_id, existing)
             
         except Exception as e:
-            logger.error(f"Unexpected error during upload: {e}", exc_info=True)
-            return jsonify({
-                "error": "Internal Server Error",
-                "message": "An unexpected error occurred during file upload"
-            }), 500
+            return _upload_error(e)
+    
+    def _etag_matches(etag):
+        """
+        Check If-None-Match against a job ETag.
+        
+        Flask-Compress appends ":<algorithm>" to the ETag of compressed
+        responses, so tags are compared without that suffix.
+        """
+        return any(
+            tag.split(':', 1)[0] == etag
+            for tag in request.if_none_match.as_set(include_weak=True)
+        )
     
     @app.route('/api/jobs/<job_id>', methods=['GET'])
     def get_job_status(job_id):
@@ -222,7 +428,8 @@ def create_app(config=None):
             job_id: Unique job identifier
             
         Returns:
-            JSON response with job status and progress information
+            JSON response with job status and progress information, or an
+            empty 304 response if the client's ETag is still current
             
         Requirements:
             - 11.1: Return current progress information
@@ -233,22 +440,44 @@ def create_app(config=None):
             # Get job status from JobManager
             status = job_manager.get_status(job_id)
             
-            return jsonify(status), 200
+            version = status.get('version')
+            if version is None:
+                return jsonify(status), 200
+            
+            # Polls between updates revalidate against the job version and
+            # skip serializing the body entirely
+            etag = f"{job_id}-{version}"
+            if _etag_matches(etag):
+                response = app.response_class(status=304)
+            else:
+                response = jsonify(status)
+            
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache, must-revalidate'
+            return response
             
         except JobNotFoundError as e:
-            logger.warning(f"Job not found: {job_id}")
+            logger.warning("Job not found: %s", job_id, extra={"job_id": job_id})
             return jsonify({
                 "error": "Job Not Found",
                 "message": f"Job {job_id} does not exist"
             }), 404
             
         except Exception as e:
-            logger.error(f"Error retrieving job status: {e}", exc_info=True)
+            logger.error("Error retrieving job status: %s", e, exc_info=True)
             return jsonify({
                 "error": "Internal Server Error",
                 "message": "Failed to retrieve job status"
             }), 500
     
+    def _download_name(job_id):
+        """Build the .docx filename offered to the browser for a job."""
+        original_filename = file_manager.get_original_filename(job_id)
+        if original_filename:
+            # Replace .pdf extension with .docx
+            return original_filename.rsplit('.', 1)[0] + '.docx'
+        return f"converted_{job_id}.docx"
+    
     @app.route('/api/download/<job_id>', methods=['GET'])
     def download_file(job_id):
         """
@@ -283,6 +512,15 @@ def create_app(config=None):
                     "message": f"Job is {status['status']}. File is not ready for download."
                 }), 400
             
+            # Let the object store serve the bytes via a short-lived signed URL
+            if app.config.get('S3_BUCKET'):
+                url = file_manager.get_download_url(
+                    job_id,
+                    _download_name(job_id),
+                    app.config.get('S3_PRESIGNED_URL_EXPIRES', 300)
+                )
+                return redirect(url, code=302)
+            
             # Get output file path
             output_path = file_manager.get_output_path(job_id)
             
@@ -292,24 +530,30 @@ def create_app(config=None):
                     "message": "Converted file not found or has been deleted"
                 }), 404
             
-            # Get original filename
-            original_filename = file_manager.get_original_filename(job_id)
-            if original_filename:
-                # Replace .pdf extension with .docx
-                download_name = original_filename.rsplit('.', 1)[0] + '.docx'
-            else:
-                download_name = f"converted_{job_id}.docx"
+            download_name = _download_name(job_id)
+            
+            # Let nginx stream the file from disk via sendfile(2)
+            accel_prefix = app.config.get('X_ACCEL_REDIRECT_PREFIX')
+            if accel_prefix:
+                response = app.response_class(mimetype=DOCX_MIMETYPE)
+                response.headers['X-Accel-Redirect'] = (
+                    f"{accel_prefix.rstrip('/')}/{job_id}/{os.path.basename(output_path)}"
+                )
+                response.headers.set(
+                    'Content-Disposition', 'attachment', filename=download_name
+                )
+                return response
             
-            # Send file
+            # Send file (honours USE_X_SENDFILE, otherwise uses wsgi.file_wrapper)
             return send_file(
                 output_path,
-                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+                mimetype=DOCX_MIMETYPE,
                 as_attachment=True,
                 download_name=download_name
             )
             
         except Exception as e:
-            logger.error(f"Error downloading file: {e}", exc_info=True)
+            logger.error("Error downloading file: %s", e, exc_info=True)
             return jsonify({
                 "error": "Internal Server Error",
                 "message": "Failed to download file"
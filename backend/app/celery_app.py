@@ -7,9 +7,16 @@ as the message broker and result backend.
 
 from celery import Celery
 from celery.schedules import crontab
+from kombu import Queue
 from app.config import Config, get_config
 
 
+# Queue names. Conversions get their own queue so dedicated workers can be
+# scaled independently (``-Q convert``); plain workers consume both.
+DEFAULT_QUEUE = 'celery'
+CONVERT_QUEUE = 'convert'
+
+
 def create_celery_app(config: Config = None) -> Celery:
     """
     Create and configure a Celery application instance.
@@ -26,19 +33,19 @@ def create_celery_app(config: Config = None) -> Celery:
     # Create Celery instance
     celery_app = Celery('pdf_converter')
     
-    # Get Redis URL with password support
-    redis_url = config.get_redis_url()
-    
     # Configure Celery with Redis broker and result backend
     celery_app.conf.update(
         # Broker and Result Backend
-        broker_url=redis_url,
-        result_backend=redis_url,
+        broker_url=config.CELERY_BROKER_URL,
+        result_backend=config.CELERY_RESULT_BACKEND,
         
         # Task Serialization
-        task_serializer='json',
-        accept_content=['json'],
-        result_serializer='json',
+        # msgpack is faster and smaller than JSON on the wire; JSON stays
+        # accepted so messages queued by older producers still run
+        task_serializer='msgpack',
+        accept_content=['msgpack', 'json'],
+        result_serializer='msgpack',
+        result_accept_content=['msgpack', 'json'],
         
         # Result Expiration
         result_expires=86400,  # 24 hours in seconds
@@ -48,11 +55,29 @@ def create_celery_app(config: Config = None) -> Celery:
         task_time_limit=3600,  # 1 hour max per task
         task_soft_time_limit=3300,  # 55 minutes soft limit
         
+        # Acknowledge after the task finishes so a crashed worker's job is
+        # redelivered instead of silently lost
+        task_acks_late=True,
+        task_reject_on_worker_lost=True,
+        
+        # Task Routing
+        task_default_queue=DEFAULT_QUEUE,
+        task_queues=(Queue(DEFAULT_QUEUE), Queue(CONVERT_QUEUE)),
+        task_routes={
+            'app.tasks.convert_pdf_task': {'queue': CONVERT_QUEUE},
+        },
+        
         # Connection Settings
         broker_connection_retry_on_startup=True,
         broker_connection_retry=True,
         broker_connection_max_retries=10,
         
+        # With late acks, unacknowledged messages are redelivered after the
+        # visibility timeout; keep it well above task_time_limit
+        broker_transport_options={
+            'visibility_timeout': 7200,
+        },
+        
         # Result Backend Settings
         result_backend_transport_options={
             'master_name': 'mymaster',
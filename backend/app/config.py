@@ -24,30 +24,68 @@ class Config:
     REDIS_SOCKET_CONNECT_TIMEOUT: int = int(os.getenv('REDIS_SOCKET_CONNECT_TIMEOUT', '5'))
     REDIS_SOCKET_KEEPALIVE: bool = os.getenv('REDIS_SOCKET_KEEPALIVE', 'true').lower() == 'true'
     REDIS_RETRY_ON_TIMEOUT: bool = os.getenv('REDIS_RETRY_ON_TIMEOUT', 'true').lower() == 'true'
+    REDIS_HEALTH_CHECK_INTERVAL: int = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', '30'))
+    REDIS_KEEPALIVE_IDLE: int = int(os.getenv('REDIS_KEEPALIVE_IDLE', '60'))
+    # Entries kept in the client-side cache (RESP3 server-assisted
+    # invalidation); 0 disables it
+    REDIS_CLIENT_CACHE_SIZE: int = int(os.getenv('REDIS_CLIENT_CACHE_SIZE', '0'))
     
     # Celery Configuration
+    # Plain strings set once per class by _init_celery_urls (below and in
+    # __init_subclass__), so from_object and instances see real values.
+    # CELERY_BROKER_URL / CELERY_RESULT_BACKEND env vars override the
+    # Redis URL.
+    CELERY_BROKER_URL: str
+    CELERY_RESULT_BACKEND: str
+    
     @classmethod
     def get_celery_broker_url(cls) -> str:
         """Get Celery broker URL with password support."""
-        return cls.get_redis_url()
+        return cls.CELERY_BROKER_URL
     
     @classmethod
     def get_celery_result_backend(cls) -> str:
         """Get Celery result backend URL with password support."""
-        return cls.get_redis_url()
-    
-    CELERY_BROKER_URL: str = property(lambda self: self.get_celery_broker_url())
-    CELERY_RESULT_BACKEND: str = property(lambda self: self.get_celery_result_backend())
+        return cls.CELERY_RESULT_BACKEND
     
     # File Storage Configuration
     UPLOAD_FOLDER: str = os.getenv('UPLOAD_FOLDER', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'uploads')))
     MAX_FILE_SIZE: int = int(os.getenv('MAX_FILE_SIZE', str(50 * 1024 * 1024)))  # 50MB default
     FILE_CLEANUP_AGE_HOURS: int = int(os.getenv('FILE_CLEANUP_AGE_HOURS', '24'))
+    # Delete batches of expired job directories with the native rm -rf /
+    # rd /s /q instead of shutil.rmtree (set to false to force the
+    # pure-Python path)
+    FAST_RM: bool = os.getenv('FAST_RM', 'true').lower() == 'true'
+    
+    # Download Offloading
+    # USE_X_SENDFILE makes send_file emit an X-Sendfile header (Apache/lighttpd).
+    # X_ACCEL_REDIRECT_PREFIX is the nginx internal location aliased to
+    # UPLOAD_FOLDER; when set, downloads are handed to nginx's sendfile path.
+    USE_X_SENDFILE: bool = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+    X_ACCEL_REDIRECT_PREFIX: Optional[str] = os.getenv('X_ACCEL_REDIRECT_PREFIX', None)
+    
+    # Object Storage (S3/MinIO/GCS interoperability)
+    # When S3_BUCKET is set, outputs are uploaded after conversion and
+    # downloads redirect to a short-lived presigned URL (requires boto3).
+    S3_BUCKET: Optional[str] = os.getenv('S3_BUCKET', None)
+    S3_ENDPOINT_URL: Optional[str] = os.getenv('S3_ENDPOINT_URL', None)
+    S3_REGION: Optional[str] = os.getenv('S3_REGION', None)
+    S3_PRESIGNED_URL_EXPIRES: int = int(os.getenv('S3_PRESIGNED_URL_EXPIRES', '300'))
+    
+    # Logging Configuration
+    # LOG_FORMAT=json needs python-json-logger
+    LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT: str = os.getenv('LOG_FORMAT', 'text')
     
     # OCR Engine Configuration
     # Options: 'tesseract' (fast, lower accuracy) or 'surya' (slower, higher accuracy)
     OCR_ENGINE: str = os.getenv('OCR_ENGINE', 'tesseract').lower()
     
+    # Layout Analysis Configuration
+    # 'anchor' groups words by distance to each line's first word;
+    # 'cluster' links nearby words (tolerates skewed scans)
+    LINE_GROUPING: str = os.getenv('LINE_GROUPING', 'anchor').lower()
+    
     @classmethod
     def validate_ocr_engine(cls) -> str:
         """
@@ -72,12 +110,34 @@ class Config:
         """
         Get the Redis connection URL.
         
+        The URL is built once per class and cached on it.
+        
         Returns:
             str: Redis connection URL with optional password
         """
-        if cls.REDIS_PASSWORD:
-            return f'redis://:{cls.REDIS_PASSWORD}@{cls.REDIS_HOST}:{cls.REDIS_PORT}/{cls.REDIS_DB}'
-        return f'redis://{cls.REDIS_HOST}:{cls.REDIS_PORT}/{cls.REDIS_DB}'
+        url = cls.__dict__.get('_redis_url')
+        if url is None:
+            if cls.REDIS_PASSWORD:
+                url = f'redis://:{cls.REDIS_PASSWORD}@{cls.REDIS_HOST}:{cls.REDIS_PORT}/{cls.REDIS_DB}'
+            else:
+                url = f'redis://{cls.REDIS_HOST}:{cls.REDIS_PORT}/{cls.REDIS_DB}'
+            cls._redis_url = url
+        return url
+    
+    @classmethod
+    def _init_celery_urls(cls) -> None:
+        """Compute the Celery broker and result backend URLs for this class."""
+        redis_url = cls.get_redis_url()
+        cls.CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL') or redis_url
+        cls.CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND') or redis_url
+    
+    def __init_subclass__(cls, **kwargs):
+        """Give each config subclass URLs built from its own Redis settings."""
+        super().__init_subclass__(**kwargs)
+        cls._init_celery_urls()
+
+
+Config._init_celery_urls()
 
 
 class DevelopmentConfig(Config):
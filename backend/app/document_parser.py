@@ -6,8 +6,10 @@ suitable for OCR processing.
 """
 
 import os
-import io
-from typing import List
+import stat
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
 import fitz  # PyMuPDF
 from PIL import Image
 
@@ -15,6 +17,137 @@ from .models import PageImage
 from .exceptions import PDFValidationError, FileIOError
 
 
+# Colorspaces for rendered pages (never with alpha): RGB by default, one
+# gray channel when the pages are only rendered for OCR
+_CSRGB = fitz.csRGB
+_CSGRAY = fitz.csGRAY
+
+# Zoom matrices keyed by DPI; fitz.Matrix values are reused, never mutated
+_MATRIX_CACHE: Dict[int, fitz.Matrix] = {}
+
+
+def _zoom_matrix(dpi: int) -> fitz.Matrix:
+    """Return the cached render matrix for a DPI (PyMuPDF's base is 72 DPI)."""
+    mat = _MATRIX_CACHE.get(dpi)
+    if mat is None:
+        zoom = dpi / 72.0
+        mat = _MATRIX_CACHE.setdefault(dpi, fitz.Matrix(zoom, zoom))
+    return mat
+
+
+def _choose_page_dpi(page: "fitz.Page", dpi: int) -> int:
+    """
+    Pick a rendering resolution for a page from its text-layer density.
+    
+    Pages dense with real text render legibly for OCR at a lower DPI, so
+    they drop to DocumentParser.TEXT_DENSE_DPI; everything else (scans,
+    sparse or graphic pages) keeps the configured DPI.
+    
+    Args:
+        page: PyMuPDF page to inspect
+        dpi: Configured rendering resolution
+        
+    Returns:
+        int: Resolution to render this page at
+    """
+    area = max(page.rect.width * page.rect.height, 1)
+    text_density = len(page.get_text()) / area
+    
+    if text_density >= DocumentParser.TEXT_DENSE_THRESHOLD:
+        return min(dpi, DocumentParser.TEXT_DENSE_DPI)
+    
+    return dpi
+
+
+def _iter_page_pixmaps(
+    doc: "fitz.Document",
+    pdf_path: str,
+    start: int,
+    stop: int,
+    dpi: int,
+    adaptive_dpi: bool = False,
+    grayscale: bool = False
+) -> Iterator[Tuple[int, int, "fitz.Pixmap"]]:
+    """
+    Render pages [start, stop) of an open document one pixmap at a time.
+    
+    Args:
+        doc: Open PyMuPDF document
+        pdf_path: Path to the PDF file (for error details)
+        start: First page index to render (0-indexed, inclusive)
+        stop: Last page index to render (0-indexed, exclusive)
+        dpi: Rendering resolution
+        adaptive_dpi: Lower the resolution of text-dense pages
+        grayscale: Render one gray channel instead of RGB
+        
+    Yields:
+        (page_index, page_dpi, pixmap) for each page, in page order
+        
+    Raises:
+        PDFValidationError: If a page fails to render
+    """
+    mat = _zoom_matrix(dpi)
+    colorspace = _CSGRAY if grayscale else _CSRGB
+    
+    for page_num in range(start, stop):
+        try:
+            # Get page
+            page = doc[page_num]
+            
+            page_dpi = dpi
+            page_mat = mat
+            if adaptive_dpi:
+                page_dpi = _choose_page_dpi(page, dpi)
+                if page_dpi != dpi:
+                    page_mat = _zoom_matrix(page_dpi)
+            
+            # Render page to a 3-byte-per-pixel RGB (or 1-byte gray)
+            # pixmap at the chosen DPI; never allocate an alpha plane
+            pix = page.get_pixmap(matrix=page_mat, colorspace=colorspace, alpha=False)
+            
+        except Exception as e:
+            raise PDFValidationError(
+                f"Failed to extract page {page_num + 1}: {str(e)}",
+                details={
+                    "path": pdf_path,
+                    "page_number": page_num + 1,
+                    "error": str(e)
+                }
+            )
+        
+        yield page_num, page_dpi, pix
+
+
+def _page_from_pixmap(page_num: int, page_dpi: int, pix: "fitz.Pixmap", mode: str) -> PageImage:
+    """
+    Wrap a rendered pixmap as a PageImage.
+    
+    The raw samples are wrapped directly instead of encoding and
+    re-decoding a PPM. pix.samples is a bytes copy owned by the image, so
+    the pixmap can be released right away.
+    
+    Args:
+        page_num: Page index (0-indexed)
+        page_dpi: Resolution the page was rendered at
+        pix: Rendered pixmap
+        mode: PIL mode matching the pixmap ("L" or "RGB")
+        
+    Returns:
+        PageImage for the page (1-indexed page number)
+    """
+    image = Image.frombuffer(
+        mode, (pix.width, pix.height), pix.samples,
+        "raw", mode, pix.stride, 1
+    )
+    return PageImage(
+        page_number=page_num + 1,  # 1-indexed for user-facing
+        image=image,
+        width=pix.width,
+        height=pix.height,
+        dpi=page_dpi
+    )
+
+
 class DocumentParser:
     """
     Handles PDF file parsing and page extraction.
@@ -26,58 +159,89 @@ class DocumentParser:
     - Handling PDF-related errors
     """
     
-    def __init__(self, dpi: int = 300):
+    # Adaptive DPI: pages with at least this many text-layer characters per
+    # square point (roughly a third of a full page of body text) are
+    # rendered at TEXT_DENSE_DPI, which is ample for Tesseract.
+    TEXT_DENSE_THRESHOLD = 0.002
+    TEXT_DENSE_DPI = 200
+    
+    # Smallest file that could hold a header, one object and a trailer
+    MIN_PDF_SIZE = 32
+    
+    def __init__(
+        self,
+        dpi: int = 300,
+        adaptive_dpi: bool = False,
+        grayscale: bool = False
+    ):
         """
         Initialize the DocumentParser.
         
         Args:
             dpi: Resolution for page extraction (default: 300 DPI)
+            adaptive_dpi: Render text-dense pages at TEXT_DENSE_DPI instead
+                         of dpi; each PageImage records the DPI it used
+            grayscale: Render single-channel 'L' images instead of RGB (a
+                       third of the memory; enough for OCR)
         """
         self.dpi = dpi
+        self.adaptive_dpi = adaptive_dpi
+        self.grayscale = grayscale
     
-    def get_page_count(self, pdf_path: str) -> int:
+    def _validate_pdf_file(self, pdf_path: str) -> None:
         """
-        Get the number of pages in a PDF file.
+        Check that a path is a regular file large enough to be a PDF.
+        
+        Uses a single stat(2) call instead of separate exists/isfile checks.
         
         Args:
             pdf_path: Path to the PDF file
             
-        Returns:
-            Number of pages in the PDF
-            
         Raises:
-            FileIOError: If the file doesn't exist or cannot be accessed
-            PDFValidationError: If the file is not a valid PDF or is corrupted
+            FileIOError: If the file doesn't exist or is not a regular file
+            PDFValidationError: If the file is too small to be a PDF
         """
-        # Validate file exists
-        if not os.path.exists(pdf_path):
+        try:
+            st = os.stat(pdf_path)
+        except (OSError, ValueError):
             raise FileIOError(
                 f"PDF file not found: {pdf_path}",
                 details={"path": pdf_path}
             )
         
-        # Validate file is readable
-        if not os.path.isfile(pdf_path):
+        if not stat.S_ISREG(st.st_mode):
             raise FileIOError(
                 f"Path is not a file: {pdf_path}",
                 details={"path": pdf_path}
             )
         
-        try:
-            # Open PDF and get page count
-            doc = fitz.open(pdf_path)
-            page_count = len(doc)
-            doc.close()
-            
-            # Validate PDF is not empty
-            if page_count == 0:
-                raise PDFValidationError(
-                    "PDF file contains no pages",
-                    details={"path": pdf_path}
-                )
+        if st.st_size < self.MIN_PDF_SIZE:
+            raise PDFValidationError(
+                f"Invalid or corrupted PDF file: only {st.st_size} bytes",
+                details={"path": pdf_path, "size": st.st_size}
+            )
+    
+    def open_document(self, pdf_path: str) -> fitz.Document:
+        """
+        Validate and open a PDF, for callers that read it more than once.
+        
+        The caller owns the returned document and must close it.
+        
+        Args:
+            pdf_path: Path to the PDF file
             
-            return page_count
+        Returns:
+            Open PyMuPDF document with at least one page
             
+        Raises:
+            FileIOError: If the file doesn't exist or cannot be accessed
+            PDFValidationError: If the file is not a valid PDF, is
+                                corrupted or contains no pages
+        """
+        self._validate_pdf_file(pdf_path)
+        
+        try:
+            doc = fitz.open(pdf_path)
         except fitz.FileDataError as e:
             raise PDFValidationError(
                 f"Invalid or corrupted PDF file: {str(e)}",
@@ -88,6 +252,36 @@ class DocumentParser:
                 f"Failed to read PDF file: {str(e)}",
                 details={"path": pdf_path, "error": str(e)}
             )
+        
+        # Validate PDF is not empty
+        if len(doc) == 0:
+            doc.close()
+            raise PDFValidationError(
+                "PDF file contains no pages",
+                details={"path": pdf_path}
+            )
+        
+        return doc
+    
+    def get_page_count(self, pdf_path: str) -> int:
+        """
+        Get the number of pages in a PDF file.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Number of pages in the PDF
+            
+        Raises:
+            FileIOError: If the file doesn't exist or cannot be accessed
+            PDFValidationError: If the file is not a valid PDF or is corrupted
+        """
+        doc = self.open_document(pdf_path)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
     
     def extract_pages(self, pdf_path: str) -> List[PageImage]:
         """
@@ -107,80 +301,36 @@ class DocumentParser:
             FileIOError: If the file doesn't exist or cannot be accessed
             PDFValidationError: If the file is not a valid PDF or is corrupted
         """
-        # Validate file exists
-        if not os.path.exists(pdf_path):
-            raise FileIOError(
-                f"PDF file not found: {pdf_path}",
-                details={"path": pdf_path}
-            )
-        
-        # Validate file is readable
-        if not os.path.isfile(pdf_path):
-            raise FileIOError(
-                f"Path is not a file: {pdf_path}",
-                details={"path": pdf_path}
-            )
+        self._validate_pdf_file(pdf_path)
         
         try:
-            # Open PDF document
             doc = fitz.open(pdf_path)
             
-            # Validate PDF is not empty
-            if len(doc) == 0:
-                doc.close()
-                raise PDFValidationError(
-                    "PDF file contains no pages",
-                    details={"path": pdf_path}
-                )
-            
-            pages = []
-            
-            # Calculate zoom factor for desired DPI
-            # PyMuPDF default is 72 DPI, so zoom = target_dpi / 72
-            zoom = self.dpi / 72.0
-            mat = fitz.Matrix(zoom, zoom)
-            
-            # Extract each page in order
-            for page_num in range(len(doc)):
-                try:
-                    # Get page
-                    page = doc[page_num]
-                    
-                    # Render page to pixmap at specified DPI
-                    pix = page.get_pixmap(matrix=mat)
-                    
-                    # Convert pixmap to PIL Image
-                    # PyMuPDF pixmap is in RGB format
-                    img_data = pix.tobytes("ppm")
-                    image = Image.open(io.BytesIO(img_data))
-                    
-                    # Create PageImage object
-                    page_image = PageImage(
-                        page_number=page_num + 1,  # 1-indexed for user-facing
-                        image=image,
-                        width=pix.width,
-                        height=pix.height,
-                        dpi=self.dpi
-                    )
-                    
-                    pages.append(page_image)
-                    
-                except Exception as e:
-                    # Close document before re-raising
-                    doc.close()
+            try:
+                page_count = len(doc)
+                
+                # Validate PDF is not empty
+                if page_count == 0:
                     raise PDFValidationError(
-                        f"Failed to extract page {page_num + 1}: {str(e)}",
-                        details={
-                            "path": pdf_path,
-                            "page_number": page_num + 1,
-                            "error": str(e)
-                        }
+                        "PDF file contains no pages",
+                        details={"path": pdf_path}
                     )
-            
-            # Close document
-            doc.close()
-            
-            return pages
+                
+                mode = "L" if self.grayscale else "RGB"
+                pages = []
+                
+                for page_num, page_dpi, pix in _iter_page_pixmaps(
+                    doc, pdf_path, 0, page_count, self.dpi, self.adaptive_dpi, self.grayscale
+                ):
+                    pages.append(_page_from_pixmap(page_num, page_dpi, pix, mode))
+                    
+                    # Free the C-level pixmap before rendering the next page
+                    pix = None
+                
+                return pages
+                
+            finally:
+                doc.close()
             
         except fitz.FileDataError as e:
             raise PDFValidationError(
@@ -195,3 +345,69 @@ class DocumentParser:
                 f"Failed to read PDF file: {str(e)}",
                 details={"path": pdf_path, "error": str(e)}
             )
+    
+    def iter_pages(
+        self,
+        pdf_path: str,
+        prefetch: int = 2,
+        doc: Optional[fitz.Document] = None
+    ) -> Iterator[PageImage]:
+        """
+        Render a PDF's pages one at a time on a background thread.
+        
+        Unlike extract_pages, each page is yielded as soon as it is
+        rendered, so the caller can work on one page while the next ones
+        render. At most prefetch pages are rendered ahead of the caller,
+        which bounds the memory held by finished pages.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            prefetch: Number of pages to render ahead of the caller
+            doc: Document already opened with open_document, rendered from
+                 instead of opening pdf_path again and left open; the
+                 caller must not use it until the iterator is closed
+            
+        Yields:
+            PageImage objects, one per page in order
+            
+        Raises:
+            FileIOError: If the file doesn't exist or cannot be accessed
+            PDFValidationError: If the file is not a valid PDF, is
+                                corrupted, or a page fails to render
+        """
+        owns_doc = doc is None
+        if owns_doc:
+            doc = self.open_document(pdf_path)
+        
+        page_count = len(doc)
+        
+        mode = "L" if self.grayscale else "RGB"
+        pixmaps = _iter_page_pixmaps(
+            doc, pdf_path, 0, page_count, self.dpi, self.adaptive_dpi, self.grayscale
+        )
+        
+        def render_next() -> PageImage:
+            return _page_from_pixmap(*next(pixmaps), mode)
+        
+        # One thread owns the document; PyMuPDF documents aren't thread-safe
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='render')
+        pending: Deque[Future] = deque()
+        try:
+            submitted = 0
+            while submitted < min(max(prefetch, 1), page_count):
+                pending.append(executor.submit(render_next))
+                submitted += 1
+            
+            while pending:
+                page = pending.popleft().result()
+                if submitted < page_count:
+                    pending.append(executor.submit(render_next))
+                    submitted += 1
+                yield page
+        finally:
+            # Stop rendering before the document is closed
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            if owns_doc:
+                doc.close()
@@ -20,6 +20,10 @@ class ConversionError(Exception):
         super().__init__(message)
         self.message = message
         self.details = details or {}
+    
+    def __reduce__(self):
+        """Keep details when the error is pickled across process boundaries."""
+        return (self.__class__, (self.message, self.details))
 
 
 class PDFValidationError(ConversionError):
@@ -5,12 +5,19 @@ This module manages the file system operations for uploaded PDFs and converted
 Word documents, organizing them by job ID and providing cleanup functionality.
 """
 
+import errno
+import hashlib
+import math
 import os
 import re
 import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
@@ -18,6 +25,78 @@ from .config import Config
 from .exceptions import FileIOError, JobNotFoundError
 
 
+# Every PDF starts with this header and ends with an %%EOF marker
+PDF_MAGIC = b"%PDF-"
+PDF_EOF_MARKER = b"%%EOF"
+
+# Characters stripped from filenames after werkzeug's secure_filename
+_UNSAFE_CHARS_RE = re.compile(r'[^\w\s\-.]')
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+@lru_cache(maxsize=1024)
+def _sanitize(filename: str) -> str:
+    """
+    Sanitize a filename for use on disk.
+    
+    Pure and memoized, since the same names are uploaded again and again.
+    Uses werkzeug's secure_filename for basic sanitization, strips any
+    remaining problematic characters, and never returns an empty name.
+    """
+    return _UNSAFE_CHARS_RE.sub('', secure_filename(filename)) or "file"
+
+
+def new_content_hasher() -> "hashlib._Hash":
+    """
+    Create the hasher used to fingerprint uploaded PDFs for deduplication.
+    
+    BLAKE2b (128-bit digest) ships with hashlib and runs well above disk
+    write speed, so hashing while an upload streams in is effectively free.
+    """
+    return hashlib.blake2b(digest_size=16)
+
+
+def _fast_rmtree(*paths: Path) -> None:
+    """
+    Recursively delete a batch of directories, preferring the native tool.
+    
+    One ``rm -rf`` (or ``rd /s /q`` on Windows) process removes every path
+    with no per-entry Python overhead; starting it only pays off for a
+    batch, so single directories should use shutil.rmtree directly. If
+    Config.FAST_RM is off, no native tool exists, or it fails, the paths
+    go through shutil.rmtree instead. ``rd`` can exit with 0 without
+    removing everything, so any path still there afterwards is removed
+    that way too.
+    
+    Args:
+        *paths: Directories to delete
+    """
+    if not paths:
+        return
+    
+    if Config.FAST_RM:
+        if os.name == "posix":
+            cmd = ["rm", "-rf", "--", *map(str, paths)]
+        elif os.name == "nt":
+            cmd = ["cmd", "/c", "rd", "/s", "/q", *map(str, paths)]
+        else:
+            cmd = None
+        
+        if cmd is not None:
+            try:
+                subprocess.run(
+                    cmd, check=True,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+            except (OSError, subprocess.CalledProcessError):
+                pass  # Fall back to the portable path below
+    
+    for path in paths:
+        if os.path.lexists(path):
+            shutil.rmtree(path)
+
+
 class FileManager:
     """
     Manages file storage and retrieval for conversion jobs.
@@ -25,21 +104,59 @@ class FileManager:
     Organizes files in a directory structure:
         uploads/{job_id}/input.pdf
         uploads/{job_id}/output.docx
+    
+    When an S3 bucket is configured, outputs are also uploaded under
+    ``{job_id}/output.docx`` so downloads can be served by the object store.
     """
     
-    def __init__(self, upload_folder: str = None):
+    # Names of the files kept in each job directory
+    INPUT_FILENAME = "input.pdf"
+    OUTPUT_FILENAME = "output.docx"
+    
+    # Existing job files are remembered this long by get_input_path /
+    # get_output_path; the cache is reset once it holds this many entries
+    PATH_CACHE_TTL_SECONDS = 1.0
+    PATH_CACHE_MAX_ENTRIES = 1024
+    
+    # Missing outputs are remembered this long by get_original_filename only;
+    # get_output_path must see a freshly written output immediately
+    MISSING_OUTPUT_TTL_SECONDS = 1.0
+    
+    # Chunk size for streaming request bodies straight to disk (64 KiB)
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+    
+    # Buffer for copying multipart uploads to disk (1 MiB)
+    COPY_BUFFER_SIZE = 1024 * 1024
+    
+    # Bytes scanned from the end of a stored PDF for the %%EOF marker
+    PDF_TRAILER_SCAN_BYTES = 1024
+    
+    # Expired job directories removed per rm invocation (keeps argv short)
+    CLEANUP_BATCH_SIZE = 256
+    
+    # Concurrent deletion batches during cleanup (I/O bound, not CPU bound)
+    CLEANUP_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+    
+    def __init__(self, upload_folder: str = None, s3_bucket: str = None):
         """
         Initialize FileManager.
         
         Args:
             upload_folder: Base directory for file storage (defaults to Config.UPLOAD_FOLDER)
+            s3_bucket: Bucket for converted outputs (defaults to Config.S3_BUCKET;
+                       local-only storage when unset)
         """
         self.upload_folder = upload_folder or Config.UPLOAD_FOLDER
+        self._upload_path = Path(self.upload_folder).absolute()
+        self._path_cache: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self._missing_outputs: Dict[str, float] = {}
+        self.s3_bucket = s3_bucket or Config.S3_BUCKET
+        self._s3_client = None
         self._ensure_upload_folder_exists()
     
     def _ensure_upload_folder_exists(self) -> None:
         """Create the upload folder if it doesn't exist."""
-        Path(self.upload_folder).mkdir(parents=True, exist_ok=True)
+        self._upload_path.mkdir(parents=True, exist_ok=True)
     
     def _sanitize_filename(self, filename: str) -> str:
         """
@@ -51,17 +168,7 @@ class FileManager:
         Returns:
             str: Sanitized filename safe for file system operations
         """
-        # Use werkzeug's secure_filename for basic sanitization
-        safe_name = secure_filename(filename)
-        
-        # Additional sanitization: remove any remaining problematic characters
-        safe_name = re.sub(r'[^\w\s\-\.]', '', safe_name)
-        
-        # Ensure filename is not empty after sanitization
-        if not safe_name:
-            safe_name = "file"
-        
-        return safe_name
+        return _sanitize(filename)
     
     def _get_job_directory(self, job_id: str) -> Path:
         """
@@ -73,7 +180,7 @@ class FileManager:
         Returns:
             Path: Directory path for the job
         """
-        return Path(self.upload_folder) / job_id
+        return self._upload_path / job_id
     
     def store_upload(self, file: FileStorage, job_id: str) -> str:
         """
@@ -95,8 +202,10 @@ class FileManager:
             job_dir.mkdir(parents=True, exist_ok=True)
             
             # Store file as input.pdf
-            file_path = job_dir / "input.pdf"
-            file.save(str(file_path))
+            file_path = job_dir / self.INPUT_FILENAME
+            with open(file_path, 'wb', buffering=0) as out:
+                if not self._sendfile_upload(file.stream, out):
+                    shutil.copyfileobj(file.stream, out, self.COPY_BUFFER_SIZE)
             
             return str(file_path.absolute())
         
@@ -106,10 +215,126 @@ class FileManager:
                 details={"job_id": job_id, "error": str(e)}
             )
     
+    @staticmethod
+    def _sendfile_upload(stream: BinaryIO, out: BinaryIO) -> bool:
+        """
+        Copy a spooled upload to disk in the kernel with os.sendfile.
+        
+        Only uploads werkzeug has spilled to a temporary file have a real
+        file descriptor; in-memory uploads (and platforms without
+        sendfile) return False so the caller copies them in Python.
+        
+        Args:
+            stream: Upload stream, positioned at the start of the data
+            out: Destination file opened for binary writing
+            
+        Returns:
+            bool: True if the whole upload was copied
+        """
+        if not hasattr(os, "sendfile"):
+            return False
+        
+        try:
+            in_fd = stream.fileno()
+            offset = stream.tell()
+        except (AttributeError, OSError, ValueError):
+            return False
+        
+        remaining = os.fstat(in_fd).st_size - offset
+        try:
+            while remaining > 0:
+                sent = os.sendfile(out.fileno(), in_fd, offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+        except OSError:
+            if offset != stream.tell():
+                raise  # Partially copied; don't silently write twice
+            return False
+        
+        stream.seek(offset)
+        return True
+    
+    def open_upload_stream(self, job_id: str) -> BinaryIO:
+        """
+        Open the input file for a job for streamed, chunked writing.
+        
+        The caller owns the returned file object and must close it. Used by
+        the raw upload endpoint to copy the request body straight to disk
+        without buffering the whole PDF in memory.
+        
+        Args:
+            job_id: Unique job identifier
+            
+        Returns:
+            BinaryIO: File object opened for binary writing at input.pdf
+            
+        Raises:
+            FileIOError: If the file cannot be opened
+        """
+        try:
+            job_dir = self._get_job_directory(job_id)
+            job_dir.mkdir(parents=True, exist_ok=True)
+            
+            return open(job_dir / self.INPUT_FILENAME, "wb")
+        
+        except Exception as e:
+            raise FileIOError(
+                f"Failed to open upload stream for job {job_id}",
+                details={"job_id": job_id, "error": str(e)}
+            )
+    
+    def hash_file(self, file_path: str) -> str:
+        """
+        Compute the content hash of a stored file.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            str: Hex digest from new_content_hasher()
+            
+        Raises:
+            FileIOError: If the file cannot be read
+        """
+        hasher = new_content_hasher()
+        try:
+            with open(file_path, "rb") as f:
+                while chunk := f.read(self.UPLOAD_CHUNK_SIZE):
+                    hasher.update(chunk)
+        except OSError as e:
+            raise FileIOError(
+                f"Failed to hash file: {file_path}",
+                details={"path": file_path, "error": str(e)}
+            )
+        return hasher.hexdigest()
+    
+    def has_pdf_trailer(self, file_path: str) -> bool:
+        """
+        Check that a stored PDF ends with an %%EOF marker.
+        
+        Only the last PDF_TRAILER_SCAN_BYTES are read, so this is a cheap
+        guard against truncated uploads before a conversion is queued.
+        
+        Args:
+            file_path: Path to the stored PDF
+            
+        Returns:
+            bool: True if the %%EOF marker is present near the end of the file
+        """
+        with open(file_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - self.PDF_TRAILER_SCAN_BYTES, 0))
+            return PDF_EOF_MARKER in f.read()
+    
     def store_output(self, file_path: str, job_id: str) -> str:
         """
         Save a converted output file with the given job ID.
         
+        The file is moved into the job directory with an O(1) rename when
+        it lives on the same filesystem, and copied otherwise.
+        
         Args:
             file_path: Path to the converted file
             job_id: Unique job identifier
@@ -125,18 +350,128 @@ class FileManager:
             job_dir = self._get_job_directory(job_id)
             job_dir.mkdir(parents=True, exist_ok=True)
             
-            # Copy file to output.docx
-            output_path = job_dir / "output.docx"
-            shutil.copy2(file_path, output_path)
+            # Move file to output.docx; the output is freshly generated, so
+            # a cross-device copy skips copy2's metadata propagation
+            output_path = job_dir / self.OUTPUT_FILENAME
+            try:
+                os.replace(file_path, output_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.copyfile(file_path, output_path)
+            
+            self.upload_output(job_id, str(output_path))
             
             return str(output_path.absolute())
         
+        except FileIOError:
+            raise
         except Exception as e:
             raise FileIOError(
                 f"Failed to store output file for job {job_id}",
                 details={"job_id": job_id, "source_path": file_path, "error": str(e)}
             )
     
+    def _get_s3_client(self):
+        """
+        Get the S3 client, creating it on first use.
+        
+        Raises:
+            FileIOError: If boto3 is not installed
+        """
+        if self._s3_client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise FileIOError(
+                    "boto3 is required when S3_BUCKET is configured",
+                    details={"bucket": self.s3_bucket, "error": str(e)}
+                )
+            
+            self._s3_client = boto3.client(
+                "s3",
+                endpoint_url=Config.S3_ENDPOINT_URL,
+                region_name=Config.S3_REGION
+            )
+        
+        return self._s3_client
+    
+    def _get_output_key(self, job_id: str) -> str:
+        """Get the object key of a job's converted output."""
+        return f"{job_id}/{self.OUTPUT_FILENAME}"
+    
+    def upload_output(self, job_id: str, file_path: str) -> Optional[str]:
+        """
+        Upload a converted output file to the configured S3 bucket.
+        
+        Args:
+            job_id: Unique job identifier
+            file_path: Path to the converted file
+            
+        Returns:
+            str: Object key of the uploaded file, or None when no bucket is configured
+            
+        Raises:
+            FileIOError: If the upload fails
+        """
+        if not self.s3_bucket:
+            return None
+        
+        key = self._get_output_key(job_id)
+        try:
+            self._get_s3_client().upload_file(
+                file_path,
+                self.s3_bucket,
+                key,
+                ExtraArgs={"ContentType": DOCX_CONTENT_TYPE}
+            )
+        except FileIOError:
+            raise
+        except Exception as e:
+            raise FileIOError(
+                f"Failed to upload output file for job {job_id}",
+                details={"job_id": job_id, "bucket": self.s3_bucket, "error": str(e)}
+            )
+        
+        return key
+    
+    def get_download_url(self, job_id: str, download_name: str, expires_in: int = 300) -> Optional[str]:
+        """
+        Create a presigned URL that downloads a job's output from S3.
+        
+        Args:
+            job_id: Unique job identifier
+            download_name: Filename offered to the browser
+            expires_in: URL lifetime in seconds
+            
+        Returns:
+            str: Presigned URL, or None when no bucket is configured
+            
+        Raises:
+            FileIOError: If the URL cannot be generated
+        """
+        if not self.s3_bucket:
+            return None
+        
+        try:
+            return self._get_s3_client().generate_presigned_url(
+                "get_object",
+                Params={
+                    "Bucket": self.s3_bucket,
+                    "Key": self._get_output_key(job_id),
+                    "ResponseContentDisposition": f'attachment; filename="{download_name}"',
+                    "ResponseContentType": DOCX_CONTENT_TYPE
+                },
+                ExpiresIn=expires_in
+            )
+        except FileIOError:
+            raise
+        except Exception as e:
+            raise FileIOError(
+                f"Failed to create download URL for job {job_id}",
+                details={"job_id": job_id, "bucket": self.s3_bucket, "error": str(e)}
+            )
+    
     def get_output_path(self, job_id: str) -> Optional[str]:
         """
         Retrieve the output file path for a given job ID.
@@ -147,12 +482,7 @@ class FileManager:
         Returns:
             str: Absolute path to the output file, or None if not found
         """
-        output_path = self._get_job_directory(job_id) / "output.docx"
-        
-        if output_path.exists():
-            return str(output_path.absolute())
-        
-        return None
+        return self._lookup_job_file(job_id, self.OUTPUT_FILENAME)
     
     def get_input_path(self, job_id: str) -> Optional[str]:
         """
@@ -164,12 +494,47 @@ class FileManager:
         Returns:
             str: Absolute path to the input file, or None if not found
         """
-        input_path = self._get_job_directory(job_id) / "input.pdf"
+        return self._lookup_job_file(job_id, self.INPUT_FILENAME)
+    
+    def _lookup_job_file(self, job_id: str, name: str) -> Optional[str]:
+        """
+        Return the absolute path of a job file if it exists.
         
-        if input_path.exists():
-            return str(input_path.absolute())
+        Hits are cached for PATH_CACHE_TTL_SECONDS so repeated lookups (e.g.
+        status polling and downloads) skip the stat call. Misses are never
+        cached: the converter writes output.docx without going through
+        FileManager, so a cached miss could hide a freshly written file.
         
-        return None
+        Args:
+            job_id: Unique job identifier
+            name: File name inside the job directory
+            
+        Returns:
+            str: Absolute path to the file, or None if not found
+        """
+        key = (job_id, name)
+        now = time.monotonic()
+        
+        cached = self._path_cache.get(key)
+        if cached is not None and now - cached[0] < self.PATH_CACHE_TTL_SECONDS:
+            return cached[1]
+        
+        file_path = self._get_job_directory(job_id) / name
+        if not file_path.exists():
+            self._path_cache.pop(key, None)
+            return None
+        
+        if len(self._path_cache) >= self.PATH_CACHE_MAX_ENTRIES:
+            self._path_cache.clear()
+        
+        path_str = str(file_path)
+        self._path_cache[key] = (now, path_str)
+        return path_str
+    
+    def _forget_job_paths(self, job_id: str) -> None:
+        """Drop cached lookups for a job whose files were removed."""
+        self._path_cache.pop((job_id, self.INPUT_FILENAME), None)
+        self._path_cache.pop((job_id, self.OUTPUT_FILENAME), None)
     
     def cleanup_old_files(self, max_age_hours: int = 24) -> int:
         """
@@ -181,34 +546,65 @@ class FileManager:
         Returns:
             int: Number of job directories deleted
         """
-        deleted_count = 0
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+        cutoff_ts = (datetime.now() - timedelta(hours=max_age_hours)).timestamp()
         
-        upload_path = Path(self.upload_folder)
+        # Collect expired job directories. scandir's DirEntry answers
+        # is_dir() from the directory listing and caches stat(), so each
+        # entry costs at most one stat call.
+        expired = []
+        try:
+            with os.scandir(self.upload_folder) as entries:
+                for entry in entries:
+                    try:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        
+                        if entry.stat(follow_symlinks=False).st_mtime < cutoff_ts:
+                            expired.append(Path(entry.path))
+                    
+                    except OSError as e:
+                        # Log error but continue with other directories
+                        print(f"Error cleaning up directory {entry.path}: {e}")
+                        continue
+        except FileNotFoundError:
+            return 0
         
-        if not upload_path.exists():
+        if not expired:
             return 0
         
-        # Iterate through job directories
-        for job_dir in upload_path.iterdir():
-            if not job_dir.is_dir():
-                continue
-            
-            try:
-                # Check directory modification time
-                dir_mtime = datetime.fromtimestamp(job_dir.stat().st_mtime)
-                
-                if dir_mtime < cutoff_time:
-                    # Delete the entire job directory
-                    shutil.rmtree(job_dir)
-                    deleted_count += 1
+        self._path_cache.clear()
+        
+        # Split into batches (one native rm each) and remove them
+        # concurrently so unlink latency overlaps across batches
+        workers = min(self.CLEANUP_MAX_WORKERS, len(expired))
+        batch_size = min(self.CLEANUP_BATCH_SIZE, math.ceil(len(expired) / workers))
+        batches = [
+            expired[start:start + batch_size]
+            for start in range(0, len(expired), batch_size)
+        ]
+        
+        if len(batches) == 1:
+            return self._remove_batch(batches[0])
+        
+        with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+            return sum(executor.map(self._remove_batch, batches))
+    
+    def _remove_batch(self, batch: List[Path]) -> int:
+        """
+        Delete a batch of job directories.
+        
+        Args:
+            batch: Job directories to delete
             
-            except Exception as e:
-                # Log error but continue with other directories
-                print(f"Error cleaning up directory {job_dir}: {e}")
-                continue
+        Returns:
+            int: Number of directories that are gone afterwards
+        """
+        try:
+            _fast_rmtree(*batch)
+        except Exception as e:
+            print(f"Error cleaning up directories {batch}: {e}")
         
-        return deleted_count
+        return sum(1 for job_dir in batch if not os.path.lexists(job_dir))
     
     def delete_job_files(self, job_id: str) -> None:
         """
@@ -228,7 +624,10 @@ class FileManager:
                 details={"job_id": job_id}
             )
         
+        self._forget_job_paths(job_id)
+        
         try:
+            # One small directory: starting rm would cost more than it saves
             shutil.rmtree(job_dir)
         except Exception as e:
             raise FileIOError(
@@ -242,6 +641,7 @@ class FileManager:
         
         Since we store files as input.pdf, we'll return a generic name.
         In a real implementation, you might store the original filename in metadata.
+        A missing output is cached for MISSING_OUTPUT_TTL_SECONDS.
         
         Args:
             job_id: Unique job identifier
@@ -249,11 +649,21 @@ class FileManager:
         Returns:
             str: Original filename with .docx extension, or None if not found
         """
+        # Repeated polls before the output exists skip the stat
+        now = time.monotonic()
+        missed_at = self._missing_outputs.get(job_id)
+        if missed_at is not None and now - missed_at < self.MISSING_OUTPUT_TTL_SECONDS:
+            return None
+        
         # For now, return a generic filename based on job_id
         # In production, you'd store the original filename in Redis/database
         output_path = self.get_output_path(job_id)
         
         if output_path:
+            self._missing_outputs.pop(job_id, None)
             return f"converted_{job_id}.docx"
         
+        if len(self._missing_outputs) >= self.PATH_CACHE_MAX_ENTRIES:
+            self._missing_outputs.clear()
+        self._missing_outputs[job_id] = now
         return None
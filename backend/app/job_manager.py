@@ -5,11 +5,12 @@ This module provides the JobManager class for creating jobs, tracking progress,
 and managing job state transitions using Redis as the storage backend.
 """
 
-import uuid
 import json
+import uuid
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from redis import Redis
+from redis.exceptions import ResponseError, WatchError
 from app.redis_client import get_redis_client
 from app.exceptions import JobNotFoundError
 
@@ -19,14 +20,31 @@ class JobManager:
     Manages conversion job state using Redis.
     
     This class handles job creation, progress tracking, and state transitions
-    for PDF to Word conversion jobs. All job data is stored in Redis with
-    appropriate expiration times.
+    for PDF to Word conversion jobs. Each job is stored as a Redis hash with
+    an appropriate expiration time.
     """
     
     # Redis key prefixes
     JOB_KEY_PREFIX = "job:"
     JOB_EXPIRATION_SECONDS = 86400 * 2  # 2 days
     
+    # Content hash -> job ID index used to deduplicate identical uploads;
+    # expires with the default 24h file cleanup so hits still have files
+    CONTENT_KEY_PREFIX = "content:"
+    CONTENT_EXPIRATION_SECONDS = 86400
+    
+    # Jobs are stored as Redis hashes; the nested progress dict is flattened
+    # into these fields and numeric fields are converted back on read
+    PROGRESS_FIELDS = {
+        "current_page": "progress_current_page",
+        "total_pages": "progress_total_pages",
+        "percentage": "progress_percentage"
+    }
+    INT_FIELDS = frozenset({"version", *PROGRESS_FIELDS.values()})
+    
+    # Progress writes are coalesced so at most ~this many land per job
+    PROGRESS_WRITES_PER_JOB = 100
+    
     def __init__(self, redis_client: Optional[Redis] = None):
         """
         Initialize JobManager.
@@ -45,9 +63,10 @@ class JobManager:
             file_path: Path to the uploaded PDF file
             
         Returns:
-            str: Unique job identifier (UUID)
+            str: Unique job identifier (32-character hex UUID)
         """
-        job_id = str(uuid.uuid4())
+        job_id = uuid.uuid4().hex
+        now_iso = datetime.now(timezone.utc).isoformat()
         
         job_data = {
             "job_id": job_id,
@@ -58,17 +77,17 @@ class JobManager:
                 "total_pages": 0,
                 "percentage": 0
             },
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "created_at": now_iso,
+            "updated_at": now_iso,
+            "version": 1
         }
         
         # Store job data in Redis
         key = self._get_job_key(job_id)
-        self._redis.setex(
-            key,
-            self.JOB_EXPIRATION_SECONDS,
-            json.dumps(job_data)
-        )
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hset(key, mapping=self._flatten(job_data))
+        pipe.expire(key, self.JOB_EXPIRATION_SECONDS)
+        pipe.execute()
         
         return job_id
     
@@ -76,6 +95,10 @@ class JobManager:
         """
         Update job progress with current and total page counts.
         
+        Writes are coalesced: only every ``total_pages // 100``-th page and the
+        last page reach Redis, so a job costs at most ~100 progress writes
+        whatever its page count.
+        
         Args:
             job_id: Job identifier
             current_page: Current page being processed (1-indexed)
@@ -84,23 +107,33 @@ class JobManager:
         Raises:
             JobNotFoundError: If job_id does not exist
         """
-        job_data = self._get_job_data(job_id)
+        stride = max(1, total_pages // self.PROGRESS_WRITES_PER_JOB)
+        if current_page % stride != 0 and current_page != total_pages:
+            return
         
-        # Calculate percentage
-        percentage = 0
-        if total_pages > 0:
-            percentage = int((current_page / total_pages) * 100)
+        self._write_progress(job_id, current_page, total_pages)
+    
+    def update_progress_batch(self, job_id: str, items: List[Tuple[int, int]]) -> None:
+        """
+        Apply several buffered progress updates in one Redis round trip.
         
-        # Update progress information
-        job_data["progress"] = {
-            "current_page": current_page,
-            "total_pages": total_pages,
-            "percentage": percentage
-        }
-        job_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        Progress is cumulative, so only the most recent
+        ``(current_page, total_pages)`` pair is written; earlier entries are
+        superseded by it.
         
-        # Save updated job data
-        self._save_job_data(job_id, job_data)
+        Args:
+            job_id: Job identifier
+            items: Buffered ``(current_page, total_pages)`` pairs, oldest first
+            
+        Raises:
+            JobNotFoundError: If job_id does not exist
+        """
+        if not items:
+            return
+        
+        # Batches are already throttled by the caller, so skip coalescing
+        current_page, total_pages = items[-1]
+        self._write_progress(job_id, current_page, total_pages)
     
     def mark_completed(self, job_id: str, output_path: str) -> None:
         """
@@ -113,19 +146,17 @@ class JobManager:
         Raises:
             JobNotFoundError: If job_id does not exist
         """
-        job_data = self._get_job_data(job_id)
-        
-        job_data["status"] = "completed"
-        job_data["output_path"] = output_path
-        job_data["completed_at"] = datetime.now(timezone.utc).isoformat()
-        job_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        now_iso = datetime.now(timezone.utc).isoformat()
         
-        # Set progress to 100%
-        if job_data.get("progress"):
-            job_data["progress"]["percentage"] = 100
-            job_data["progress"]["current_page"] = job_data["progress"]["total_pages"]
-        
-        self._save_job_data(job_id, job_data)
+        # Set progress to 100% in the same round trip; current_page is
+        # reported as total_pages for completed jobs (see _decode)
+        self._update_fields(job_id, {
+            "status": "completed",
+            "output_path": output_path,
+            "completed_at": now_iso,
+            "updated_at": now_iso,
+            "progress_percentage": 100
+        })
     
     def mark_failed(self, job_id: str, error: str) -> None:
         """
@@ -138,14 +169,14 @@ class JobManager:
         Raises:
             JobNotFoundError: If job_id does not exist
         """
-        job_data = self._get_job_data(job_id)
-        
-        job_data["status"] = "failed"
-        job_data["error"] = error
-        job_data["completed_at"] = datetime.now(timezone.utc).isoformat()
-        job_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        now_iso = datetime.now(timezone.utc).isoformat()
         
-        self._save_job_data(job_id, job_data)
+        self._update_fields(job_id, {
+            "status": "failed",
+            "error": error,
+            "completed_at": now_iso,
+            "updated_at": now_iso
+        })
     
     def get_status(self, job_id: str) -> Dict[str, Any]:
         """
@@ -163,6 +194,7 @@ class JobManager:
                 - created_at: Job creation timestamp
                 - completed_at: Job completion timestamp (if completed or failed)
                 - output_path: Output file path (if completed)
+                - version: Counter bumped on every change (used for ETags)
                 
         Raises:
             JobNotFoundError: If job_id does not exist
@@ -179,12 +211,231 @@ class JobManager:
         Raises:
             JobNotFoundError: If job_id does not exist
         """
-        job_data = self._get_job_data(job_id)
+        self._update_fields(job_id, {
+            "status": "processing",
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        })
+    
+    def delete_job(self, job_id: str) -> None:
+        """
+        Delete a job's state from Redis.
         
-        job_data["status"] = "processing"
-        job_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        Args:
+            job_id: Job identifier
+        """
+        self._redis.delete(self._get_job_key(job_id))
+    
+    def remember_content_hash(self, content_hash: str, job_id: str) -> None:
+        """
+        Record which job is converting a given upload's content.
+        
+        Args:
+            content_hash: Hex digest of the uploaded PDF
+            job_id: Job converting that content
+        """
+        self._redis.setex(
+            f"{self.CONTENT_KEY_PREFIX}{content_hash}",
+            self.CONTENT_EXPIRATION_SECONDS,
+            job_id
+        )
+    
+    def find_job_by_content_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a reusable job that was created for identical content.
+        
+        Args:
+            content_hash: Hex digest of the uploaded PDF
+            
+        Returns:
+            dict: Status of the pending, processing or completed job for this
+                  content, or None if there is none (or it failed/expired)
+        """
+        job_id = self._redis.get(f"{self.CONTENT_KEY_PREFIX}{content_hash}")
+        if job_id is None:
+            return None
         
-        self._save_job_data(job_id, job_data)
+        try:
+            status = self.get_status(job_id)
+        except JobNotFoundError:
+            return None
+        
+        if status.get("status") == "failed":
+            return None
+        
+        return status
+    
+    def _write_progress(self, job_id: str, current_page: int, total_pages: int) -> None:
+        """
+        Write progress fields without reading the job back.
+        
+        Args:
+            job_id: Job identifier
+            current_page: Current page being processed (1-indexed)
+            total_pages: Total number of pages in the document
+            
+        Raises:
+            JobNotFoundError: If job_id does not exist
+        """
+        # Calculate percentage
+        percentage = 0
+        if total_pages > 0:
+            percentage = int((current_page / total_pages) * 100)
+        
+        self._update_fields(job_id, {
+            "progress_current_page": current_page,
+            "progress_total_pages": total_pages,
+            "progress_percentage": percentage,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        })
+    
+    def _update_fields(self, job_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Set some fields of an existing job in a single pipelined round trip.
+        
+        Only the given fields and ``version`` are touched, so concurrent
+        writers updating different fields no longer overwrite each other.
+        
+        Args:
+            job_id: Job identifier
+            fields: Hash fields to set
+            
+        Raises:
+            JobNotFoundError: If job_id does not exist
+        """
+        key = self._get_job_key(job_id)
+        try:
+            existed = self._write_fields(key, fields)
+        except ResponseError as e:
+            if not self._is_wrong_type(e):
+                raise
+            # A job written by an older release; convert it and try again
+            self._migrate_legacy_job(key)
+            existed = self._write_fields(key, fields)
+        
+        if not existed:
+            # HSET created a stray partial hash; drop it again
+            self._redis.delete(key)
+            raise JobNotFoundError(
+                f"Job not found: {job_id}",
+                details={"job_id": job_id}
+            )
+    
+    def _write_fields(self, key: str, fields: Dict[str, Any]) -> bool:
+        """
+        Pipeline the field update of _update_fields.
+        
+        Returns:
+            bool: Whether the job hash existed before the write
+        """
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.exists(key)
+        pipe.hset(key, mapping=fields)
+        pipe.hincrby(key, "version", 1)
+        pipe.expire(key, self.JOB_EXPIRATION_SECONDS)
+        return bool(pipe.execute()[0])
+    
+    @staticmethod
+    def _is_wrong_type(error: ResponseError) -> bool:
+        """Tell whether Redis rejected a command because the key holds another type."""
+        return str(error).startswith("WRONGTYPE")
+    
+    def _migrate_legacy_job(self, key: str) -> Dict[str, str]:
+        """
+        Rewrite a job that older releases stored as a JSON string as a hash.
+        
+        Jobs created before the switch to hashes keep their string value
+        until they expire, and hash commands on them fail with WRONGTYPE.
+        The job is rewritten in place and keeps its remaining TTL. A value
+        that isn't a JSON job is dropped, so the job reads as not found.
+        The key is WATCHed from the read to the rewrite, so a migration
+        racing another one can't overwrite fields written in between.
+        
+        Args:
+            key: Redis key of the job
+            
+        Returns:
+            dict: The job's hash fields (empty if it could not be migrated)
+        """
+        pipe = self._redis.pipeline(transaction=True)
+        try:
+            while True:
+                try:
+                    # The rewrite is dropped if anything else changes the
+                    # key after it is read: another migration, or a write
+                    # to the already migrated hash
+                    pipe.watch(key)
+                    if pipe.type(key) != "string":
+                        # Another reader converted it first (or it expired)
+                        pipe.unwatch()
+                        return self._redis.hgetall(key)
+                    
+                    raw = pipe.get(key)
+                    ttl = pipe.ttl(key)
+                    try:
+                        job_data = json.loads(raw) if raw is not None else None
+                    except ValueError:
+                        job_data = None
+                    
+                    pipe.multi()
+                    pipe.delete(key)
+                    if isinstance(job_data, dict):
+                        pipe.hset(key, mapping=self._flatten(job_data))
+                        pipe.expire(key, ttl if ttl > 0 else self.JOB_EXPIRATION_SECONDS)
+                    pipe.hgetall(key)
+                    return pipe.execute()[-1]
+                except WatchError:
+                    # Changed under us; look at the key again
+                    continue
+        finally:
+            pipe.reset()
+    
+    @classmethod
+    def _flatten(cls, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a job dict into Redis hash fields.
+        
+        Args:
+            job_data: Job data dictionary
+            
+        Returns:
+            dict: Flat field mapping with None values dropped
+        """
+        fields = {
+            key: value for key, value in job_data.items()
+            if key != "progress" and value is not None
+        }
+        for name, field in cls.PROGRESS_FIELDS.items():
+            value = (job_data.get("progress") or {}).get(name)
+            if value is not None:
+                fields[field] = value
+        return fields
+    
+    @classmethod
+    def _decode(cls, fields: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Convert Redis hash fields back into a job dict.
+        
+        Args:
+            fields: Field mapping returned by HGETALL
+            
+        Returns:
+            dict: Job data with the nested progress dict restored
+        """
+        job_data: Dict[str, Any] = {}
+        progress: Dict[str, int] = {}
+        for field, value in fields.items():
+            if field in cls.INT_FIELDS:
+                value = int(value)
+            if field.startswith("progress_"):
+                progress[field[len("progress_"):]] = value
+            else:
+                job_data[field] = value
+        if progress:
+            # mark_completed writes no page count; every page is done
+            if job_data.get("status") == "completed" and "total_pages" in progress:
+                progress["current_page"] = progress["total_pages"]
+            job_data["progress"] = progress
+        return job_data
     
     def _get_job_key(self, job_id: str) -> str:
         """
@@ -212,27 +463,17 @@ class JobManager:
             JobNotFoundError: If job_id does not exist
         """
         key = self._get_job_key(job_id)
-        data = self._redis.get(key)
+        try:
+            fields = self._redis.hgetall(key)
+        except ResponseError as e:
+            if not self._is_wrong_type(e):
+                raise
+            fields = self._migrate_legacy_job(key)
         
-        if data is None:
+        if not fields:
             raise JobNotFoundError(
                 f"Job not found: {job_id}",
                 details={"job_id": job_id}
             )
         
-        return json.loads(data)
-    
-    def _save_job_data(self, job_id: str, job_data: Dict[str, Any]) -> None:
-        """
-        Save job data to Redis.
-        
-        Args:
-            job_id: Job identifier
-            job_data: Job data dictionary
-        """
-        key = self._get_job_key(job_id)
-        self._redis.setex(
-            key,
-            self.JOB_EXPIRATION_SECONDS,
-            json.dumps(job_data)
-        )
+        return self._decode(fields)
@@ -6,10 +6,93 @@ paragraphs, headings, tables, and lists based on text positioning and formatting
 """
 
 import re
-from typing import List, Tuple, Dict, Set
+from functools import lru_cache
+from itertools import chain
+from typing import List, Optional, Tuple, Dict, Set
+
+import numpy as np
+
 from app.models import OCRResult, DocumentStructure, StructureElement, WordBox
 
 
+# Bullet points (•, -, *, ○, ■, Unicode bullets); a bullet is a single
+# character, so it is recognised with a set lookup instead of the regex
+_BULLET_CHARS = frozenset(
+    '•-*○■□▪▫\u2022\u2023\u2043\u204C\u204D\u2219\u25AA\u25AB\u25CF\u25E6'
+)
+
+# Numbered items (1. / 1), a. / A), roman numerals), followed by whitespace
+_NUMBERED_ITEM_RE = re.compile(r'(?:\d+|[a-z]|[A-Z]|[ivxlcdm]+|[IVXLCDM]+)[\.\)]\s')
+
+
+@lru_cache(maxsize=4096)
+def _classify_list_item(line_text: str) -> Tuple[bool, str]:
+    """
+    Classify a stripped line as a bullet or numbered list item.
+    
+    Memoized: the same line text is checked by table detection and again
+    by structure detection, and list markers repeat across pages.
+    """
+    if len(line_text) < 2:
+        return False, ""
+    
+    first = line_text[0]
+    if first in _BULLET_CHARS:
+        if line_text[1].isspace():
+            return True, "bullet"
+        return False, ""
+    
+    # Only an alphanumeric first character can start a numbered marker
+    if first.isalnum() and _NUMBERED_ITEM_RE.match(line_text):
+        return True, "numbered"
+    return False, ""
+
+
+def _cluster_sweep(sorted_pos: List[float], tolerance: float) -> np.ndarray:
+    """
+    Average runs of sorted positions whose neighbours are within tolerance.
+    
+    Single pass with a running sum and count per cluster; see
+    LayoutAnalyzer._cluster_positions.
+    """
+    if not sorted_pos:
+        return np.empty(0)
+    
+    centers = []
+    prev = total = sorted_pos[0]
+    count = 1
+    for pos in sorted_pos[1:]:
+        if pos - prev <= tolerance:
+            total += pos
+            count += 1
+        else:
+            centers.append(total / count)
+            total = pos
+            count = 1
+        prev = pos
+    centers.append(total / count)
+    return np.array(centers, dtype=np.float64)
+
+
+def _count_alignments(positions: np.ndarray, row_offsets: np.ndarray,
+                      columns: np.ndarray, tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Match the word positions of a run of lines against column centers.
+    
+    Positions of all lines are passed as one flat array, with row_offsets
+    giving the index where each (non-empty) line starts, so the hit matrix
+    is positions x columns rather than padded to lines x words x columns.
+    
+    Returns:
+        Number of lines with a word at each column, and number of aligned
+        words in each line
+    """
+    hits = np.abs(positions[:, None] - columns[None, :]) <= tolerance
+    column_appearances = np.logical_or.reduceat(hits, row_offsets, axis=0).sum(axis=0)
+    aligned_words = np.add.reduceat(hits.any(axis=1), row_offsets)
+    return column_appearances, aligned_words
+
+
 class LayoutAnalyzer:
     """
     Analyzes OCR results to detect document structure.
@@ -18,9 +101,49 @@ class LayoutAnalyzer:
     to identify structural elements like paragraphs, headings, tables, and lists.
     """
     
-    def __init__(self):
-        """Initialize the Layout Analyzer."""
-        pass
+    # Cluster line grouping: x distances are scaled down by this factor
+    # (so words far apart horizontally still link) and words within this
+    # many mean word heights of each other join the same line
+    LINE_CLUSTER_X_SCALE = 0.05
+    LINE_CLUSTER_EPS = 0.5
+    
+    # _cluster_positions sweeps up to this many positions in Python and
+    # hands larger inputs to NumPy
+    CLUSTER_SWEEP_MAX = 150
+    
+    # Paragraph breaks: gaps larger than the base line gap times the first
+    # of these factors that keeps the page under PARAGRAPH_MAX_COUNT
+    # paragraphs with less than PARAGRAPH_MAX_SINGLE_RATIO single-line ones
+    PARAGRAPH_GAP_FACTORS = (1.5, 2.0, 3.0)
+    PARAGRAPH_MAX_COUNT = 50
+    PARAGRAPH_MAX_SINGLE_RATIO = 0.5
+    
+    # Fewer line gaps than this are too few to estimate a base gap from
+    PARAGRAPH_MIN_GAPS = 3
+    
+    def __init__(self, line_grouping: str = "anchor"):
+        """
+        Initialize the Layout Analyzer.
+        
+        Args:
+            line_grouping: 'anchor' (default) or 'cluster'; see
+                           _group_words_into_lines
+        """
+        self.line_grouping = line_grouping
+        
+        # Scratch buffers for _group_words_into_lines, grown on demand and
+        # reused across pages instead of reallocated for every page
+        self._scratch_size = 0
+        self._scratch_y = np.empty(0)
+        self._scratch_bound = np.empty(0)
+    
+    def _reserve_scratch(self, size: int) -> None:
+        """Make sure the scratch buffers hold at least size entries."""
+        if self._scratch_size < size:
+            # Over-allocate so slowly growing pages don't reallocate each time
+            self._scratch_size = size * 2
+            self._scratch_y = np.empty(self._scratch_size)
+            self._scratch_bound = np.empty(self._scratch_size)
     
     def analyze(self, ocr_result: OCRResult) -> DocumentStructure:
         """
@@ -59,21 +182,54 @@ class LayoutAnalyzer:
         # Process each column separately
         all_elements = []
         for column_lines in columns:
-            # Detect tables first (they have priority over other structures)
-            table_regions = self._detect_table_regions(column_lines)
-            
-            # Detect structure elements from lines, excluding table regions
-            elements = self._detect_structure_elements(column_lines, table_regions)
-            all_elements.extend(elements)
+            all_elements.extend(self._process_column(column_lines))
         
         return DocumentStructure(elements=all_elements)
     
+    def _process_column(self, column_lines: List[List[WordBox]]) -> List[StructureElement]:
+        """
+        Detect the structure elements of one column.
+        
+        Args:
+            column_lines: Lines of the column, top to bottom
+            
+        Returns:
+            List of StructureElement objects (tables first, then the rest)
+        """
+        # Join and classify each line once; both passes below need them
+        line_texts = [self._line_text(line) for line in column_lines]
+        list_flags = self._classify_lines(line_texts)
+        
+        # Detect tables first (they have priority over other structures)
+        table_regions = self._detect_table_regions(column_lines, line_texts, list_flags)
+        
+        # Detect structure elements from lines, excluding table regions
+        return self._detect_structure_elements(column_lines, table_regions, line_texts, list_flags)
+    
+    def _classify_lines(self, line_texts: List[str]) -> List[Tuple[bool, str]]:
+        """
+        Classify every line of a column as a list item or not in one pass.
+        
+        Args:
+            line_texts: Text of each line
+            
+        Returns:
+            List of (is_list_item, list_type) tuples, one per line
+        """
+        return [_classify_list_item(text.strip()) for text in line_texts]
+    
+    @staticmethod
+    def _line_text(line: List[WordBox]) -> str:
+        """Join the words of a line with single spaces."""
+        return ' '.join(word.text for word in line)
+    
     def _group_words_into_lines(self, words: List[WordBox]) -> List[List[WordBox]]:
         """
         Group words into lines based on vertical position.
         
         Words with similar y-coordinates are grouped together as a line.
-        Lines are sorted from top to bottom.
+        Lines are sorted from top to bottom. With line_grouping='cluster'
+        the lines are found by _cluster_words_into_lines instead.
         
         Args:
             words: List of WordBox objects with position information
@@ -84,32 +240,84 @@ class LayoutAnalyzer:
         if not words:
             return []
         
+        if self.line_grouping == "cluster":
+            return self._cluster_words_into_lines(words)
+        
+        # Struct-of-arrays view of the word boxes
+        count = len(words)
+        xs = np.fromiter((w.x for w in words), dtype=np.float64, count=count)
+        ys = np.fromiter((w.y for w in words), dtype=np.float64, count=count)
+        heights = np.fromiter((w.height for w in words), dtype=np.float64, count=count)
+        
         # Sort words by vertical position (top to bottom), then horizontal (left to right)
-        sorted_words = sorted(words, key=lambda w: (w.y, w.x))
+        order = np.lexsort((xs, ys))
+        self._reserve_scratch(count)
+        ys_sorted = np.take(ys, order, out=self._scratch_y[:count])
+        
+        # Words within half the height of a line's first word belong to that
+        # line. With y sorted, each word's line would end at the first word
+        # below y + height * 0.5, found for all words in one binary search.
+        line_bounds = np.take(heights, order, out=self._scratch_bound[:count])
+        line_bounds *= 0.5
+        line_bounds += ys_sorted
+        line_ends = np.searchsorted(ys_sorted, line_bounds, side='right')
+        
+        # Walk from line start to line start (one step per line, not per word)
+        breaks = []
+        start = 0
+        while True:
+            start = int(line_ends[start])
+            if start >= count:
+                break
+            breaks.append(start)
         
-        lines: List[List[WordBox]] = []
-        current_line: List[WordBox] = [sorted_words[0]]
+        return [
+            [words[i] for i in group.tolist()]
+            for group in np.split(order, breaks)
+        ]
+    
+    def _cluster_words_into_lines(self, words: List[WordBox]) -> List[List[WordBox]]:
+        """
+        Group words into lines by density clustering of their centres.
         
-        # Threshold for considering words on the same line (pixels)
-        # Words within this vertical distance are considered on the same line
-        line_threshold = sorted_words[0].height * 0.5
+        Centres are scaled anisotropically (x shrunk by LINE_CLUSTER_X_SCALE,
+        both axes divided by the mean word height) and every pair closer
+        than LINE_CLUSTER_EPS is linked, found with a KD-tree. Connected
+        groups are the lines; this is DBSCAN with min_samples=2 where noise
+        words become single-word lines. Unlike anchor grouping, a line that
+        drifts up or down across a skewed page stays together.
         
-        for word in sorted_words[1:]:
-            # Check if word is on the same line as the current line
-            # Compare with the first word in the current line
-            if abs(word.y - current_line[0].y) <= line_threshold:
-                current_line.append(word)
-            else:
-                # Start a new line
-                lines.append(current_line)
-                current_line = [word]
-                line_threshold = word.height * 0.5
+        Args:
+            words: List of WordBox objects with position information
+            
+        Returns:
+            List of lines (each sorted left to right), top to bottom by mean y
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+        from scipy.spatial import cKDTree
+        
+        count = len(words)
+        xs = np.fromiter((w.x + w.width / 2 for w in words), dtype=np.float64, count=count)
+        ys = np.fromiter((w.y + w.height / 2 for w in words), dtype=np.float64, count=count)
+        mean_height = np.mean([w.height for w in words]) or 1.0
+        
+        coords = np.column_stack([xs * self.LINE_CLUSTER_X_SCALE, ys]) / mean_height
+        pairs = cKDTree(coords).query_pairs(self.LINE_CLUSTER_EPS, output_type='ndarray')
+        graph = coo_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(count, count)
+        )
+        _, labels = connected_components(graph, directed=False)
         
-        # Add the last line
-        if current_line:
-            lines.append(current_line)
+        # Order by line (mean y), then left to right within each line
+        line_y = np.bincount(labels, weights=ys) / np.bincount(labels)
+        order = np.lexsort((xs, labels, line_y[labels]))
+        breaks = np.flatnonzero(np.diff(labels[order])) + 1
         
-        return lines
+        return [
+            [words[i] for i in group.tolist()]
+            for group in np.split(order, breaks)
+        ]
     
     def _detect_columns(self, lines: List[List[WordBox]]) -> List[List[List[WordBox]]]:
         """
@@ -156,39 +364,57 @@ class LayoutAnalyzer:
         # Sample x-positions across the page
         gap_threshold = page_width * 0.1  # 10% of page width
         
-        # Count how many lines have content at each x-position
-        x_coverage = {}
-        for x in range(int(page_left), int(page_right), 5):  # Sample every 5 pixels
-            coverage_count = 0
-            for min_x, max_x, _ in line_x_ranges:
-                if min_x <= x <= max_x:
-                    coverage_count += 1
-            x_coverage[x] = coverage_count
-        
-        # Find gaps (positions with low coverage)
-        gaps = []
-        for x, count in x_coverage.items():
-            if count < len(lines) * 0.2:  # Less than 20% of lines have content here
-                gaps.append(x)
-        
-        # Find continuous gap regions
+        # Cheap check first: a gap is a stretch of at least 10% of the page
+        # that fewer than 20% of the lines reach into. A line wider than the
+        # other 90% (plus slack for the 5px sampling) reaches into any such
+        # stretch, so with 20% of the lines that wide there is no gap
+        line_widths = np.fromiter(
+            (max_x - min_x for min_x, max_x, _ in line_x_ranges),
+            dtype=np.float64, count=len(line_x_ranges)
+        )
+        if np.count_nonzero(line_widths > page_width - gap_threshold + 10) >= len(lines) * 0.2:
+            return [lines]
+        
+        # Sweep the line intervals instead of sampling the page: every line
+        # adds +1 at its first covered pixel and -1 after its last, so the
+        # cumulative sum over the sorted events gives the coverage of each
+        # stretch between two consecutive event positions
+        origin = int(page_left)
+        sample_end = int(page_right)  # Samples every 5 pixels up to here
+        starts = np.ceil([min_x for min_x, _, _ in line_x_ranges]).astype(np.int64)
+        ends = np.floor([max_x for _, max_x, _ in line_x_ranges]).astype(np.int64) + 1
+        event_x = np.concatenate(([origin], starts, ends))
+        event_delta = np.concatenate(([0], np.ones_like(starts), -np.ones_like(ends)))
+        order = np.argsort(event_x, kind='stable')
+        event_x = event_x[order]
+        coverage = np.cumsum(event_delta[order])
+        
+        # Coverage after the last event at each position holds until the next
+        bounds = np.unique(event_x)
+        coverage = coverage[np.searchsorted(event_x, bounds, side='right') - 1]
+        
+        # Find gaps (stretches with low coverage)
+        # Less than 20% of lines have content here
+        low = np.flatnonzero(coverage < len(lines) * 0.2)
+        seg_start = np.maximum(bounds[low], origin)
+        seg_stop = np.append(bounds, sample_end)[low + 1]
+        
+        # Sample indices falling inside each low stretch
+        first = -((origin - seg_start) // 5)
+        last = (np.minimum(seg_stop, sample_end) - 1 - origin) // 5
+        has_sample = first <= last
+        first, last = first[has_sample], last[has_sample]
+        
+        # Find continuous gap regions (samples at most 10px apart)
         gap_regions = []
-        if gaps:
-            current_gap_start = gaps[0]
-            current_gap_end = gaps[0]
-            
-            for gap_x in gaps[1:]:
-                if gap_x - current_gap_end <= 10:  # Continuous gap
-                    current_gap_end = gap_x
-                else:
-                    if current_gap_end - current_gap_start >= gap_threshold:
-                        gap_regions.append((current_gap_start, current_gap_end))
-                    current_gap_start = gap_x
-                    current_gap_end = gap_x
-            
-            # Add last gap
-            if current_gap_end - current_gap_start >= gap_threshold:
-                gap_regions.append((current_gap_start, current_gap_end))
+        if first.size:
+            run_starts = np.flatnonzero((first[1:] - last[:-1]) * 5 > 10) + 1
+            run_ends = np.append(run_starts - 1, first.size - 1)
+            for run_start, run_end in zip(np.insert(run_starts, 0, 0), run_ends):
+                gap_start = int(first[run_start]) * 5 + origin
+                gap_end = int(last[run_end]) * 5 + origin
+                if gap_end - gap_start >= gap_threshold:
+                    gap_regions.append((gap_start, gap_end))
         
         # If no significant gaps found, treat as single column
         if not gap_regions:
@@ -198,16 +424,18 @@ class LayoutAnalyzer:
         # For simplicity, use the first major gap as column separator
         separator_x = (gap_regions[0][0] + gap_regions[0][1]) / 2
         
-        left_column = []
-        right_column = []
+        # Mean word center of every line, summed per line with reduceat
+        filled = [line for line in lines if line]
+        word_counts = np.fromiter(map(len, filled), dtype=np.int64, count=len(filled))
+        word_mids = np.fromiter(
+            (word.x + word.width * 0.5 for word in chain.from_iterable(filled)),
+            dtype=np.float64, count=int(word_counts.sum())
+        )
+        line_centers = np.add.reduceat(word_mids, np.cumsum(word_counts) - word_counts) / word_counts
+        in_left = (line_centers < separator_x).tolist()
         
-        for line in lines:
-            if line:
-                line_center = sum(word.x + word.width / 2 for word in line) / len(line)
-                if line_center < separator_x:
-                    left_column.append(line)
-                else:
-                    right_column.append(line)
+        left_column = [line for line, left in zip(filled, in_left) if left]
+        right_column = [line for line, left in zip(filled, in_left) if not left]
         
         # Return non-empty columns
         columns = []
@@ -218,7 +446,10 @@ class LayoutAnalyzer:
         
         return columns if columns else [lines]
     
-    def _detect_table_regions(self, lines: List[List[WordBox]]) -> List[Tuple[int, int]]:
+    def _detect_table_regions(self, lines: List[List[WordBox]],
+                              line_texts: Optional[List[str]] = None,
+                              list_flags: Optional[List[Tuple[bool, str]]] = None
+                              ) -> List[Tuple[int, int, np.ndarray]]:
         """
         Detect table regions based on grid patterns.
         
@@ -227,9 +458,12 @@ class LayoutAnalyzer:
         
         Args:
             lines: List of lines, where each line is a list of WordBox objects
+            line_texts: Precomputed text of each line (joined here if omitted)
+            list_flags: Precomputed _classify_lines result (computed if omitted)
             
         Returns:
-            List of (start_index, end_index) tuples indicating table regions
+            List of (start_index, end_index, column_centers) tuples indicating
+            table regions
             
         Requirements:
             - 3.3: Identify table structures with rows and columns
@@ -237,28 +471,33 @@ class LayoutAnalyzer:
         if len(lines) < 3:  # Need at least 3 rows for a table
             return []
         
+        if line_texts is None:
+            line_texts = [self._line_text(line) for line in lines]
+        
+        if list_flags is None:
+            list_flags = self._classify_lines(line_texts)
+        
         table_regions = []
         i = 0
         
         while i < len(lines):
             # Skip lines that are list items (they shouldn't be part of tables)
-            line_text = ' '.join(word.text for word in lines[i]) if lines[i] else ""
-            if self._is_list_item(line_text)[0]:
+            if list_flags[i][0]:
                 i += 1
                 continue
             
             # Check if current position starts a table
-            table_end = self._find_table_end(lines, i)
+            table_end, columns = self._find_table_end(lines, i)
             
             if table_end > i + 2:  # Found a table with at least 3 rows
-                table_regions.append((i, table_end))
+                table_regions.append((i, table_end, columns))
                 i = table_end
             else:
                 i += 1
         
         return table_regions
     
-    def _find_table_end(self, lines: List[List[WordBox]], start: int) -> int:
+    def _find_table_end(self, lines: List[List[WordBox]], start: int) -> Tuple[int, Optional[np.ndarray]]:
         """
         Find the end of a table starting at the given line index.
         
@@ -267,10 +506,11 @@ class LayoutAnalyzer:
             start: Starting line index
             
         Returns:
-            End line index (exclusive) or start if no table found
+            Tuple of (end line index (exclusive), column centers), or
+            (start, None) if no table found
         """
         if start >= len(lines) - 2:
-            return start
+            return start, None
         
         # Analyze column alignment for consecutive lines
         # Extract x-positions of words in each line
@@ -286,13 +526,13 @@ class LayoutAnalyzer:
             # Tables should have multiple words per line (at least 2 columns)
             if len(x_positions) < 2:
                 if i == start:
-                    return start  # First line doesn't have enough columns
+                    return start, None  # First line doesn't have enough columns
                 break
             
             line_columns.append(x_positions)
         
         if len(line_columns) < 3:
-            return start
+            return start, None
         
         # Check for consistent column alignment
         # Find common x-positions across lines (with tolerance)
@@ -308,44 +548,31 @@ class LayoutAnalyzer:
         
         # Need at least 2 columns for a table
         if len(columns) < 2:
-            return start
+            return start, None
         
         # Check how many lines have words at EACH column position
         # For a true table, most columns should appear in most rows
-        column_appearances = [0] * len(columns)
-        for positions in line_columns:
-            for col_idx, col_x in enumerate(columns):
-                # Check if this line has a word near this column
-                for x in positions:
-                    if abs(x - col_x) <= tolerance:
-                        column_appearances[col_idx] += 1
-                        break
+        line_word_counts = np.fromiter(map(len, line_columns), dtype=np.int64, count=len(line_columns))
+        column_appearances, aligned_words = _count_alignments(
+            np.fromiter(chain.from_iterable(line_columns), dtype=np.float64),
+            np.cumsum(line_word_counts) - line_word_counts,
+            columns,
+            tolerance,
+        )
         
         # Check if columns are consistently used across rows
         # At least 80% of rows should have content in at least 80% of columns
         min_column_usage = len(line_columns) * 0.8
-        columns_with_good_usage = sum(1 for count in column_appearances if count >= min_column_usage)
+        columns_with_good_usage = int((column_appearances >= min_column_usage).sum())
         
         if columns_with_good_usage < len(columns) * 0.8:
-            return start  # Not enough consistent column usage
+            return start, None  # Not enough consistent column usage
         
         # Check how many lines align with these columns
-        aligned_count = 0
-        for positions in line_columns:
-            # Check if this line's words align with the detected columns
-            aligned_words = 0
-            for x in positions:
-                for col_x in columns:
-                    if abs(x - col_x) <= tolerance:
-                        aligned_words += 1
-                        break
-            
-            # If most words align (at least 70%), consider this line part of the table
-            if len(positions) > 0 and aligned_words / len(positions) >= 0.7:
-                aligned_count += 1
-            else:
-                # Line doesn't align, table ends here
-                break
+        # If most words align (at least 70%), consider this line part of the
+        # table; the table ends at the first line that doesn't
+        line_aligned = aligned_words / line_word_counts >= 0.7
+        aligned_count = len(line_columns) if line_aligned.all() else int(np.argmin(line_aligned))
         
         # Need at least 3 aligned lines and at least 2 columns
         # Also check that lines have similar number of words (table characteristic)
@@ -359,36 +586,42 @@ class LayoutAnalyzer:
             
             # At least 70% of lines should have consistent word counts
             if consistent_count / len(word_counts) >= 0.7:
-                return start + aligned_count
+                if aligned_count < len(line_columns):
+                    # Only count the columns of the rows that made the table
+                    columns = self._cluster_positions(
+                        list(set(chain.from_iterable(line_columns[:aligned_count]))), tolerance)
+                return start + aligned_count, columns
         
-        return start
+        return start, None
     
-    def _cluster_positions(self, positions: List[float], tolerance: float) -> List[float]:
+    def _cluster_positions(self, positions, tolerance: float) -> np.ndarray:
         """
         Cluster positions that are close together.
         
+        Sorted positions are split wherever the gap to the previous one
+        exceeds the tolerance; each cluster is then averaged with bincount.
+        Short inputs (the usual table candidate) are swept in plain Python,
+        which beats the fixed cost of the NumPy calls at that size.
+        
         Args:
-            positions: List of positions to cluster
+            positions: Positions to cluster (sequence or ndarray)
             tolerance: Maximum distance between positions in same cluster
             
         Returns:
-            List of cluster centers
+            Array of cluster centers (average of positions in each cluster)
         """
-        if not positions:
-            return []
-        
-        sorted_pos = sorted(positions)
-        clusters = [[sorted_pos[0]]]
-        
-        for pos in sorted_pos[1:]:
-            # Check if close to last cluster
-            if pos - clusters[-1][-1] <= tolerance:
-                clusters[-1].append(pos)
-            else:
-                clusters.append([pos])
-        
-        # Return cluster centers (average of positions in cluster)
-        return [sum(cluster) / len(cluster) for cluster in clusters]
+        if len(positions) <= self.CLUSTER_SWEEP_MAX:
+            return _cluster_sweep(sorted(positions), tolerance)
+        
+        sorted_pos = np.sort(np.asarray(positions, dtype=np.float64))
+        if sorted_pos.size == 0:
+            return np.empty(0)
+        
+        is_start = np.empty(sorted_pos.size, dtype=bool)
+        is_start[0] = True
+        is_start[1:] = sorted_pos[1:] - sorted_pos[:-1] > tolerance
+        cluster_ids = np.cumsum(is_start) - 1
+        return np.bincount(cluster_ids, weights=sorted_pos) / np.bincount(cluster_ids)
     
     def _is_list_item(self, line_text: str) -> Tuple[bool, str]:
         """
@@ -403,37 +636,10 @@ class LayoutAnalyzer:
         Requirements:
             - 3.4: Identify bullet points or numbered lists
         """
-        line_text = line_text.strip()
-        
-        if not line_text:
-            return False, ""
-        
-        # Check for bullet points (•, -, *, ○, ■, etc.)
-        bullet_patterns = [
-            r'^[•\-\*○■□▪▫][\s]',  # Common bullet characters
-            r'^[\u2022\u2023\u2043\u204C\u204D\u2219\u25AA\u25AB\u25CF\u25E6][\s]',  # Unicode bullets
-        ]
-        
-        for pattern in bullet_patterns:
-            if re.match(pattern, line_text):
-                return True, "bullet"
-        
-        # Check for numbered lists (1., 1), a., a), i., etc.)
-        numbered_patterns = [
-            r'^\d+[\.\)][\s]',  # 1. or 1)
-            r'^[a-z][\.\)][\s]',  # a. or a)
-            r'^[A-Z][\.\)][\s]',  # A. or A)
-            r'^[ivxlcdm]+[\.\)][\s]',  # Roman numerals (lowercase)
-            r'^[IVXLCDM]+[\.\)][\s]',  # Roman numerals (uppercase)
-        ]
-        
-        for pattern in numbered_patterns:
-            if re.match(pattern, line_text):
-                return True, "numbered"
-        
-        return False, ""
+        return _classify_list_item(line_text.strip())
     
-    def _extract_table_structure(self, lines: List[List[WordBox]], start: int, end: int) -> StructureElement:
+    def _extract_table_structure(self, lines: List[List[WordBox]], start: int, end: int,
+                                 columns: Optional[np.ndarray] = None) -> StructureElement:
         """
         Extract table structure from a region of lines.
         
@@ -441,6 +647,7 @@ class LayoutAnalyzer:
             lines: List of all lines
             start: Start index of table region
             end: End index of table region (exclusive)
+            columns: Column centers found during detection (re-clustered if omitted)
             
         Returns:
             StructureElement representing the table
@@ -457,12 +664,9 @@ class LayoutAnalyzer:
         table_content = '\n'.join(rows)
         
         # Detect number of columns by analyzing alignment
-        all_x = []
-        for line in table_lines:
-            for word in line:
-                all_x.append(word.x)
-        
-        columns = self._cluster_positions(all_x, tolerance=15)
+        if columns is None:
+            all_x = [word.x for line in table_lines for word in line]
+            columns = self._cluster_positions(all_x, tolerance=15)
         
         return StructureElement(
             type="table",
@@ -470,7 +674,59 @@ class LayoutAnalyzer:
             style={"rows": len(table_lines), "columns": len(columns)}
         )
     
-    def _detect_structure_elements(self, lines: List[List[WordBox]], table_regions: List[Tuple[int, int]] = None) -> List[StructureElement]:
+    def _paragraph_gap_threshold(self, gaps: np.ndarray, filled_mask: np.ndarray,
+                                 text_mask: np.ndarray, avg_height: float) -> float:
+        """
+        Choose the vertical gap above which a line starts a new paragraph.
+        
+        The base gap is the median of the smallest 70% of the gaps between
+        consecutive lines (the usual line spacing of the page), at least
+        half the average line height. The threshold is the base gap times
+        the first of PARAGRAPH_GAP_FACTORS that does not fragment the page
+        into too many or mostly single-line paragraphs; if none qualifies,
+        the largest factor is used. Pages with too few gaps keep the fixed
+        1.5x average line height threshold.
+        
+        Args:
+            gaps: Gap from the bottom of the previous line to the top of
+                  each line (gaps[0] is unused)
+            filled_mask: Lines that have words
+            text_mask: Lines that can belong to a paragraph
+            avg_height: Average line height
+            
+        Returns:
+            Gap threshold in pixels
+        """
+        measured = gaps[1:][filled_mask[1:] & filled_mask[:-1]]
+        if measured.size < self.PARAGRAPH_MIN_GAPS:
+            return avg_height * 1.5
+        
+        lower = np.sort(measured)[:max(1, int(measured.size * 0.7))]
+        base_gap = max(float(np.median(lower)), avg_height * 0.5)
+        
+        # Paragraph lines that cannot join the line above start a paragraph;
+        # a start whose next line cannot join it is a single-line paragraph
+        linked = np.zeros(len(gaps), dtype=np.bool_)
+        linked[1:] = text_mask[1:] & text_mask[:-1]
+        
+        for factor in self.PARAGRAPH_GAP_FACTORS:
+            theta = base_gap * factor
+            joins = linked & (gaps <= theta)
+            starts = text_mask & ~joins
+            paragraph_count = int(starts.sum())
+            if not paragraph_count:
+                return theta
+            single_count = int((starts[:-1] & ~joins[1:]).sum()) + int(starts[-1])
+            if (paragraph_count < self.PARAGRAPH_MAX_COUNT
+                    and single_count < paragraph_count * self.PARAGRAPH_MAX_SINGLE_RATIO):
+                return theta
+        
+        return theta
+    
+    def _detect_structure_elements(self, lines: List[List[WordBox]],
+                                   table_regions: List[Tuple[int, int, np.ndarray]] = None,
+                                   line_texts: Optional[List[str]] = None,
+                                   list_flags: Optional[List[Tuple[bool, str]]] = None) -> List[StructureElement]:
         """
         Detect structure elements from grouped lines.
         
@@ -482,7 +738,9 @@ class LayoutAnalyzer:
         
         Args:
             lines: List of lines, where each line is a list of WordBox objects
-            table_regions: List of (start, end) tuples indicating table regions to skip
+            table_regions: List of (start, end, columns) tuples indicating table regions to skip
+            line_texts: Precomputed text of each line (joined here if omitted)
+            list_flags: Precomputed _classify_lines result (computed if omitted)
             
         Returns:
             List of StructureElement objects
@@ -493,32 +751,68 @@ class LayoutAnalyzer:
         if table_regions is None:
             table_regions = []
         
-        # Create a set of line indices that are part of tables
-        table_line_indices = set()
-        for start, end in table_regions:
-            table_line_indices.update(range(start, end))
+        if line_texts is None:
+            line_texts = [self._line_text(line) for line in lines]
+        
+        # Mark the lines that are part of tables
+        table_mask = np.zeros(len(lines), dtype=np.bool_)
+        for start, end, _ in table_regions:
+            table_mask[start:end] = True
         
         elements: List[StructureElement] = []
         
-        # Calculate average line height for comparison
+        # Per-line geometry, computed once instead of on every look-ahead
         # Use the maximum height in each line to represent the line's font size
-        line_heights = [max(word.height for word in line) for line in lines if line]
+        line_max_h = [max(word.height for word in line) if line else 0 for line in lines]
+        line_top = np.array([min(word.y for word in line) if line else 0 for line in lines])
+        line_bottom = np.array([max(word.y + word.height for word in line) if line else 0 for line in lines])
+        
+        # Calculate average line height for comparison
+        line_heights = [height for line, height in zip(lines, line_max_h) if line]
         avg_height = sum(line_heights) / len(line_heights) if line_heights else 0
         
         # Threshold for detecting headings (lines with larger text)
         # Text 1.14x larger than average is considered a heading
         heading_threshold = avg_height * 1.14
+        heading_mask = np.asarray(line_max_h) >= heading_threshold
+        
+        # List markers of every line, so the look-ahead loops only index
+        if list_flags is None:
+            list_flags = self._classify_lines(line_texts)
+        list_mask = np.fromiter((flag for flag, _ in list_flags), dtype=np.bool_, count=len(lines))
+        
+        # Decide up front which lines may extend the block above them, so the
+        # look-ahead loops below are plain index arithmetic:
+        # a list or paragraph stops at an empty line, a table or a heading,
+        # and a paragraph also stops at a list item or a large gap
+        filled_mask = np.fromiter(map(bool, lines), dtype=np.bool_, count=len(lines))
+        continues_block = filled_mask & ~table_mask & ~heading_mask
+        
+        # If spacing to the previous line is larger than the page's paragraph
+        # gap threshold, the line starts a new paragraph
+        # This detects paragraph boundaries based on vertical spacing
+        gaps = np.zeros(len(lines))
+        gaps[1:] = line_top[1:] - line_bottom[:-1]
+        theta = self._paragraph_gap_threshold(
+            gaps, filled_mask, continues_block & ~list_mask, avg_height)
+        spacing_break = gaps > theta
+        spacing_break[0] = False
+        
+        continues_paragraph = (continues_block & ~list_mask & ~spacing_break).tolist()
+        continues_block = continues_block.tolist()
+        is_table = table_mask.tolist()
+        is_heading = heading_mask.tolist()
         
         # First, add table elements
-        for start, end in table_regions:
-            table_element = self._extract_table_structure(lines, start, end)
+        for start, end, columns in table_regions:
+            table_element = self._extract_table_structure(lines, start, end, columns)
             elements.append(table_element)
         
         # Process each line (skipping table regions)
         i = 0
         while i < len(lines):
             # Skip if this line is part of a table
-            if i in table_line_indices:
+            if is_table[i]:
                 i += 1
                 continue
             
@@ -527,11 +821,11 @@ class LayoutAnalyzer:
                 i += 1
                 continue
             
-            line_height = max(word.height for word in line)
-            line_text = ' '.join(word.text for word in line)
+            line_height = line_max_h[i]
+            line_text = line_texts[i]
             
             # Check if this line is a heading (larger text)
-            if line_height >= heading_threshold:
+            if is_heading[i]:
                 # Determine heading level based on relative size
                 # Larger text = higher level (lower number)
                 if line_height >= avg_height * 1.8:
@@ -550,32 +844,17 @@ class LayoutAnalyzer:
                 i += 1
             else:
                 # Check if this is a list item
-                is_list, list_type = self._is_list_item(line_text)
+                is_list, list_type = list_flags[i]
                 
                 if is_list:
                     # Collect consecutive list items
                     list_items = [line_text]
                     i += 1
                     
-                    while i < len(lines) and i not in table_line_indices:
-                        next_line = lines[i]
-                        if not next_line:
-                            break
-                        
-                        next_height = max(word.height for word in next_line)
-                        next_text = ' '.join(word.text for word in next_line)
-                        
-                        # Stop if next line is a heading
-                        if next_height >= heading_threshold:
-                            break
-                        
-                        # Check if next line is also a list item of the same type
-                        next_is_list, next_list_type = self._is_list_item(next_text)
-                        if next_is_list and next_list_type == list_type:
-                            list_items.append(next_text)
-                            i += 1
-                        else:
-                            break
+                    # Continue while the next line is a list item of the same type
+                    while i < len(lines) and continues_block[i] and list_flags[i] == (True, list_type):
+                        list_items.append(line_texts[i])
+                        i += 1
                     
                     # Create list element
                     list_content = '\n'.join(list_items)
@@ -590,35 +869,8 @@ class LayoutAnalyzer:
                     i += 1
                     
                     # Look ahead to group lines into paragraph
-                    while i < len(lines) and i not in table_line_indices:
-                        next_line = lines[i]
-                        if not next_line:
-                            break
-                        
-                        next_height = max(word.height for word in next_line)
-                        next_text = ' '.join(word.text for word in next_line)
-                        
-                        # Stop if next line is a heading
-                        if next_height >= heading_threshold:
-                            break
-                        
-                        # Stop if next line is a list item
-                        if self._is_list_item(next_text)[0]:
-                            break
-                        
-                        # Calculate vertical spacing between lines
-                        prev_line = lines[i - 1]
-                        prev_bottom = max(word.y + word.height for word in prev_line)
-                        next_top = min(word.y for word in next_line)
-                        spacing = next_top - prev_bottom
-                        
-                        # If spacing is large (more than 1.5x average line height), start new paragraph
-                        # This detects paragraph boundaries based on vertical spacing
-                        if spacing > avg_height * 1.5:
-                            break
-                        
-                        # Add line to current paragraph
-                        paragraph_lines.append(next_text)
+                    while i < len(lines) and continues_paragraph[i]:
+                        paragraph_lines.append(line_texts[i])
                         i += 1
                     
                     # Create paragraph element
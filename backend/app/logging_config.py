@@ -0,0 +1,80 @@
+"""
+Logging configuration for the PDF to Word Converter application.
+
+This module sets up the root handler (plain text or JSON) and filters
+health-check noise out of the access logs.
+"""
+
+import logging
+
+from app.config import Config
+
+
+# Access loggers that see one record per request
+ACCESS_LOGGERS = ("werkzeug", "gunicorn.access")
+
+HEALTH_CHECK_PATH = "/api/health"
+
+TEXT_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+JSON_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+
+class HealthCheckFilter(logging.Filter):
+    """Drops access-log records for the health check endpoint."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decide whether a record should be logged.
+        
+        Args:
+            record: Log record emitted by an access logger
+            
+        Returns:
+            bool: False for health check requests, True otherwise
+        """
+        return HEALTH_CHECK_PATH not in record.getMessage()
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    """
+    Build the root formatter.
+    
+    JSON output needs python-json-logger; without it the plain text
+    format is used.
+    """
+    if log_format == "json":
+        try:
+            from pythonjsonlogger import jsonlogger
+            return jsonlogger.JsonFormatter(JSON_FORMAT)
+        except ImportError:
+            logging.getLogger(__name__).warning(
+                "LOG_FORMAT=json requires python-json-logger; using text logs"
+            )
+    return logging.Formatter(TEXT_FORMAT)
+
+
+def configure_logging(level: str = None, log_format: str = None) -> None:
+    """
+    Configure root logging and install the health check filter.
+    
+    Safe to call more than once: the root handler is only added if none
+    exists and the filter is only attached once per access logger.
+    
+    Args:
+        level: Log level name (defaults to Config.LOG_LEVEL)
+        log_format: 'text' or 'json' (defaults to Config.LOG_FORMAT)
+    """
+    level = (level or Config.LOG_LEVEL).upper()
+    log_format = (log_format or Config.LOG_FORMAT).lower()
+    
+    root = logging.getLogger()
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(_build_formatter(log_format))
+        root.addHandler(handler)
+        root.setLevel(level)
+    
+    for name in ACCESS_LOGGERS:
+        access_logger = logging.getLogger(name)
+        if not any(isinstance(f, HealthCheckFilter) for f in access_logger.filters):
+            access_logger.addFilter(HealthCheckFilter())
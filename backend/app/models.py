@@ -10,14 +10,14 @@ from typing import List, Literal
 from PIL import Image
 
 
-@dataclass
+@dataclass(slots=True)
 class PageImage:
     """
     Represents a single page extracted from a PDF as an image.
     
     Attributes:
         page_number: The page number in the original PDF (1-indexed)
-        image: PIL Image object containing the page content
+        image: PIL Image object containing the page content (RGB or grayscale 'L', no alpha)
         width: Image width in pixels
         height: Image height in pixels
         dpi: Resolution in dots per inch
@@ -29,7 +29,7 @@ class PageImage:
     dpi: int
 
 
-@dataclass
+@dataclass(slots=True)
 class WordBox:
     """
     Represents a single word detected by OCR with its position and confidence.
@@ -50,7 +50,7 @@ class WordBox:
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True)
 class OCRResult:
     """
     Contains the complete OCR output for a page image.
@@ -65,7 +65,7 @@ class OCRResult:
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True)
 class StructureElement:
     """
     Represents a detected document structure element (paragraph, heading, list, table).
@@ -85,7 +85,7 @@ class StructureElement:
     style: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentStructure:
     """
     Represents the complete analyzed structure of a document page.
@@ -5,10 +5,30 @@ This module provides OCR functionality to extract text content with bounding box
 information and confidence scores from page images.
 """
 
+import os
+
+# One OpenMP thread per Tesseract process. Celery worker children already
+# run one conversion per core, and a batch of pages goes to tesseract as a
+# single list-file run; Tesseract's default of four threads in each only
+# oversubscribes the cores.
+# Set before pytesseract is imported so every tesseract child inherits it;
+# an explicit OMP_THREAD_LIMIT in the environment still wins.
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
 import pytesseract
+import numpy as np
 from PIL import Image
-from typing import List
-import os
+from itertools import chain
+from typing import Any, Dict, List
+import tempfile
+import threading
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
 from app.models import OCRResult, WordBox
 from app.exceptions import OCRProcessingError
 
@@ -18,6 +38,69 @@ if os.name == 'nt':  # Windows
     if os.path.exists(tesseract_path):
         pytesseract.pytesseract.tesseract_cmd = tesseract_path
 
+# Columns of Tesseract's TSV output, as returned by image_to_data
+_TSV_COLUMNS = (
+    'level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+    'left', 'top', 'width', 'height', 'conf', 'text'
+)
+
+# Tesseract runs allowed at once in this process. Threaded callers (a
+# threads or gevent Celery pool, several converters in one worker) would
+# otherwise each start a recognition and oversubscribe the CPU.
+_OCR_SEMAPHORE = threading.BoundedSemaphore(max(1, (os.cpu_count() or 1) // 2))
+
+
+# Seconds one page may take in a tesseract run before the process is
+# killed; a hung tesseract otherwise blocks its worker indefinitely.
+TESSERACT_PAGE_TIMEOUT = 60
+
+
+def _is_transient_tesseract_error(error: BaseException) -> bool:
+    """
+    Tell whether a failed tesseract run is worth retrying.
+    
+    pytesseract raises TesseractError when tesseract exits non-zero (it
+    crashed or was killed), RuntimeError('Tesseract process timeout')
+    when it ran past the timeout, and OSError when it couldn't be
+    started or talked to. TesseractNotFoundError is an OSError too, but
+    a missing binary won't fix itself.
+    """
+    if isinstance(error, pytesseract.TesseractNotFoundError):
+        return False
+    if isinstance(error, (pytesseract.TesseractError, OSError)):
+        return True
+    return isinstance(error, RuntimeError) and str(error) == 'Tesseract process timeout'
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(min=0.5, max=4),
+    retry=retry_if_exception(_is_transient_tesseract_error),
+    reraise=True
+)
+def _image_to_data(image: Any, config: str, pages: int = 1) -> Dict[str, List[Any]]:
+    """
+    Run pytesseract.image_to_data on an image or image list file.
+    
+    Each attempt holds the process-wide OCR semaphore and may run for
+    TESSERACT_PAGE_TIMEOUT seconds per page. A crashed, killed or
+    timed-out tesseract is retried with exponential backoff, outside the
+    semaphore, up to three attempts before the error is raised.
+    
+    Args:
+        image: PIL Image, or path of a list file naming page images
+        config: Tesseract command line options
+        pages: Number of pages in the run, to scale the timeout
+    """
+    with _OCR_SEMAPHORE:
+        return pytesseract.image_to_data(
+            image,
+            output_type=pytesseract.Output.DICT,
+            lang='eng',
+            config=config,
+            timeout=TESSERACT_PAGE_TIMEOUT * pages
+        )
+
 
 class OCREngine:
     """
@@ -25,11 +108,56 @@ class OCREngine:
     
     This class provides methods to extract text with word-level bounding boxes
     and confidence scores, supporting requirements 2.1, 2.2, and 2.5.
+    
+    When tesserocr is installed, pages are recognized through the Tesseract
+    C API with one model kept loaded per engine; otherwise pytesseract runs
+    the tesseract command, which loads the model again on every call.
     """
     
+    # Page images at least this wide whose Laplacian variance (a sharpness
+    # measure) exceeds the threshold are clean enough for Tesseract's own
+    # binarization; thresholding them costs time and can lose LSTM accuracy
+    CLEAN_IMAGE_MIN_WIDTH = 1500
+    CLEAN_IMAGE_MIN_SHARPNESS = 200.0
+    
+    # Custom Tesseract configuration for better accuracy
+    # --psm 1: Automatic page segmentation with OSD (Orientation and Script Detection)
+    # --oem 3: Default OCR Engine Mode (LSTM + Legacy)
+    CONFIG = r'--oem 3 --psm 1'
+    
+    # Set once the language model has been loaded in this process
+    _warmed_up = False
+    
     def __init__(self):
         """Initialize the OCR Engine."""
-        pass
+        # tesserocr API, created on first use; it is not thread-safe
+        self._api = None
+        self._api_lock = threading.Lock()
+        self._warm_up()
+    
+    @classmethod
+    def _warm_up(cls) -> None:
+        """
+        Load the English model once per process, on the first engine.
+        
+        A throwaway recognition reads eng.traineddata into the OS page
+        cache, so the first real page doesn't pay for the cold read.
+        Failures are ignored; a missing Tesseract is reported when a page
+        is recognized.
+        """
+        if cls._warmed_up:
+            return
+        cls._warmed_up = True
+        
+        try:
+            if tesserocr is not None:
+                tesserocr.PyTessBaseAPI(lang='eng', oem=tesserocr.OEM.DEFAULT).End()
+            else:
+                pytesseract.image_to_string(
+                    Image.new('L', (50, 50), 255), lang='eng', config=cls.CONFIG
+                )
+        except Exception:
+            pass
     
     def extract_text(self, image: Image.Image) -> OCRResult:
         """
@@ -60,60 +188,69 @@ class OCREngine:
             # Preprocess image for better OCR accuracy
             preprocessed_image = self.preprocess_image(image)
             
-            # Custom Tesseract configuration for better accuracy
-            # --psm 1: Automatic page segmentation with OSD (Orientation and Script Detection)
-            # --oem 3: Default OCR Engine Mode (LSTM + Legacy)
-            custom_config = r'--oem 3 --psm 1'
-            
             # Extract detailed OCR data with bounding boxes and confidence scores
             # Output format: level, page_num, block_num, par_num, line_num, word_num,
             #                left, top, width, height, conf, text
-            ocr_data = pytesseract.image_to_data(
-                preprocessed_image,
-                output_type=pytesseract.Output.DICT,
-                lang='eng',
-                config=custom_config
+            if tesserocr is not None:
+                with _OCR_SEMAPHORE:
+                    ocr_data = self._tesserocr_data(preprocessed_image)
+            else:
+                ocr_data = _image_to_data(preprocessed_image, self.CONFIG)
+            
+            # Word boxes, confidence and the full text (rebuilt in reading
+            # order from the same data instead of a second Tesseract run)
+            return self._results_from_data(ocr_data, 1)[0]
+            
+        except pytesseract.TesseractNotFoundError as e:
+            raise OCRProcessingError(
+                f"Tesseract OCR is not installed or not found in PATH: {str(e)}"
             )
+        except Exception as e:
+            raise OCRProcessingError(
+                f"OCR processing failed: {str(e)}"
+            )
+    
+    def extract_text_batch(self, images: List[Image.Image]) -> List[OCRResult]:
+        """
+        Extract text from several page images with a single Tesseract run.
+        
+        Each preprocessed image is written to a temporary directory and
+        Tesseract is given a list file naming them all, so its startup and
+        language model load are paid once instead of once per page. With
+        tesserocr the loaded API already avoids those costs, so the pages
+        are simply recognized one after another.
+        
+        Args:
+            images: PIL Image objects to extract text from, in page order
             
-            # Extract word-level information
-            words: List[WordBox] = []
-            confidences: List[float] = []
+        Returns:
+            One OCRResult per image, in the same order (see extract_text)
             
-            for i in range(len(ocr_data['text'])):
-                text = ocr_data['text'][i].strip()
-                conf = float(ocr_data['conf'][i])
+        Raises:
+            OCRProcessingError: If OCR processing fails
+        """
+        if not images:
+            return []
+        
+        if tesserocr is not None:
+            return [self.extract_text(image) for image in images]
+        
+        try:
+            with tempfile.TemporaryDirectory(prefix='ocr_batch_') as tmp_dir:
+                paths = []
+                for index, image in enumerate(images):
+                    path = os.path.join(tmp_dir, f'page_{index}.png')
+                    # Binary page images barely compress; favour speed
+                    self.preprocess_image(image).save(path, compress_level=1)
+                    paths.append(path)
                 
-                # Skip empty text or invalid confidence scores
-                if not text or conf < 0:
-                    continue
+                list_path = os.path.join(tmp_dir, 'images.txt')
+                with open(list_path, 'w') as list_file:
+                    list_file.write('\n'.join(paths) + '\n')
                 
-                # Create WordBox with position and confidence
-                word_box = WordBox(
-                    text=text,
-                    x=int(ocr_data['left'][i]),
-                    y=int(ocr_data['top'][i]),
-                    width=int(ocr_data['width'][i]),
-                    height=int(ocr_data['height'][i]),
-                    confidence=conf / 100.0  # Convert to 0.0-1.0 range
-                )
-                words.append(word_box)
-                confidences.append(word_box.confidence)
+                ocr_data = _image_to_data(list_path, self.CONFIG, len(images))
             
-            # Calculate overall confidence (average of word confidences)
-            overall_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-            
-            # Extract full text (preserves reading order) with custom config
-            full_text = pytesseract.image_to_string(
-                preprocessed_image, 
-                lang='eng',
-                config=custom_config
-            ).strip()
-            
-            return OCRResult(
-                text=full_text,
-                words=words,
-                confidence=overall_confidence
-            )
+            return self._results_from_data(ocr_data, len(images))
             
         except pytesseract.TesseractNotFoundError as e:
             raise OCRProcessingError(
@@ -124,13 +261,106 @@ class OCREngine:
                 f"OCR processing failed: {str(e)}"
             )
     
+    def _tesserocr_data(self, image: Image.Image) -> Dict[str, List[str]]:
+        """
+        Recognize a preprocessed image through the Tesseract C API.
+        
+        The API is created on first use with the same settings as the
+        command line path (English, --oem 3 --psm 1) and reused by later
+        calls, which are serialized by a lock.
+        
+        Args:
+            image: Preprocessed PIL Image object
+            
+        Returns:
+            TSV output as a dict of columns, in image_to_data's format
+        """
+        with self._api_lock:
+            if self._api is None:
+                self._api = tesserocr.PyTessBaseAPI(
+                    lang='eng', psm=tesserocr.PSM.AUTO_OSD, oem=tesserocr.OEM.DEFAULT
+                )
+            self._api.SetImage(image)
+            tsv = self._api.GetTSVText(0)
+        
+        # Every row has all twelve fields; the text is last and may be empty
+        rows = [line.split('\t', len(_TSV_COLUMNS) - 1) for line in tsv.splitlines()]
+        if not rows:
+            return {name: [] for name in _TSV_COLUMNS}
+        return {name: list(values) for name, values in zip(_TSV_COLUMNS, zip(*rows))}
+    
+    @staticmethod
+    def _results_from_data(ocr_data: Dict[str, List[Any]], page_count: int) -> List[OCRResult]:
+        """
+        Split Tesseract image_to_data output into one OCRResult per page.
+        
+        Rows are filtered and assigned to pages by page_num with NumPy;
+        WordBox objects are only built for the words that are kept. The
+        text of each page is rebuilt from its words: spaces within a line,
+        a newline between lines and a blank line between paragraphs or
+        blocks.
+        
+        Args:
+            ocr_data: image_to_data output as a dict of columns
+            page_count: Number of pages that were recognized
+            
+        Returns:
+            List of OCRResult objects, one per page
+        """
+        # Skip empty text or invalid confidence scores
+        texts = np.char.strip(np.asarray(ocr_data['text'], dtype=str))
+        conf = np.asarray(ocr_data['conf'], dtype=np.float64)
+        keep = np.flatnonzero((conf >= 0) & (np.char.str_len(texts) > 0))
+        
+        def column(name: str) -> np.ndarray:
+            return np.asarray(ocr_data[name], dtype=np.int64)[keep]
+        
+        pages = column('page_num') - 1
+        blocks, pars, lines = column('block_num'), column('par_num'), column('line_num')
+        confidences = conf[keep] / 100.0  # Convert to 0.0-1.0 range
+        
+        # Separator before each word: nothing at the start of a page, a
+        # blank line on a new paragraph or block, a newline on a new line
+        new_page = np.ones(keep.size, dtype=bool)
+        new_page[1:] = pages[1:] != pages[:-1]
+        new_par = new_page.copy()
+        new_par[1:] |= (blocks[1:] != blocks[:-1]) | (pars[1:] != pars[:-1])
+        new_line = new_par.copy()
+        new_line[1:] |= lines[1:] != lines[:-1]
+        separators = np.where(
+            new_page, '', np.where(new_par, '\n\n', np.where(new_line, '\n', ' '))
+        ).tolist()
+        
+        words = [
+            WordBox(text=text, x=x, y=y, width=width, height=height, confidence=confidence)
+            for text, x, y, width, height, confidence in zip(
+                texts[keep].tolist(), column('left').tolist(), column('top').tolist(),
+                column('width').tolist(), column('height').tolist(), confidences.tolist()
+            )
+        ]
+        
+        # Rows come in page order; slice each page's words out of the run
+        bounds = np.searchsorted(pages, np.arange(page_count + 1)).tolist()
+        results = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            page_words = words[start:stop]
+            text = ''.join(chain.from_iterable(zip(
+                separators[start:stop], (word.text for word in page_words)
+            )))
+            # Overall confidence is the average of word confidences
+            confidence = float(confidences[start:stop].mean()) if page_words else 0.0
+            results.append(OCRResult(text=text, words=page_words, confidence=confidence))
+        
+        return results
+    
     def preprocess_image(self, image: Image.Image) -> Image.Image:
         """
         Preprocess an image to improve OCR accuracy.
         
-        Applies image enhancement techniques such as grayscale conversion,
-        contrast adjustment, and noise reduction to improve text recognition
-        quality, especially for low-quality scans.
+        Converts to grayscale, scales small images up and binarizes with an
+        adaptive threshold, which separates text from uneven backgrounds in
+        low-quality scans. Large, sharp images are only converted to
+        grayscale.
         
         Args:
             image: PIL Image object to preprocess
@@ -141,42 +371,45 @@ class OCREngine:
         Requirements:
             - 7.2: Attempt preprocessing to improve recognition for poor quality images
         """
-        from PIL import ImageEnhance, ImageFilter, ImageOps
-        import numpy as np
+        import cv2
         
         # Step 1: Convert to grayscale if not already
         if image.mode != 'L':
             image = image.convert('L')
         
+        # Work on one uint8 buffer from here; PIL only wraps the result
+        img_array = np.asarray(image)
+        
+        # Clean page renders go to Tesseract as they are
+        height, width = img_array.shape
+        if width >= self.CLEAN_IMAGE_MIN_WIDTH:
+            sharpness = cv2.Laplacian(img_array, cv2.CV_32F).var()
+            if sharpness > self.CLEAN_IMAGE_MIN_SHARPNESS:
+                return image
+        
         # Step 2: Increase image size for better OCR (if too small)
-        # OCR works better with larger text
-        width, height = image.size
-        if width < 1800 or height < 1800:
-            scale_factor = max(1800 / width, 1800 / height)
+        # OCR works better with larger text, but page renders (and images
+        # known to be at least 200 DPI) are already large enough; only
+        # small images are scaled up, to 1500px on the longer side
+        dpi = image.info.get('dpi')
+        high_dpi = dpi is not None and min(dpi) >= 200
+        if not high_dpi and width < 1000 and height < 1000:
+            scale_factor = 1500 / max(width, height)
             new_width = int(width * scale_factor)
             new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            img_array = cv2.resize(
+                img_array, (new_width, new_height), interpolation=cv2.INTER_LINEAR
+            )
         
         # Step 3: Apply adaptive thresholding for better text/background separation
-        # Convert to numpy array for processing
-        img_array = np.array(image)
-        
-        # Calculate adaptive threshold
-        from scipy import ndimage
-        # Apply Gaussian blur for local threshold calculation
-        blurred = ndimage.gaussian_filter(img_array, sigma=5)
-        
-        # Threshold: pixels darker than local average become black, others white
-        threshold = img_array > (blurred - 10)
-        img_array = np.where(threshold, 255, 0).astype(np.uint8)
-        
-        image = Image.fromarray(img_array)
-        
-        # Step 4: Apply contrast adjustment to enhance text visibility
-        enhancer = ImageEnhance.Contrast(image)
-        image = enhancer.enhance(2.0)
-        
-        # Step 5: Apply sharpening to enhance text edges
-        image = image.filter(ImageFilter.SHARPEN)
+        # Threshold: pixels darker than the Gaussian-weighted local average
+        # (minus 10) become black, others white, in one OpenCV pass.
+        # A 31px block gives OpenCV's default kernel sigma of exactly 5.
+        # The result is already pure black and white: contrast stretching
+        # would not change it, and sharpening only adds halo pixels.
+        img_array = cv2.adaptiveThreshold(
+            img_array, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+            blockSize=31, C=10
+        )
         
-        return image
+        return Image.fromarray(img_array)
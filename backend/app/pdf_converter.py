@@ -5,17 +5,21 @@ This module coordinates all components to convert PDF files to Word documents.
 Uses pdf2docx for direct conversion (preserves structure) and falls back to OCR for scanned pages.
 """
 
-from typing import List, Callable, Optional, Dict, Any
+from typing import List, Callable, Optional, Dict, Any, Iterator, Tuple, Union
 import os
 import logging
+import multiprocessing
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 import fitz  # PyMuPDF
+from PIL import Image
 from pdf2docx import Converter
 from app.document_parser import DocumentParser
 from app.ocr_engine import OCREngine
 from app.layout_analyzer import LayoutAnalyzer
 from app.word_generator import WordGenerator
 from app.text_processor import TextProcessor
-from app.models import DocumentStructure, StructureElement, OCRResult, WordBox
+from app.models import DocumentStructure, StructureElement, OCRResult, PageImage, WordBox
 from app.exceptions import (
     ConversionError,
     PDFValidationError,
@@ -26,6 +30,63 @@ from app.exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Text extraction flags for the PyMuPDF strategy: the default "dict" flags
+# also copy every image on the page into the result as raw bytes, which the
+# converter never reads
+_TEXT_DICT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def _ocr_batch(engine: Any, images: List[Image.Image]) -> List[Union[OCRResult, Exception]]:
+    """
+    OCR a run of pages with one engine call (extract_text_batch).
+    
+    If the batch fails, its pages are retried one at a time so only the
+    pages that really fail are reported; their entries hold the error.
+    """
+    try:
+        return engine.extract_text_batch(images)
+    except Exception:
+        outcomes: List[Union[OCRResult, Exception]] = []
+        for image in images:
+            try:
+                outcomes.append(engine.extract_text(image))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+
+def _report_parsed_pages(cv: Converter, progress_callback: Callable[[int, int], None]) -> None:
+    """
+    Make a pdf2docx Converter report progress as it parses each page.
+    
+    The Converter's parse_pages is wrapped on the instance so that, once
+    its pages are loaded, each page's parse is followed by a progress
+    call from the converting thread. Callback errors are ignored.
+    
+    Args:
+        cv: pdf2docx Converter about to convert in this process
+        progress_callback: Called with (pages parsed, pages to parse)
+    """
+    parse_pages = cv.parse_pages
+    
+    def report_after(parse: Callable, done: int, total: int) -> Callable:
+        def parse_and_report(**kwargs):
+            result = parse(**kwargs)
+            try:
+                progress_callback(done, total)
+            except Exception:
+                pass
+            return result
+        return parse_and_report
+    
+    def parse_pages_with_progress(**kwargs):
+        pages = [page for page in cv.pages if not page.skip_parsing]
+        for done, page in enumerate(pages, start=1):
+            page.parse = report_after(page.parse, done, len(pages))
+        return parse_pages(**kwargs)
+    
+    cv.parse_pages = parse_pages_with_progress
+
 
 class PDFConverter:
     """
@@ -36,6 +97,26 @@ class PDFConverter:
     2. Falls back to OCR pipeline for scanned pages if needed
     """
     
+    # Pages OCRed per engine call (one Tesseract run, or one Surya GPU
+    # batch); larger batches save little more and delay the first results
+    OCR_BATCH_PAGES = 8
+    
+    # pdf2docx converts documents with at least this many pages in up to
+    # PDF2DOCX_MAX_WORKERS processes (its built-in multi_processing mode).
+    # Only the synchronous servers (run_without_redis.py, full_server.py)
+    # get this: Celery prefork children are daemonic and can't start
+    # processes, so Celery workers always convert in-process
+    PDF2DOCX_PARALLEL_MIN_PAGES = 4
+    PDF2DOCX_MAX_WORKERS = 8
+    
+    # Pages are rendered on a background thread at most this many pages
+    # ahead of the pipeline, bounding the images held
+    RENDER_PREFETCH_PAGES = 2
+    
+    # Render resolution for Tesseract pages: its accuracy sweet spot, and
+    # a third of the pixels of the parser's 300 DPI default
+    TESSERACT_DPI = 200
+    
     def __init__(self, ocr_engine: str = None):
             """
             Initialize the PDF converter with all pipeline components.
@@ -46,8 +127,6 @@ class PDFConverter:
             """
             from app.config import Config
 
-            self.parser = DocumentParser()
-
             # Select OCR engine based on configuration
             if ocr_engine is None:
                 ocr_engine = Config.validate_ocr_engine()
@@ -61,7 +140,15 @@ class PDFConverter:
                 self.ocr_engine = OCREngine()
                 logger.info("Using Tesseract OCR engine (fast mode)")
 
-            self.layout_analyzer = LayoutAnalyzer()
+            # Pages are only rendered for OCR. Tesseract gets gray renders
+            # at TESSERACT_DPI; Surya's models take RGB, and text-dense
+            # pages OCR fine at a lower resolution
+            if ocr_engine == 'surya':
+                self.parser = DocumentParser(adaptive_dpi=True)
+            else:
+                self.parser = DocumentParser(dpi=self.TESSERACT_DPI, grayscale=True)
+
+            self.layout_analyzer = LayoutAnalyzer(line_grouping=Config.LINE_GROUPING)
             self.word_generator = WordGenerator()
             self.text_processor = TextProcessor()
 
@@ -118,7 +205,7 @@ class PDFConverter:
     
     def _convert_with_pymupdf_text_extraction(
         self,
-        pdf_path: str,
+        doc: fitz.Document,
         output_path: str,
         progress_callback: Optional[Callable[[int, int], None]] = None
     ) -> bool:
@@ -129,7 +216,7 @@ class PDFConverter:
         then creates a Word document preserving the structure.
         
         Args:
-            pdf_path: Path to input PDF
+            doc: Open PyMuPDF document (left open; the caller closes it)
             output_path: Path for output Word file
             progress_callback: Optional progress callback
             
@@ -141,8 +228,6 @@ class PDFConverter:
             from docx.shared import Pt, Inches
             from docx.enum.text import WD_ALIGN_PARAGRAPH
             
-            # Open PDF
-            doc = fitz.open(pdf_path)
             total_pages = len(doc)
             
             # Create Word document
@@ -156,28 +241,30 @@ class PDFConverter:
                 page = doc[page_num]
                 
                 # Extract text with layout preservation
-                # Use "dict" mode to get detailed layout information
-                text_dict = page.get_text("dict")
+                # Use "dict" mode to get detailed layout information (font
+                # sizes); image blocks are left out of it, see _TEXT_DICT_FLAGS
+                text_dict = page.get_text("dict", flags=_TEXT_DICT_FLAGS)
                 
                 # Process blocks (paragraphs)
                 for block in text_dict["blocks"]:
                     if block["type"] == 0:  # Text block
-                        # Extract text from all lines in the block
-                        block_text = ""
-                        for line in block.get("lines", []):
-                            line_text = ""
-                            for span in line.get("spans", []):
-                                line_text += span.get("text", "")
-                            if line_text.strip():
-                                block_text += line_text + "\n"
+                        # Join the spans of each line and the non-blank lines
+                        lines = block.get("lines", [])
+                        line_texts = (
+                            ''.join(span.get("text", "") for span in line.get("spans", []))
+                            for line in lines
+                        )
+                        block_text = '\n'.join(
+                            line_text for line_text in line_texts if line_text.strip()
+                        ).strip()
                         
-                        if block_text.strip():
+                        if block_text:
                             # Add paragraph to Word document
-                            para = word_doc.add_paragraph(block_text.strip())
+                            para = word_doc.add_paragraph(block_text)
                             
                             # Try to preserve some formatting
-                            if block.get("lines"):
-                                first_span = block["lines"][0].get("spans", [{}])[0]
+                            if lines:
+                                first_span = lines[0].get("spans", [{}])[0]
                                 font_size = first_span.get("size", 12)
                                 
                                 # Set font size
@@ -194,9 +281,6 @@ class PDFConverter:
                 if page_num < total_pages - 1:
                     word_doc.add_page_break()
             
-            # Close PDF
-            doc.close()
-            
             # Save Word document
             word_doc.save(output_path)
             
@@ -210,11 +294,53 @@ class PDFConverter:
             print(f"PyMuPDF text extraction failed: {e}")
             return False
     
+    def _run_pdf2docx(
+        self,
+        cv: Converter,
+        output_path: str,
+        total_pages: int,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> None:
+        """
+        Run a pdf2docx conversion, splitting longer documents across processes.
+        
+        pdf2docx's multi_processing mode parses contiguous page ranges in
+        separate processes and writes a single document, so no merging is
+        needed here. A daemonic process may not start processes, so this
+        only applies when converting in a regular process (the synchronous
+        servers); in a Celery prefork child, which is always daemonic, the
+        document is converted in-process and scaling comes from worker
+        concurrency.
+        
+        Args:
+            cv: Open pdf2docx Converter (closed here)
+            output_path: Path for output Word file
+            total_pages: Number of pages in the PDF
+            progress_callback: Optional progress callback, called as each
+                page is parsed in-process (child processes can't report)
+        """
+        workers = min(os.cpu_count() or 1, self.PDF2DOCX_MAX_WORKERS, total_pages)
+        can_start_processes = not multiprocessing.current_process().daemon
+        
+        try:
+            if (can_start_processes and workers > 1
+                    and total_pages >= self.PDF2DOCX_PARALLEL_MIN_PAGES):
+                cv.convert(output_path, start=0, end=None,
+                           multi_processing=True, cpu_count=workers)
+                return
+            
+            if progress_callback:
+                _report_parsed_pages(cv, progress_callback)
+            cv.convert(output_path, start=0, end=None)
+        finally:
+            cv.close()
+    
     def _convert_with_pdf2docx(
         self,
         pdf_path: str,
         output_path: str,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        total_pages: Optional[int] = None
     ) -> bool:
         """
         Try to convert PDF using pdf2docx library with progress updates.
@@ -223,47 +349,24 @@ class PDFConverter:
             pdf_path: Path to input PDF
             output_path: Path for output Word file
             progress_callback: Optional progress callback
+            total_pages: Page count, if already known (read from the PDF otherwise)
             
         Returns:
             True if successful, False if should fall back to OCR
         """
-        import threading
-        import time
-        
         try:
             # Create converter
             cv = Converter(pdf_path)
             
             # Get page count for progress tracking
-            doc = fitz.open(pdf_path)
-            total_pages = len(doc)
-            doc.close()
+            if total_pages is None:
+                doc = fitz.open(pdf_path)
+                total_pages = len(doc)
+                doc.close()
             
-            # Flag to control progress thread
-            conversion_complete = threading.Event()
-            
-            # Start a background thread to simulate progress updates
-            def update_progress():
-                current = 0
-                while not conversion_complete.is_set() and current < total_pages:
-                    current = min(current + 1, total_pages - 1)
-                    if progress_callback:
-                        try:
-                            progress_callback(current, total_pages)
-                        except:
-                            pass
-                    time.sleep(0.5)  # Update every 0.5 seconds
-            
-            # Start progress thread
-            progress_thread = threading.Thread(target=update_progress, daemon=True)
-            progress_thread.start()
-            
-            # Perform conversion
-            cv.convert(output_path, start=0, end=None)
-            cv.close()
-            
-            # Signal completion
-            conversion_complete.set()
+            # Perform conversion (reports progress page by page when the
+            # pages are parsed in this process)
+            self._run_pdf2docx(cv, output_path, total_pages, progress_callback)
             
             # Post-process to fix spacing issues
             try:
@@ -290,6 +393,76 @@ class PDFConverter:
             print(f"pdf2docx conversion failed: {e}")
             return False
     
+    @staticmethod
+    def _page_jobs(load: Callable[[], list], count: int) -> List[Callable[[], OCRResult]]:
+        """
+        Split the outcome of one OCR run into a callable per page.
+        
+        Args:
+            load: Callable returning the run's outcomes (see _ocr_batch)
+            count: Number of pages in the run
+            
+        Returns:
+            List of callables returning each page's OCRResult (raising the
+            page's OCR error, if any)
+        """
+        outcomes: list = []
+        
+        def page_result(offset: int) -> Callable[[], OCRResult]:
+            def result() -> OCRResult:
+                # The first page of a run to be asked for loads the whole run
+                if not outcomes:
+                    outcomes.extend(load())
+                outcome = outcomes[offset]
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            return result
+        
+        return [page_result(offset) for offset in range(count)]
+    
+    def _ocr_page_stream(
+        self, page_images: Iterator[PageImage]
+    ) -> Iterator[Tuple[PageImage, Callable[[], OCRResult]]]:
+        """
+        OCR pages in runs as they are rendered, a run ahead of the caller.
+        
+        Each run of OCR_BATCH_PAGES pages goes to one background OCR thread
+        as soon as it has been rendered, and the previous run's pages are
+        only handed out after that. So rendering the next pages (see
+        DocumentParser.iter_pages), OCR of the current run and the caller's
+        layout analysis of the previous one all overlap.
+        
+        Args:
+            page_images: Rendered pages, in page order
+            
+        Yields:
+            (page_image, job) pairs in page order, where job returns the
+            page's OCRResult (raising the page's OCR error, if any)
+        """
+        pages = iter(page_images)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr')
+        try:
+            ready: List[Tuple[PageImage, Callable[[], OCRResult]]] = []
+            while True:
+                batch = list(islice(pages, self.OCR_BATCH_PAGES))
+                if not batch:
+                    break
+                future = executor.submit(
+                    _ocr_batch, self.ocr_engine, [page_image.image for page_image in batch]
+                )
+                # Hand out the previous run while this one is recognized
+                yield from ready
+                ready = list(zip(batch, self._page_jobs(future.result, len(batch))))
+            yield from ready
+        finally:
+            # Submitted runs still complete; the thread exits after the last
+            executor.shutdown(wait=False)
+            # Stop the page source too (iter_pages' render thread)
+            close_pages = getattr(pages, 'close', None)
+            if close_pages is not None:
+                close_pages()
+    
     def convert(
         self,
         pdf_path: str,
@@ -324,15 +497,65 @@ class PDFConverter:
             - 5.3: Continue processing on page failures
             - 6.1: Comprehensive error handling
         """
+        # Validate and open the PDF once; text extraction and the OCR
+        # fallback's page rendering both read this handle
+        doc = self._open_pdf(pdf_path)
+        try:
+            return self._convert_document(doc, pdf_path, output_path, progress_callback)
+        finally:
+            doc.close()
+    
+    def _open_pdf(self, pdf_path: str) -> fitz.Document:
+        """
+        Validate and open a PDF for conversion.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Open PyMuPDF document (the caller closes it)
+            
+        Raises:
+            PDFValidationError: With the same messages as validate_pdf
+        """
+        # Check if file exists
+        if not os.path.exists(pdf_path):
+            raise PDFValidationError(f"PDF file not found: {pdf_path}")
+        
+        # Check if file is readable
+        if not os.access(pdf_path, os.R_OK):
+            raise PDFValidationError(f"PDF file is not readable: {pdf_path}")
+        
+        try:
+            return self.parser.open_document(pdf_path)
+        except Exception as e:
+            raise PDFValidationError(f"Invalid or corrupted PDF file: {str(e)}")
+    
+    def _convert_document(
+        self,
+        doc: fitz.Document,
+        pdf_path: str,
+        output_path: Optional[str],
+        progress_callback: Optional[Callable[[int, int], None]]
+    ) -> Dict[str, Any]:
+        """
+        Run the conversion strategies on an open PDF (see convert).
+        
+        pdf2docx opens pdf_path itself; it has no way to take a document.
+        
+        Args:
+            doc: Open PyMuPDF document (left open; convert closes it)
+            pdf_path: Path to the PDF file
+            output_path: Path for output Word file (optional)
+            progress_callback: Optional callback function(current_page, total_pages)
+            
+        Returns:
+            Dictionary with conversion result (see convert)
+        """
         errors = []
         pages_failed = []
         
-        # Validate PDF
-        validation = self.validate_pdf(pdf_path)
-        if not validation["valid"]:
-            raise PDFValidationError(validation["error"])
-        
-        total_pages = validation["page_count"]
+        total_pages = len(doc)
         
         # Determine output path
         if output_path is None:
@@ -342,7 +565,7 @@ class PDFConverter:
         
         # Try PyMuPDF text extraction first (best for text-based PDFs)
         try:
-            if self._convert_with_pymupdf_text_extraction(pdf_path, output_path, progress_callback):
+            if self._convert_with_pymupdf_text_extraction(doc, output_path, progress_callback):
                 # Success! Return result
                 return {
                     "success": True,
@@ -357,7 +580,7 @@ class PDFConverter:
         
         # Try pdf2docx as fallback (preserves structure but may have spacing issues)
         try:
-            if self._convert_with_pdf2docx(pdf_path, output_path, progress_callback):
+            if self._convert_with_pdf2docx(pdf_path, output_path, progress_callback, total_pages):
                 # Success! Return result
                 return {
                     "success": True,
@@ -372,52 +595,51 @@ class PDFConverter:
         
         # Fall back to OCR pipeline for scanned documents
         try:
-            # Open PDF document
-            doc = fitz.open(pdf_path)
-            
             # Process each page through the OCR pipeline
             document_structures = []
             
-            for page_idx in range(len(doc)):
-                page_number = page_idx + 1
-                
-                try:
-                    # Update progress
-                    if progress_callback:
-                        progress_callback(page_number, total_pages)
-                    
-                    page = doc[page_idx]
-                    
-                    # Extract page as image for OCR
-                    page_images = self.parser.extract_pages(pdf_path)
-                    page_image = page_images[page_idx]
-                    
-                    # Perform OCR
-                    ocr_result = self.ocr_engine.extract_text(page_image.image)
-                    
-                    # Analyze layout
-                    structure = self.layout_analyzer.analyze(ocr_result)
-                    
-                    document_structures.append(structure)
-                    
-                except OCRProcessingError as e:
-                    # Log OCR error and continue
-                    error_msg = f"Page {page_number}: OCR failed - {str(e)}"
-                    errors.append(error_msg)
-                    pages_failed.append(page_number)
-                    # Add empty structure for failed page
-                    document_structures.append(DocumentStructure(elements=[]))
+            # OCR runs on a background thread one page run at a time, so
+            # render pages as they are needed, overlapping the OCR of
+            # earlier ones
+            pages = self._ocr_page_stream(
+                self.parser.iter_pages(pdf_path, prefetch=self.RENDER_PREFETCH_PAGES, doc=doc)
+            )
+            
+            try:
+                for page_image, ocr_job in pages:
+                    page_number = page_image.page_number
                     
-                except Exception as e:
-                    # Log unexpected error and continue
-                    error_msg = f"Page {page_number}: Processing failed - {str(e)}"
-                    errors.append(error_msg)
-                    pages_failed.append(page_number)
-                    # Add empty structure for failed page
-                    document_structures.append(DocumentStructure(elements=[]))
-            
-            # Close PDF document
-            doc.close()
+                    try:
+                        # Update progress
+                        if progress_callback:
+                            progress_callback(page_number, total_pages)
+                        
+                        # Perform OCR
+                        ocr_result = ocr_job()
+                        
+                        # Analyze layout
+                        structure = self.layout_analyzer.analyze(ocr_result)
+                        
+                        document_structures.append(structure)
+                        
+                    except OCRProcessingError as e:
+                        # Log OCR error and continue
+                        error_msg = f"Page {page_number}: OCR failed - {str(e)}"
+                        errors.append(error_msg)
+                        pages_failed.append(page_number)
+                        # Add empty structure for failed page
+                        document_structures.append(DocumentStructure(elements=[]))
+                        
+                    except Exception as e:
+                        # Log unexpected error and continue
+                        error_msg = f"Page {page_number}: Processing failed - {str(e)}"
+                        errors.append(error_msg)
+                        pages_failed.append(page_number)
+                        # Add empty structure for failed page
+                        document_structures.append(DocumentStructure(elements=[]))
+            finally:
+                # Stop rendering before convert closes the document
+                pages.close()
             
             # Generate Word document from all structures
             try:
@@ -5,12 +5,37 @@ This module provides a Redis client with connection pooling for efficient
 connection management and reuse across the application.
 """
 
+import socket
 import redis
-from redis.connection import ConnectionPool
-from typing import Optional
+from redis.connection import BlockingConnectionPool, ConnectionPool
+from typing import Dict, Optional
 from app.config import Config
 
 
+def _keepalive_options(config: Config) -> Dict[int, int]:
+    """
+    Build TCP keep-alive socket options for the platform.
+    
+    Only options the running platform supports are included, so the
+    result is empty on systems without per-socket keep-alive tuning.
+    
+    Args:
+        config: Configuration object containing Redis settings
+        
+    Returns:
+        dict: Mapping of socket option constants to values
+    """
+    idle = config.REDIS_KEEPALIVE_IDLE
+    options = {}
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        options[socket.TCP_KEEPIDLE] = idle
+    if hasattr(socket, 'TCP_KEEPINTVL'):
+        options[socket.TCP_KEEPINTVL] = max(idle // 6, 1)
+    if hasattr(socket, 'TCP_KEEPCNT'):
+        options[socket.TCP_KEEPCNT] = 3
+    return options
+
+
 class RedisClient:
     """
     Redis client with connection pooling.
@@ -18,6 +43,19 @@ class RedisClient:
     This class manages a connection pool to Redis and provides methods
     for getting Redis connections. The connection pool is shared across
     the application to efficiently manage connections.
+    
+    The pool blocks for a free connection instead of failing when all
+    connections are busy, keeps idle sockets alive (probing well before a
+    load balancer's idle timeout; see _keepalive_options), and
+    health-checks them before reuse. redis-py already sets TCP_NODELAY on
+    every TCP connection, so small commands are never held back by Nagle.
+    redis-py pools detect a changed PID and reset themselves, so a pool
+    created before a gunicorn or Celery fork is safe to inherit.
+    
+    The client is deliberately synchronous: the API runs on gevent workers
+    (see gunicorn.conf.py), where the monkey-patched sockets make a Redis
+    call yield to other requests instead of blocking the worker, and the
+    Celery tasks and JobManager are synchronous code.
     """
     
     _pool: Optional[ConnectionPool] = None
@@ -34,18 +72,34 @@ class RedisClient:
         if cls._pool is not None:
             return  # Already initialized
         
+        # Client-side caching: the server invalidates cached keys on every
+        # connection that read them, so repeated reads skip the round trip
+        cache_options = {}
+        if config.REDIS_CLIENT_CACHE_SIZE > 0:
+            from redis.cache import CacheConfig
+            cache_options = {
+                'protocol': 3,  # Invalidation pushes need RESP3
+                'cache_config': CacheConfig(max_size=config.REDIS_CLIENT_CACHE_SIZE),
+            }
+        
         # Create connection pool with configuration
-        cls._pool = ConnectionPool(
+        cls._pool = BlockingConnectionPool(
             host=config.REDIS_HOST,
             port=config.REDIS_PORT,
             db=config.REDIS_DB,
             password=config.REDIS_PASSWORD,
             max_connections=config.REDIS_MAX_CONNECTIONS,
+            timeout=config.REDIS_SOCKET_TIMEOUT,  # Wait for a free connection
             socket_timeout=config.REDIS_SOCKET_TIMEOUT,
             socket_connect_timeout=config.REDIS_SOCKET_CONNECT_TIMEOUT,
             socket_keepalive=config.REDIS_SOCKET_KEEPALIVE,
+            socket_keepalive_options=(
+                _keepalive_options(config) if config.REDIS_SOCKET_KEEPALIVE else None
+            ),
+            health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
             retry_on_timeout=config.REDIS_RETRY_ON_TIMEOUT,
-            decode_responses=True  # Automatically decode responses to strings
+            decode_responses=True,  # Automatically decode responses to strings
+            **cache_options
         )
         
         # Create Redis client using the pool
@@ -68,6 +122,30 @@ class RedisClient:
             )
         return cls._client
     
+    @classmethod
+    def pipeline(cls, transaction: bool = False) -> redis.client.Pipeline:
+        """
+        Get a pipeline that sends its queued commands in one round trip.
+        
+        Batch related reads (for example several job statuses polled
+        together) instead of issuing one request per key::
+        
+            with RedisClient.pipeline() as pipe:
+                pipe.hgetall(key_a)
+                pipe.hgetall(key_b)
+                job_a, job_b = pipe.execute()
+        
+        Args:
+            transaction: Wrap the commands in MULTI/EXEC
+            
+        Returns:
+            redis.client.Pipeline: Pipeline on the shared client
+            
+        Raises:
+            RuntimeError: If Redis client is not initialized
+        """
+        return cls.get_client().pipeline(transaction=transaction)
+    
     @classmethod
     def ping(cls) -> bool:
         """
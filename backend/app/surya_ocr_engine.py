@@ -5,14 +5,29 @@ This module provides OCR functionality using Surya OCR, which offers better accu
 for complex documents with tables, symbols, and multi-column layouts compared to Tesseract.
 """
 
+import threading
+import numpy as np
 from PIL import Image
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 import logging
 from app.models import OCRResult, WordBox
 from app.exceptions import OCRProcessingError
 
 logger = logging.getLogger(__name__)
 
+# Surya models and processors keyed by name, shared by every engine in the
+# process so the weights are only loaded once per worker
+_MODEL_CACHE: Dict[str, Any] = {}
+_model_cache_lock = threading.Lock()
+
+
+def _cached_model(name: str, loader: Callable[[], Any]) -> Any:
+    """Return the cached model for name, loading it on first use."""
+    with _model_cache_lock:
+        if name not in _MODEL_CACHE:
+            _MODEL_CACHE[name] = loader()
+        return _MODEL_CACHE[name]
+
 
 class SuryaOCREngine:
     """
@@ -27,6 +42,12 @@ class SuryaOCREngine:
     Trade-off: Slower processing than Tesseract but significantly better quality.
     """
     
+    # Batched pages are grouped by size before each run_ocr call: a group
+    # holds at most BUCKET_MAX_BATCH images whose longer side is within
+    # BUCKET_SIZE_THRESHOLD of its smallest one, so Surya pads little
+    BUCKET_MAX_BATCH = 8
+    BUCKET_SIZE_THRESHOLD = 0.2
+    
     def __init__(self):
         """Initialize the Surya OCR Engine and load models."""
         self._model = None
@@ -35,7 +56,12 @@ class SuryaOCREngine:
         logger.info("SuryaOCREngine initialized (models will load on first use)")
     
     def _ensure_initialized(self):
-        """Lazy load Surya models on first use to avoid startup delays."""
+        """
+        Lazy load Surya models on first use to avoid startup delays.
+        
+        The models are cached for the whole process (see _MODEL_CACHE), so
+        only the first engine in a worker pays for loading them.
+        """
         if self._initialized:
             return
         
@@ -47,11 +73,11 @@ class SuryaOCREngine:
             from surya.model.recognition.model import load_model as load_rec_model
             from surya.model.recognition.processor import load_processor as load_rec_processor
             
-            # Load detection and recognition models
-            self._det_model = load_det_model()
-            self._det_processor = load_det_processor()
-            self._rec_model = load_rec_model()
-            self._rec_processor = load_rec_processor()
+            # Load detection and recognition models (once per process)
+            self._det_model = _cached_model('detection_model', load_det_model)
+            self._det_processor = _cached_model('detection_processor', load_det_processor)
+            self._rec_model = _cached_model('recognition_model', load_rec_model)
+            self._rec_processor = _cached_model('recognition_processor', load_rec_processor)
             
             self._initialized = True
             logger.info("Surya OCR models loaded successfully")
@@ -65,6 +91,15 @@ class SuryaOCREngine:
                 f"Failed to initialize Surya OCR models: {str(e)}"
             )
     
+    def load_models(self) -> None:
+        """
+        Load the Surya models now rather than on first use.
+        
+        Raises:
+            OCRProcessingError: If Surya is not installed or fails to load
+        """
+        self._ensure_initialized()
+    
     def extract_text(self, image: Image.Image) -> OCRResult:
         """
         Extract text from an image using Surya OCR with layout analysis.
@@ -93,92 +128,202 @@ class SuryaOCREngine:
             - 2.5: Provide confidence scores for recognized text
             - 3.1, 3.2, 3.3: Layout analysis (paragraphs, headings, tables)
         """
+        return self.extract_text_batch([image])[0]
+    
+    def extract_text_batch(self, images: List[Image.Image]) -> List[OCRResult]:
+        """
+        Extract text from several page images with batched Surya runs.
+        
+        The preprocessed images are grouped into buckets of similar size
+        (see _size_buckets) and each bucket is passed to one run_ocr call,
+        so Surya's detection and recognition batchers can fill the GPU
+        without padding small pages up to the largest one, and without
+        paying the per-call overhead once per page.
+        
+        Args:
+            images: PIL Image objects to extract text from, in page order
+            
+        Returns:
+            One OCRResult per image, in the same order (see extract_text)
+            
+        Raises:
+            OCRProcessingError: If OCR processing fails
+        """
+        if not images:
+            return []
+        
         try:
             # Ensure models are loaded
             self._ensure_initialized()
             
-            # Import Surya functions
-            from surya.ocr import run_ocr
-            from surya.languages import CODE_TO_LANGUAGE
+            # Preprocess images for better results
+            preprocessed_images = [self.preprocess_image(image) for image in images]
             
-            # Preprocess image for better results
-            preprocessed_image = self.preprocess_image(image)
+            results: List[Optional[OCRResult]] = [None] * len(images)
+            for bucket in self._size_buckets(preprocessed_images):
+                bucket_results = self._run_ocr([preprocessed_images[i] for i in bucket])
+                for index, result in zip(bucket, bucket_results):
+                    results[index] = result
             
-            # Run Surya OCR
-            # Surya expects a list of images and language codes
-            langs = [["en"]]  # English language
+            return results
             
-            logger.info("Running Surya OCR on image...")
-            predictions = run_ocr(
-                [preprocessed_image],
-                langs,
-                self._det_model,
-                self._det_processor,
-                self._rec_model,
-                self._rec_processor
+        except Exception as e:
+            logger.error(f"Surya OCR processing failed: {str(e)}")
+            raise OCRProcessingError(
+                f"Surya OCR processing failed: {str(e)}"
             )
+    
+    def _size_buckets(self, images: List[Image.Image]) -> List[List[int]]:
+        """
+        Group images of similar size for batching.
+        
+        Images are taken in order of their longer side; a bucket is closed
+        when it is full or the next image is more than BUCKET_SIZE_THRESHOLD
+        larger than the bucket's first (smallest) image.
+        
+        Args:
+            images: Preprocessed images
             
-            # Extract results from first (and only) image
-            if not predictions or len(predictions) == 0:
-                logger.warning("Surya OCR returned no results")
-                return OCRResult(text="", words=[], confidence=0.0)
-            
-            result = predictions[0]
-            
-            # Extract word-level information
-            words: List[WordBox] = []
-            confidences: List[float] = []
-            full_text_parts: List[str] = []
-            
-            # Process text lines from Surya
-            for text_line in result.text_lines:
-                line_text = text_line.text.strip()
-                if not line_text:
-                    continue
-                
-                # Get bounding box for the line
-                bbox = text_line.bbox
-                confidence = getattr(text_line, 'confidence', 0.95)  # Surya typically has high confidence
-                
-                # Create WordBox for each word in the line
-                # Split line into words and estimate positions
-                line_words = line_text.split()
-                if line_words:
-                    word_width = (bbox[2] - bbox[0]) / len(line_words)
-                    
-                    for idx, word_text in enumerate(line_words):
-                        word_box = WordBox(
-                            text=word_text,
-                            x=int(bbox[0] + idx * word_width),
-                            y=int(bbox[1]),
-                            width=int(word_width),
-                            height=int(bbox[3] - bbox[1]),
-                            confidence=confidence
-                        )
-                        words.append(word_box)
-                        confidences.append(confidence)
-                
-                full_text_parts.append(line_text)
-            
-            # Combine all text with proper line breaks
-            full_text = "\n".join(full_text_parts)
+        Returns:
+            Buckets of indexes into images
+        """
+        order = sorted(range(len(images)), key=lambda i: max(images[i].size))
+        
+        buckets: List[List[int]] = []
+        limit = 0.0
+        for index in order:
+            side = max(images[index].size)
+            if buckets and len(buckets[-1]) < self.BUCKET_MAX_BATCH and side <= limit:
+                buckets[-1].append(index)
+            else:
+                buckets.append([index])
+                limit = side * (1 + self.BUCKET_SIZE_THRESHOLD)
+        return buckets
+    
+    def _run_ocr(self, images: List[Image.Image]) -> List[OCRResult]:
+        """
+        Run Surya OCR once on a batch of preprocessed images.
+        
+        Args:
+            images: Preprocessed images (models must be loaded)
             
-            # Calculate overall confidence
-            overall_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        Returns:
+            One OCRResult per image, in the same order
+        """
+        # Import Surya functions
+        from surya.ocr import run_ocr
+        
+        # Run Surya OCR
+        # Surya expects a list of images and one language list per image
+        langs = [["en"]] * len(images)  # English language
+        
+        logger.info(f"Running Surya OCR on {len(images)} image(s)...")
+        predictions = run_ocr(
+            images,
+            langs,
+            self._det_model,
+            self._det_processor,
+            self._rec_model,
+            self._rec_processor
+        )
+        
+        if not predictions or len(predictions) == 0:
+            logger.warning("Surya OCR returned no results")
+            return [OCRResult(text="", words=[], confidence=0.0) for _ in images]
+        
+        if len(predictions) != len(images):
+            raise ValueError(
+                f"expected {len(images)} predictions, got {len(predictions)}"
+            )
+        
+        return [self._process_prediction(prediction) for prediction in predictions]
+    
+    def _process_prediction(self, result) -> OCRResult:
+        """
+        Build an OCRResult from Surya's prediction for one image.
+        
+        Args:
+            result: Surya OCR result for a single image
             
-            logger.info(f"Surya OCR extracted {len(words)} words with {overall_confidence:.2%} confidence")
+        Returns:
+            OCRResult with the image's lines, estimated word boxes and
+            average confidence
+        """
+        # Lines with text, as (words, bbox, confidence)
+        lines = []
+        confidences: List[float] = []
+        full_text_parts: List[str] = []
+        
+        # Process text lines from Surya
+        for text_line in result.text_lines:
+            line_text = text_line.text.strip()
+            if not line_text:
+                continue
             
-            return OCRResult(
-                text=full_text,
-                words=words,
-                confidence=overall_confidence
-            )
+            confidence = getattr(text_line, 'confidence', 0.95)  # Surya typically has high confidence
+            line_words = line_text.split()
+            lines.append((line_words, text_line.bbox, confidence))
+            confidences.extend([confidence] * len(line_words))
+            full_text_parts.append(line_text)
+        
+        words = self._estimate_word_boxes(lines)
+        
+        # Combine all text with proper line breaks
+        full_text = "\n".join(full_text_parts)
+        
+        # Calculate overall confidence
+        overall_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        
+        logger.info(f"Surya OCR extracted {len(words)} words with {overall_confidence:.2%} confidence")
+        
+        return OCRResult(
+            text=full_text,
+            words=words,
+            confidence=overall_confidence
+        )
+    
+    @staticmethod
+    def _estimate_word_boxes(lines) -> List[WordBox]:
+        """
+        Split each line's bounding box evenly between its words.
+        
+        Surya only returns line boxes, so every word gets an equal share
+        of the line width. The positions for the whole page are computed
+        in one pass with NumPy.
+        
+        Args:
+            lines: (words, bbox, confidence) for each non-empty line
             
-        except Exception as e:
-            logger.error(f"Surya OCR processing failed: {str(e)}")
-            raise OCRProcessingError(
-                f"Surya OCR processing failed: {str(e)}"
+        Returns:
+            List of WordBox objects in reading order
+        """
+        if not lines:
+            return []
+        
+        counts = np.array([len(line_words) for line_words, _, _ in lines])
+        boxes = np.array([bbox[:4] for _, bbox, _ in lines], dtype=np.float64)
+        word_widths = (boxes[:, 2] - boxes[:, 0]) / counts
+        
+        # Index of each word within its line
+        first_word = np.repeat(np.cumsum(counts) - counts, counts)
+        word_index = np.arange(counts.sum()) - first_word
+        xs = np.repeat(boxes[:, 0], counts) + word_index * np.repeat(word_widths, counts)
+        
+        xs = xs.astype(np.int64).tolist()
+        ys = boxes[:, 1].astype(np.int64).tolist()
+        widths = word_widths.astype(np.int64).tolist()
+        heights = (boxes[:, 3] - boxes[:, 1]).astype(np.int64).tolist()
+        
+        words: List[WordBox] = []
+        start = 0
+        for (line_words, _, confidence), y, width, height in zip(lines, ys, widths, heights):
+            end = start + len(line_words)
+            words.extend(
+                WordBox(word_text, x, y, width, height, confidence)
+                for word_text, x in zip(line_words, xs[start:end])
             )
+            start = end
+        return words
     
     def preprocess_image(self, image: Image.Image) -> Image.Image:
         """
@@ -187,6 +332,9 @@ class SuryaOCREngine:
         Surya OCR has its own preprocessing, but we apply minimal adjustments
         to ensure optimal input quality.
         
+        Large pages are downsampled here, as 8-bit PIL pixels, so Surya's
+        own tensor conversion only ever sees the already-resized image.
+        
         Args:
             image: PIL Image object to preprocess
             
@@ -196,8 +344,8 @@ class SuryaOCREngine:
         Requirements:
             - 7.2: Attempt preprocessing to improve recognition
         """
-        # Convert to RGB if needed (Surya expects RGB)
-        if image.mode != 'RGB':
+        # Palette and bilevel images can only be resized with NEAREST
+        if image.mode in ('P', '1'):
             image = image.convert('RGB')
         
         # Surya works well with various image sizes, but ensure reasonable dimensions
@@ -205,13 +353,18 @@ class SuryaOCREngine:
         max_dimension = 3000
         
         if width > max_dimension or height > max_dimension:
-            # Scale down very large images
+            # Scale down very large images; the detection model doesn't
+            # need LANCZOS quality, and BILINEAR is much cheaper
             scale_factor = max_dimension / max(width, height)
             new_width = int(width * scale_factor)
             new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            image = image.resize((new_width, new_height), Image.Resampling.BILINEAR)
             logger.info(f"Resized image from {width}x{height} to {new_width}x{new_height}")
         
+        # Convert to RGB after resizing (Surya expects RGB), so fewer pixels are converted
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
         return image
     
     def get_layout_analysis(self, image: Image.Image) -> dict:
@@ -241,11 +394,9 @@ class SuryaOCREngine:
             from surya.model.layout.model import load_model as load_layout_model
             from surya.model.layout.processor import load_processor as load_layout_processor
             
-            # Load layout models if not already loaded
-            if not hasattr(self, '_layout_model'):
-                logger.info("Loading Surya layout analysis models...")
-                self._layout_model = load_layout_model()
-                self._layout_processor = load_layout_processor()
+            # Load layout models (once per process)
+            self._layout_model = _cached_model('layout_model', load_layout_model)
+            self._layout_processor = _cached_model('layout_processor', load_layout_processor)
             
             # Run layout detection
             layout_results = batch_layout_detection(
@@ -5,20 +5,98 @@ This module defines asynchronous tasks for processing PDF conversions,
 including progress tracking and error handling.
 """
 
+from types import SimpleNamespace
+from typing import Optional
 from celery import Task
+from celery.signals import worker_process_init
 from app.celery_app import celery_app
+from app.config import get_config
 from app.pdf_converter import PDFConverter
 from app.job_manager import JobManager
 from app.file_manager import FileManager
-from app.redis_client import get_redis_client
-from app.exceptions import ConversionError, PDFValidationError
+from app.redis_client import RedisClient, get_redis_client
+from app.exceptions import ConversionError, OCRProcessingError, PDFValidationError
+from app.logging_config import configure_logging
 import logging
+import time
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
+# Components shared by every task in a worker child, built once per fork
+# (see init_worker_components); None outside prefork workers, e.g. for
+# eagerly executed tasks, which build their own per call
+_components: Optional[SimpleNamespace] = None
+
+
+def _build_components() -> SimpleNamespace:
+    """
+    Create the Redis-backed managers and converter a conversion needs.
+    
+    Returns:
+        SimpleNamespace with job_manager, file_manager and converter
+    """
+    RedisClient.initialize(get_config())
+    return SimpleNamespace(
+        job_manager=JobManager(RedisClient.get_client()),
+        file_manager=FileManager(),
+        converter=PDFConverter(),
+    )
+
+
+def _warm_up(converter: PDFConverter) -> None:
+    """
+    Run the conversion stack's one-off initialisation before the first job.
+    
+    PyMuPDF, Pillow and python-docx set up lazily on first use (MuPDF's
+    render context, Pillow's plugin registry, the default .docx template).
+    Building the converter already loaded Tesseract's model; Surya's
+    weights load on first use, so they are loaded here too.
+    
+    Args:
+        converter: The worker's PDFConverter
+    """
+    import fitz
+    from PIL import Image
+    import docx
+    
+    Image.init()
+    
+    doc = fitz.open()
+    try:
+        doc.new_page(width=72, height=72).get_pixmap(
+            matrix=fitz.Matrix(1, 1), colorspace=fitz.csRGB, alpha=False
+        )
+    finally:
+        doc.close()
+    
+    docx.Document()
+    
+    load_models = getattr(converter.ocr_engine, 'load_models', None)
+    if load_models is not None:
+        try:
+            load_models()  # Fills the process-wide model cache
+        except OCRProcessingError:
+            pass  # Reported again by the first job that needs Surya
+
+
+@worker_process_init.connect
+def init_worker_components(**kwargs):
+    """
+    Build and warm up the conversion components in each new worker child.
+    
+    A prefork child runs one task at a time, so its tasks can share one
+    JobManager, FileManager and PDFConverter (and the OCR engine and
+    models it holds) instead of creating them per job. Warming them up
+    here moves the first job's initialisation cost to process start.
+    """
+    global _components
+    _components = _build_components()
+    _warm_up(_components.converter)
+
+
 class ConversionTask(Task):
     """
     Base task class for conversion tasks with automatic retry logic.
@@ -30,6 +108,59 @@ class ConversionTask(Task):
     retry_jitter = True
 
 
+class ProgressBuffer:
+    """
+    Buffers per-page progress and writes it to Redis in batches.
+    
+    Flushes once FLUSH_EVERY_PAGES pages have accumulated, once
+    FLUSH_INTERVAL_SECONDS have passed since the last write, or on the last
+    page, so the status endpoint sees the most recently flushed value instead
+    of paying a Redis round trip per page.
+    """
+    
+    FLUSH_EVERY_PAGES = 8
+    FLUSH_INTERVAL_SECONDS = 2.0
+    
+    def __init__(self, job_manager: JobManager, job_id: str, on_flush=None):
+        """
+        Initialize ProgressBuffer.
+        
+        Args:
+            job_manager: JobManager used to persist progress
+            job_id: Job identifier
+            on_flush: Optional callable(current_page, total_pages) run after
+                      each successful flush
+        """
+        self.job_manager = job_manager
+        self.job_id = job_id
+        self.on_flush = on_flush
+        self._pending = []
+        self._last_flush = time.monotonic()
+    
+    def add(self, current_page: int, total_pages: int) -> None:
+        """Record progress for a page, flushing if a threshold is reached."""
+        self._pending.append((current_page, total_pages))
+        
+        if (
+            len(self._pending) >= self.FLUSH_EVERY_PAGES
+            or current_page >= total_pages
+            or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL_SECONDS
+        ):
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write any buffered progress to Redis."""
+        if not self._pending:
+            return
+        
+        items, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        
+        self.job_manager.update_progress_batch(self.job_id, items)
+        if self.on_flush:
+            self.on_flush(*items[-1])
+
+
 @celery_app.task(bind=True, base=ConversionTask, name='app.tasks.convert_pdf_task')
 def convert_pdf_task(self, job_id: str) -> dict:
     """
@@ -65,20 +196,14 @@ def convert_pdf_task(self, job_id: str) -> dict:
         - 10.6: Update progress during conversion
         - 12.1: Store output file using FileManager
     """
-    # Initialize components
-    from app.redis_client import RedisClient
-    from app.config import get_config
-    
-    redis_client = RedisClient()
-    redis_client.initialize(get_config())
-    redis_conn = redis_client.get_client()
-    
-    job_manager = JobManager(redis_conn)
-    file_manager = FileManager()
-    converter = PDFConverter()
+    # Reuse the worker's components, or build them for this call
+    components = _components or _build_components()
+    job_manager = components.job_manager
+    file_manager = components.file_manager
+    converter = components.converter
     
     try:
-        logger.info(f"Starting conversion for job {job_id}")
+        logger.info("Starting conversion for job %s", job_id)
         
         # Get input file path
         input_path = file_manager.get_input_path(job_id)
@@ -87,27 +212,32 @@ def convert_pdf_task(self, job_id: str) -> dict:
         
         # Update job status to processing
         job_manager.mark_processing(job_id)
-        logger.info(f"Job {job_id} marked as processing")
+        logger.info("Job %s marked as processing", job_id)
+        
+        def report_task_state(current_page: int, total_pages: int):
+            """Mirror flushed progress into the Celery task state."""
+            logger.info("Job %s: Processing page %s/%s", job_id, current_page, total_pages)
+            
+            # Update Celery task state for monitoring (only if task_id exists)
+            if self.request.id:
+                self.update_state(
+                    state='PROGRESS',
+                    meta={
+                        'current': current_page,
+                        'total': total_pages,
+                        'percentage': int((current_page / total_pages) * 100)
+                    }
+                )
+        
+        progress_buffer = ProgressBuffer(job_manager, job_id, on_flush=report_task_state)
         
         # Define progress callback
         def progress_callback(current_page: int, total_pages: int):
-            """Update job progress in Redis."""
+            """Buffer job progress and flush it to Redis in batches."""
             try:
-                job_manager.update_progress(job_id, current_page, total_pages)
-                logger.info(f"Job {job_id}: Processing page {current_page}/{total_pages}")
-                
-                # Update Celery task state for monitoring (only if task_id exists)
-                if self.request.id:
-                    self.update_state(
-                        state='PROGRESS',
-                        meta={
-                            'current': current_page,
-                            'total': total_pages,
-                            'percentage': int((current_page / total_pages) * 100)
-                        }
-                    )
+                progress_buffer.add(current_page, total_pages)
             except Exception as e:
-                logger.error(f"Error updating progress for job {job_id}: {e}")
+                logger.error("Error updating progress for job %s: %s", job_id, e)
         
         # Determine output path
         output_path = file_manager.get_output_path(job_id)
@@ -118,19 +248,28 @@ def convert_pdf_task(self, job_id: str) -> dict:
             output_path = os.path.join(job_dir, 'output.docx')
         
         # Run conversion
-        logger.info(f"Starting PDF conversion for job {job_id}")
+        logger.info("Starting PDF conversion for job %s", job_id)
         result = converter.convert(
             pdf_path=input_path,
             output_path=output_path,
             progress_callback=progress_callback
         )
         
+        # Write out any progress still buffered from the last pages
+        try:
+            progress_buffer.flush()
+        except Exception as e:
+            logger.error("Error updating progress for job %s: %s", job_id, e)
+        
         if result["success"]:
             # Store output file (already saved by converter, just verify)
             if file_manager.get_output_path(job_id):
+                # Hand the output to object storage when one is configured
+                file_manager.upload_output(job_id, output_path)
+                
                 # Mark job as completed
                 job_manager.mark_completed(job_id, output_path)
-                logger.info(f"Job {job_id} completed successfully")
+                logger.info("Job %s completed successfully", job_id)
                 
                 return {
                     "success": True,
@@ -148,7 +287,7 @@ def convert_pdf_task(self, job_id: str) -> dict:
     except PDFValidationError as e:
         # PDF validation errors (non-retryable)
         error_msg = f"PDF validation failed: {str(e)}"
-        logger.error(f"Job {job_id}: {error_msg}")
+        logger.error("Job %s: %s", job_id, error_msg)
         job_manager.mark_failed(job_id, error_msg)
         
         return {
@@ -163,7 +302,7 @@ def convert_pdf_task(self, job_id: str) -> dict:
     except ConversionError as e:
         # Conversion errors (non-retryable)
         error_msg = f"Conversion error: {str(e)}"
-        logger.error(f"Job {job_id}: {error_msg}")
+        logger.error("Job %s: %s", job_id, error_msg)
         job_manager.mark_failed(job_id, error_msg)
         
         return {
@@ -178,11 +317,11 @@ def convert_pdf_task(self, job_id: str) -> dict:
     except Exception as e:
         # Unexpected errors (may be retryable)
         error_msg = f"Unexpected error: {str(e)}"
-        logger.error(f"Job {job_id}: {error_msg}", exc_info=True)
+        logger.error("Job %s: %s", job_id, error_msg, exc_info=True)
         
         # Check if we should retry
         if self.request.retries < self.max_retries:
-            logger.info(f"Retrying job {job_id} (attempt {self.request.retries + 1}/{self.max_retries})")
+            logger.info("Retrying job %s (attempt %s/%s)", job_id, self.request.retries + 1, self.max_retries)
             raise self.retry(exc=e)
         else:
             # Max retries reached, mark as failed
@@ -223,11 +362,11 @@ def cleanup_old_files_task(max_age_hours: int = 24) -> dict:
     file_manager = FileManager()
     
     try:
-        logger.info(f"Starting cleanup of files older than {max_age_hours} hours")
+        logger.info("Starting cleanup of files older than %s hours", max_age_hours)
         
         files_deleted = file_manager.cleanup_old_files(max_age_hours)
         
-        logger.info(f"Cleanup completed: {files_deleted} files deleted")
+        logger.info("Cleanup completed: %s files deleted", files_deleted)
         
         return {
             "success": True,
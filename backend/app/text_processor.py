@@ -6,9 +6,215 @@ such as missing spaces between words.
 """
 
 import re
+import threading
+import numpy as np
 from docx import Document
+from docx.oxml.ns import qn
 from typing import List
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+
+# Word boundaries that get a space, as (before, after) character classes:
+# camelCase, letter then number, number then letter, capitals then
+# lowercase (e.g. "RFPis" -> "RFP is"), and punctuation then letter.
+# Inserting one space never creates or breaks another boundary, so all of
+# them are found in a single pass over the original text. Numbers are
+# ASCII digits only, as in the Hyperscan and NumPy scanners, so other
+# Unicode digits (fullwidth, Arabic-Indic) never get a space.
+_WORD_BOUNDARIES = (
+    ('[a-z]', '[A-Z]'),
+    ('[a-zA-Z]', '[0-9]'),
+    ('[0-9]', '[a-zA-Z]'),
+    ('[A-Z]{2}', '[a-z]'),
+    ('[.!?,;:]', '[A-Za-z]'),
+)
+
+# Zero-width alternation matching every boundary position
+_WORD_BOUNDARY_RE = re.compile(
+    '|'.join(f'(?<={before})(?={after})' for before, after in _WORD_BOUNDARIES)
+)
+
+# Plain alternation over the same boundaries: a search with it is cheaper
+# than a substitution, and most text has no boundary to fix
+_WORD_BOUNDARY_TRIGGER_RE = re.compile(
+    '|'.join(before + after for before, after in _WORD_BOUNDARIES)
+)
+
+
+def _compile_hyperscan_database():
+    """
+    Compile the word boundaries into one Hyperscan database.
+    
+    Hyperscan has no lookaround, so each pattern matches the characters
+    on both sides and the space goes before the last matched byte.
+    
+    Returns:
+        hyperscan.Database, or None when hyperscan is not installed
+    """
+    if hyperscan is None:
+        return None
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[(before + after).encode() for before, after in _WORD_BOUNDARIES],
+        ids=list(range(len(_WORD_BOUNDARIES))),
+        elements=len(_WORD_BOUNDARIES),
+    )
+    return database
+
+
+_HYPERSCAN_DATABASE = _compile_hyperscan_database()
+# The database's scratch space can only be used by one scan at a time
+_HYPERSCAN_LOCK = threading.Lock()
+
+
+# Texts at least this long are scanned with NumPy; below it the fixed
+# per-call cost of the array setup outweighs the vectorized scan
+_VECTOR_SCAN_MIN_LENGTH = 256
+
+# Byte classes for the NumPy scanner (non-ASCII bytes are "other")
+_OTHER, _LOWER, _UPPER, _DIGIT, _PUNCT = range(5)
+_BYTE_CLASS = np.zeros(256, dtype=np.uint8)
+_BYTE_CLASS[np.frombuffer(b'abcdefghijklmnopqrstuvwxyz', dtype=np.uint8)] = _LOWER
+_BYTE_CLASS[np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', dtype=np.uint8)] = _UPPER
+_BYTE_CLASS[np.frombuffer(b'0123456789', dtype=np.uint8)] = _DIGIT
+_BYTE_CLASS[np.frombuffer(b'.!?,;:', dtype=np.uint8)] = _PUNCT
+
+# Class pairs that get a space between them; the same rules as
+# _WORD_BOUNDARIES except capitals then lowercase, which needs three bytes
+_SPACE_BETWEEN = np.zeros((5, 5), dtype=bool)
+for _before, _after in ((_LOWER, _UPPER), (_LOWER, _DIGIT), (_UPPER, _DIGIT),
+                        (_DIGIT, _LOWER), (_DIGIT, _UPPER),
+                        (_PUNCT, _LOWER), (_PUNCT, _UPPER)):
+    _SPACE_BETWEEN[_before, _after] = True
+
+
+def _insert_word_spaces_vectorized(text: str) -> str:
+    """
+    Insert a space at every word boundary in text with one NumPy pass.
+    
+    Classifies every byte through a lookup table and marks the positions
+    where adjacent classes form a boundary, so the scan runs in compiled
+    loops rather than the regex engine.
+    
+    Args:
+        text: Input text with missing spaces
+        
+    Returns:
+        Text with spaces added
+    """
+    data = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+    classes = _BYTE_CLASS[data]
+    
+    # boundary[i] is True when a space goes between byte i and byte i + 1
+    boundary = _SPACE_BETWEEN[classes[:-1], classes[1:]]
+    boundary[1:] |= (
+        (classes[:-2] == _UPPER) & (classes[1:-1] == _UPPER) & (classes[2:] == _LOWER)
+    )
+    
+    offsets = np.flatnonzero(boundary)
+    if not offsets.size:
+        return text
+    # Boundaries sit before an ASCII byte, so the result stays valid UTF-8
+    return np.insert(data, offsets + 1, ord(' ')).tobytes().decode('utf-8')
+
+
+def _insert_word_spaces(text: str) -> str:
+    """
+    Insert a space at every word boundary in text.
+    
+    Long texts go through the NumPy scanner. Shorter ones are returned
+    as they are unless a quick search finds a boundary, then go through
+    Hyperscan when it is installed, or the compiled regex otherwise.
+    
+    Args:
+        text: Input text with missing spaces
+        
+    Returns:
+        Text with spaces added
+    """
+    if len(text) >= _VECTOR_SCAN_MIN_LENGTH:
+        return _insert_word_spaces_vectorized(text)
+    if not _WORD_BOUNDARY_TRIGGER_RE.search(text):
+        return text
+    if _HYPERSCAN_DATABASE is None:
+        return _WORD_BOUNDARY_RE.sub(' ', text)
+    
+    data = text.encode('utf-8')
+    offsets = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        offsets.add(end - 1)
+    
+    with _HYPERSCAN_LOCK:
+        _HYPERSCAN_DATABASE.scan(data, match_event_handler=on_match)
+    
+    if not offsets:
+        return text
+    # Boundaries sit before an ASCII byte, so the pieces stay valid UTF-8
+    cuts = [0] + sorted(offsets) + [len(data)]
+    return b' '.join(data[start:end] for start, end in zip(cuts, cuts[1:])).decode('utf-8')
+
+
+# Common joined words (add more as needed)
+_COMMON_FIXES = {
+    'tothis': 'to this',
+    'tothe': 'to the',
+    'ofthe': 'of the',
+    'inthe': 'in the',
+    'onthe': 'on the',
+    'forthe': 'for the',
+    'andthe': 'and the',
+    'withthe': 'with the',
+    'fromthe': 'from the',
+    'aboutthe': 'about the',
+    'thatis': 'that is',
+    'whichis': 'which is',
+    'thereis': 'there is',
+    'itis': 'it is',
+}
+
+# One alternation over every fix, so the text is scanned once. Each fix is
+# its own group: IGNORECASE also matches letters like the dotless "ı",
+# so the matched text lowercased isn't always a key.
+_COMMON_FIXES_RE = re.compile(
+    r'\b(?:' + '|'.join(f'({re.escape(wrong)})' for wrong in _COMMON_FIXES) + r')\b',
+    re.IGNORECASE
+)
+_COMMON_FIX_REPLACEMENTS = list(_COMMON_FIXES.values())
+
+# Pre-checks that rule out a fix much faster than re's IGNORECASE
+# alternation: RE2 when installed, else a case-sensitive search of the
+# lowercased text. Both only agree with re on ASCII text.
+_COMMON_FIXES_RE2 = re2.compile(
+    r'(?i)\b(?:' + '|'.join(map(re.escape, _COMMON_FIXES)) + r')\b'
+) if re2 is not None else None
+_COMMON_FIXES_LOWER_RE = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, _COMMON_FIXES)) + r')\b'
+)
+
+
+def _may_need_common_fix(text: str) -> bool:
+    """Return False when text certainly contains no common joined word."""
+    if not text.isascii():
+        return True
+    if _COMMON_FIXES_RE2 is not None:
+        return _COMMON_FIXES_RE2.search(text) is not None
+    return _COMMON_FIXES_LOWER_RE.search(text.lower()) is not None
+
+
+def _common_fix(match: 're.Match') -> str:
+    """Return the replacement for whichever joined word matched."""
+    return _COMMON_FIX_REPLACEMENTS[match.lastindex - 1]
+
 
 class TextProcessor:
     """
@@ -37,49 +243,21 @@ class TextProcessor:
         if not text:
             return text
         
-        # Add space between lowercase and uppercase (camelCase)
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-        
-        # Add space between letter and number
-        text = re.sub(r'([a-zA-Z])(\d)', r'\1 \2', text)
-        text = re.sub(r'(\d)([a-zA-Z])', r'\1 \2', text)
+        text = _insert_word_spaces(text)
         
-        # Add space between multiple capitals and lowercase
-        # e.g., "RFPis" -> "RFP is"
-        text = re.sub(r'([A-Z]{2,})([a-z])', r'\1 \2', text)
-        
-        # Add space after punctuation if missing
-        text = re.sub(r'([.!?,;:])([A-Za-z])', r'\1 \2', text)
-        
-        # Fix common word patterns (add more as needed)
-        common_fixes = {
-            'tothis': 'to this',
-            'tothe': 'to the',
-            'ofthe': 'of the',
-            'inthe': 'in the',
-            'onthe': 'on the',
-            'forthe': 'for the',
-            'andthe': 'and the',
-            'withthe': 'with the',
-            'fromthe': 'from the',
-            'aboutthe': 'about the',
-            'thatis': 'that is',
-            'whichis': 'which is',
-            'thereis': 'there is',
-            'itis': 'it is',
-        }
-        
-        for wrong, correct in common_fixes.items():
-            text = re.sub(r'\b' + wrong + r'\b', correct, text, flags=re.IGNORECASE)
-        
-        return text
+        # Fix common word patterns; most text has none
+        if not _may_need_common_fix(text):
+            return text
+        return _COMMON_FIXES_RE.sub(_common_fix, text)
     
     def fix_word_document(self, doc_path: str) -> None:
         """
         Fix spacing issues in a Word document.
         
-        Opens the document, processes all paragraphs and table cells,
-        and saves the fixed version.
+        Opens the document, fixes the text of every run in the body
+        (paragraphs and table cells alike), and saves the fixed version.
+        Each run's <w:t> text is edited in place, so run formatting is
+        kept; words split across two runs are left as they are.
         
         Args:
             doc_path: Path to the Word document
@@ -88,33 +266,13 @@ class TextProcessor:
             # Open document
             doc = Document(doc_path)
             
-            # Fix paragraphs
-            for paragraph in doc.paragraphs:
-                if paragraph.text:
-                    # Store original formatting
-                    runs = paragraph.runs
-                    if runs:
-                        # Get text from all runs
-                        original_text = paragraph.text
-                        fixed_text = self.add_spaces_to_text(original_text)
-                        
-                        if fixed_text != original_text:
-                            # Clear paragraph and add fixed text
-                            paragraph.clear()
-                            paragraph.add_run(fixed_text)
-            
-            # Fix tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            if paragraph.text:
-                                original_text = paragraph.text
-                                fixed_text = self.add_spaces_to_text(original_text)
-                                
-                                if fixed_text != original_text:
-                                    paragraph.clear()
-                                    paragraph.add_run(fixed_text)
+            # Fix every text element in the body, including table cells
+            for text_element in doc.element.body.iter(qn('w:t')):
+                original_text = text_element.text
+                if original_text:
+                    fixed_text = self.add_spaces_to_text(original_text)
+                    if fixed_text != original_text:
+                        text_element.text = fixed_text
             
             # Save document
             doc.save(doc_path)
@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for the Flask API.
+
+The API handlers spend most of their time waiting on Redis and disk, so
+they run on gevent workers: each worker multiplexes many connections on
+cooperative greenlets instead of blocking a whole process per request.
+
+The app is preloaded in the master so imports (Flask, PyMuPDF, Pillow,
+Celery) happen once and are shared copy-on-write by every forked worker.
+The standard library is therefore monkey-patched here, before the preload
+imports it, so redis-py sockets and the locks of its blocking connection
+pool are cooperative too.
+
+Every setting can be overridden through the environment.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+
+# Set GUNICORN_WORKER_CLASS=sync to fall back to one request per worker
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+if worker_class == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
+
+# Hold idle connections open between status polls so clients (and the
+# reverse proxy) reuse them instead of reconnecting every few seconds
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '75'))
+
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# Import the app once in the master and fork workers from it
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
@@ -8,5 +8,6 @@ apt-get install -y tesseract-ocr tesseract-ocr-eng
 
 echo "Installing Python dependencies..."
 pip install -r requirements.txt
+pip install -r requirements-optional.txt || echo "Optional accelerators not installed, using fallbacks"
 
 echo "Build complete!"
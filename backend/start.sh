@@ -1,5 +1,5 @@
 #!/bin/bash
 # Startup script for Render deployment
 
-# Start gunicorn with proper configuration
-exec gunicorn --bind 0.0.0.0:$PORT --workers 2 --timeout 300 --worker-class sync --log-level info "app.api:create_app()"
+# Start gunicorn with the settings in gunicorn.conf.py (gevent workers)
+exec gunicorn --config gunicorn.conf.py app.api:app
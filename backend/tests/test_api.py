@@ -6,6 +6,7 @@ These tests verify the upload, status, and download endpoints with proper mockin
 
 import pytest
 import io
+import os
 from unittest.mock import Mock, patch, MagicMock
 from app.api import create_app
 from app.exceptions import JobNotFoundError
@@ -27,9 +28,11 @@ def app():
     mock_file_manager_instance.store_upload.return_value = "/tmp/test-job/input.pdf"
     mock_file_manager_instance.get_output_path.return_value = "/tmp/test-job/output.docx"
     mock_file_manager_instance.get_original_filename.return_value = "test.pdf"
+    mock_file_manager_instance.hash_file.return_value = "0" * 32
     
     mock_job_manager_instance = Mock()
     mock_job_manager_instance.create_job.return_value = "test-job-123"
+    mock_job_manager_instance.find_job_by_content_hash.return_value = None
     mock_job_manager_instance.get_status.return_value = {
         'job_id': 'test-job-123',
         'status': 'pending',
@@ -127,6 +130,24 @@ class TestUploadEndpoint:
         json_data = response.get_json()
         assert 'error' in json_data
     
+    def test_upload_rejects_bad_magic_bytes(self, client):
+        """Test multipart upload of a .pdf whose content is not a PDF."""
+        global mock_job_manager_instance
+        mock_job_manager_instance.reset_mock()
+        
+        data = {
+            'file': (io.BytesIO(b'GIF89a not a pdf'), 'test.pdf')
+        }
+        
+        response = client.post(
+            '/api/upload',
+            data=data,
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 400
+        mock_job_manager_instance.create_job.assert_not_called()
+    
     def test_upload_invalid_file_type(self, client):
         """Test upload with non-PDF file."""
         data = {
@@ -171,6 +192,193 @@ class TestUploadEndpoint:
         mock_file_manager_instance.store_upload.side_effect = None
 
 
+class TestDuplicateUploads:
+    """Test suite for content-hash deduplication of uploads."""
+    
+    @patch('app.api.convert_pdf_task')
+    def test_duplicate_upload_reuses_existing_job(self, mock_task, client):
+        """Test that identical content returns the earlier job without converting again."""
+        global mock_file_manager_instance, mock_job_manager_instance
+        
+        mock_task.delay = Mock()
+        mock_job_manager_instance.create_job.return_value = "new-job"
+        mock_job_manager_instance.find_job_by_content_hash.return_value = {
+            'job_id': 'old-job',
+            'status': 'completed'
+        }
+        
+        response = client.post(
+            '/api/upload',
+            data={'file': (io.BytesIO(b'%PDF-1.4 same content'), 'test.pdf')},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert json_data['job_id'] == 'old-job'
+        assert json_data['status'] == 'completed'
+        mock_task.delay.assert_not_called()
+        mock_file_manager_instance.delete_job_files.assert_called_once_with("new-job")
+        mock_job_manager_instance.delete_job.assert_called_once_with("new-job")
+    
+    @patch('app.api.convert_pdf_task')
+    def test_new_content_is_indexed_and_queued(self, mock_task, client):
+        """Test that unseen content is recorded under its hash and converted."""
+        global mock_file_manager_instance, mock_job_manager_instance
+        
+        mock_task.delay = Mock()
+        mock_file_manager_instance.hash_file.return_value = "abc123"
+        
+        response = client.post(
+            '/api/upload',
+            data={'file': (io.BytesIO(b'%PDF-1.4 new content'), 'test.pdf')},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 202
+        mock_job_manager_instance.remember_content_hash.assert_called_once_with(
+            "abc123", "test-job-123"
+        )
+        mock_task.delay.assert_called_once_with("test-job-123")
+    
+    @patch('app.api.convert_pdf_task')
+    def test_dedupe_lookup_failure_still_queues(self, mock_task, client):
+        """Test that a Redis error in the duplicate check does not fail the upload."""
+        global mock_job_manager_instance
+        
+        mock_task.delay = Mock()
+        mock_job_manager_instance.find_job_by_content_hash.side_effect = Exception("Redis down")
+        
+        response = client.post(
+            '/api/upload',
+            data={'file': (io.BytesIO(b'%PDF-1.4 content'), 'test.pdf')},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 202
+        mock_task.delay.assert_called_once_with("test-job-123")
+
+
+class TestStreamUploadEndpoint:
+    """Test suite for the raw (streamed) upload endpoint."""
+    
+    @patch('app.api.convert_pdf_task')
+    def test_stream_upload_writes_body_to_disk(self, mock_task, client, tmp_path):
+        """Test that the request body is streamed into the job's input file."""
+        global mock_file_manager_instance, mock_job_manager_instance
+        
+        body = b'%PDF-1.4 ' + b'x' * (3 * 64 * 1024) + b'\n%%EOF\n'
+        target = tmp_path / "input.pdf"
+        mock_file_manager_instance.UPLOAD_CHUNK_SIZE = 64 * 1024
+        mock_file_manager_instance.has_pdf_trailer.return_value = True
+        mock_file_manager_instance.open_upload_stream.side_effect = lambda job_id: open(target, 'wb')
+        mock_job_manager_instance.create_job.return_value = "test-job-123"
+        mock_task.delay = Mock()
+        
+        response = client.put(
+            '/api/upload/test.pdf',
+            data=body,
+            content_type='application/pdf'
+        )
+        
+        assert response.status_code == 202
+        assert response.get_json()['job_id'] == "test-job-123"
+        assert target.read_bytes() == body
+        mock_file_manager_instance.open_upload_stream.assert_called_once_with("test-job-123")
+        mock_file_manager_instance.store_upload.assert_not_called()
+        mock_task.delay.assert_called_once_with("test-job-123")
+    
+    @patch('app.api.convert_pdf_task')
+    def test_stream_upload_records_content_hash(self, mock_task, client, tmp_path):
+        """Test that the streamed body is hashed and indexed for deduplication."""
+        import hashlib
+        global mock_file_manager_instance, mock_job_manager_instance
+        
+        body = b'%PDF-1.4 ' + b'y' * (2 * 64 * 1024) + b'\n%%EOF\n'
+        target = tmp_path / "input.pdf"
+        mock_file_manager_instance.UPLOAD_CHUNK_SIZE = 64 * 1024
+        mock_file_manager_instance.has_pdf_trailer.return_value = True
+        mock_file_manager_instance.open_upload_stream.side_effect = lambda job_id: open(target, 'wb')
+        mock_task.delay = Mock()
+        
+        response = client.put('/api/upload/test.pdf', data=body, content_type='application/pdf')
+        
+        assert response.status_code == 202
+        expected = hashlib.blake2b(body, digest_size=16).hexdigest()
+        mock_job_manager_instance.remember_content_hash.assert_called_once_with(
+            expected, "test-job-123"
+        )
+    
+    def test_stream_upload_invalid_file_type(self, client):
+        """Test that non-PDF filenames are rejected."""
+        response = client.put(
+            '/api/upload/test.txt',
+            data=b'not a pdf',
+            content_type='application/pdf'
+        )
+        
+        assert response.status_code == 400
+        assert 'PDF' in response.get_json()['message']
+    
+    def test_stream_upload_rejects_bad_magic_bytes(self, client):
+        """Test that non-PDF content is rejected before a job is created."""
+        global mock_file_manager_instance, mock_job_manager_instance
+        mock_file_manager_instance.reset_mock()
+        mock_job_manager_instance.reset_mock()
+        mock_file_manager_instance.UPLOAD_CHUNK_SIZE = 64 * 1024
+        
+        response = client.put(
+            '/api/upload/test.pdf',
+            data=b'<html>not a pdf</html>',
+            content_type='application/pdf'
+        )
+        
+        assert response.status_code == 400
+        assert 'not a PDF' in response.get_json()['message']
+        mock_job_manager_instance.create_job.assert_not_called()
+        mock_file_manager_instance.open_upload_stream.assert_not_called()
+    
+    @patch('app.api.convert_pdf_task')
+    def test_stream_upload_rejects_truncated_pdf(self, mock_task, client, tmp_path):
+        """Test that a PDF without an %%EOF trailer is removed and not queued."""
+        global mock_file_manager_instance
+        
+        target = tmp_path / "input.pdf"
+        mock_file_manager_instance.UPLOAD_CHUNK_SIZE = 64 * 1024
+        mock_file_manager_instance.open_upload_stream.side_effect = lambda job_id: open(target, 'wb')
+        mock_file_manager_instance.has_pdf_trailer.return_value = False
+        mock_task.delay = Mock()
+        
+        response = client.put(
+            '/api/upload/test.pdf',
+            data=b'%PDF-1.4 truncated',
+            content_type='application/pdf'
+        )
+        
+        assert response.status_code == 400
+        assert 'truncated' in response.get_json()['message']
+        mock_file_manager_instance.delete_job_files.assert_called_once()
+        mock_task.delay.assert_not_called()
+    
+    def test_stream_upload_empty_body(self, client):
+        """Test that an empty body is rejected."""
+        response = client.put('/api/upload/test.pdf', content_type='application/pdf')
+        
+        assert response.status_code == 400
+    
+    def test_stream_upload_too_large(self, app, client):
+        """Test that a body above the size limit returns 413."""
+        app.config['MAX_CONTENT_LENGTH'] = 16
+        
+        response = client.put(
+            '/api/upload/test.pdf',
+            data=b'%PDF-1.4 ' + b'x' * 32,
+            content_type='application/pdf'
+        )
+        
+        assert response.status_code == 413
+
+
 class TestJobStatusEndpoint:
     """Test suite for job status endpoint."""
     
@@ -227,6 +435,132 @@ class TestJobStatusEndpoint:
         assert 'completed_at' in data
 
 
+class TestJobStatusETag:
+    """Test suite for conditional requests on the job status endpoint."""
+    
+    def _set_status(self, version):
+        global mock_job_manager_instance
+        mock_job_manager_instance.get_status.side_effect = None
+        mock_job_manager_instance.get_status.return_value = {
+            'job_id': 'test-job-123',
+            'status': 'processing',
+            'progress': {'current_page': 1, 'total_pages': 4, 'percentage': 25},
+            'version': version
+        }
+    
+    def test_status_response_carries_etag(self, client):
+        """Test that status responses include a weak ETag and no-cache."""
+        self._set_status(3)
+        
+        response = client.get('/api/jobs/test-job-123')
+        
+        assert response.status_code == 200
+        assert response.headers['ETag'] == 'W/"test-job-123-3"'
+        assert 'no-cache' in response.headers['Cache-Control']
+    
+    def test_unchanged_status_returns_304(self, client):
+        """Test that a matching If-None-Match returns 304 without a body."""
+        self._set_status(3)
+        
+        response = client.get(
+            '/api/jobs/test-job-123',
+            headers={'If-None-Match': 'W/"test-job-123-3"'}
+        )
+        
+        assert response.status_code == 304
+        assert response.data == b''
+    
+    def test_changed_status_returns_body(self, client):
+        """Test that a stale ETag gets the full, updated status."""
+        self._set_status(4)
+        
+        response = client.get(
+            '/api/jobs/test-job-123',
+            headers={'If-None-Match': 'W/"test-job-123-3"'}
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['version'] == 4
+    
+    def test_compressed_etag_still_revalidates(self, client):
+        """Test that an ETag carrying Flask-Compress's suffix still matches."""
+        self._set_status(3)
+        
+        response = client.get(
+            '/api/jobs/test-job-123',
+            headers={'If-None-Match': 'W/"test-job-123-3:gzip"'}
+        )
+        
+        assert response.status_code == 304
+
+
+class TestResponseCompression:
+    """Test suite for JSON response compression."""
+    
+    def test_large_json_is_gzipped(self, client):
+        """Test that JSON bodies above the minimum size are compressed."""
+        import gzip
+        global mock_job_manager_instance
+        
+        mock_job_manager_instance.get_status.return_value = {
+            'job_id': 'test-job-123',
+            'status': 'failed',
+            'error': 'x' * 2000
+        }
+        
+        response = client.get('/api/jobs/test-job-123', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert b'x' * 2000 in gzip.decompress(response.data)
+    
+    def test_small_json_is_not_compressed(self, client):
+        """Test that tiny responses skip compression."""
+        response = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+    
+    def test_download_is_not_compressed(self, client):
+        """Test that .docx downloads are sent as-is."""
+        global mock_file_manager_instance, mock_job_manager_instance
+        
+        mock_job_manager_instance.get_status.return_value = {
+            'job_id': 'test-job-123',
+            'status': 'completed'
+        }
+        mock_file_manager_instance.get_output_path.return_value = __file__
+        
+        response = client.get('/api/download/test-job-123', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        response.close()
+
+
+class TestJsonProvider:
+    """Test suite for the orjson-backed JSON provider."""
+    
+    def test_app_uses_orjson_provider(self, app):
+        """Test that responses are encoded by orjson when it is installed."""
+        from app.api import OrjsonProvider
+        
+        assert isinstance(app.json, OrjsonProvider)
+    
+    def test_status_round_trips_through_provider(self, client):
+        """Test that the status payload decodes to the stored job data."""
+        global mock_job_manager_instance
+        
+        response = client.get('/api/jobs/test-job-123')
+        
+        assert response.status_code == 200
+        assert response.get_json() == mock_job_manager_instance.get_status.return_value
+    
+    def test_stdlib_options_fall_back_to_json(self, app):
+        """Test that indent and other json kwargs still work."""
+        assert app.json.dumps({'a': 1}, indent=2) == '{\n  "a": 1\n}'
+
+
 class TestDownloadEndpoint:
     """Test suite for download endpoint."""
     
@@ -266,6 +600,49 @@ class TestDownloadEndpoint:
                 # File still locked on Windows, ignore
                 pass
     
+    def test_download_uses_x_accel_redirect(self, app, client):
+        """Test that downloads are handed to nginx when a prefix is configured."""
+        global mock_file_manager_instance, mock_job_manager_instance
+        
+        app.config['X_ACCEL_REDIRECT_PREFIX'] = '/protected/'
+        mock_job_manager_instance.get_status.return_value = {
+            'job_id': 'test-job-123',
+            'status': 'completed'
+        }
+        mock_file_manager_instance.get_output_path.return_value = __file__
+        mock_file_manager_instance.get_original_filename.return_value = 'report.pdf'
+        
+        response = client.get('/api/download/test-job-123')
+        
+        assert response.status_code == 200
+        assert response.data == b''
+        assert response.headers['X-Accel-Redirect'] == (
+            f"/protected/test-job-123/{os.path.basename(__file__)}"
+        )
+        assert 'attachment' in response.headers['Content-Disposition']
+        assert 'report.docx' in response.headers['Content-Disposition']
+    
+    def test_download_redirects_to_presigned_url(self, app, client):
+        """Test that downloads redirect to object storage when a bucket is configured."""
+        global mock_file_manager_instance, mock_job_manager_instance
+        
+        app.config['S3_BUCKET'] = 'outputs'
+        app.config['S3_PRESIGNED_URL_EXPIRES'] = 120
+        mock_job_manager_instance.get_status.return_value = {
+            'job_id': 'test-job-123',
+            'status': 'completed'
+        }
+        mock_file_manager_instance.get_original_filename.return_value = 'report.pdf'
+        mock_file_manager_instance.get_download_url.return_value = 'https://s3.example/signed'
+        
+        response = client.get('/api/download/test-job-123')
+        
+        assert response.status_code == 302
+        assert response.headers['Location'] == 'https://s3.example/signed'
+        mock_file_manager_instance.get_download_url.assert_called_once_with(
+            'test-job-123', 'report.docx', 120
+        )
+    
     def test_download_nonexistent_job(self, client):
         """Test downloading non-existent job."""
         global mock_job_manager_instance
@@ -68,9 +68,44 @@ class TestCeleryConfiguration:
         """Test that task serialization is configured correctly."""
         app = create_celery_app()
         
-        assert app.conf.task_serializer == 'json'
+        assert app.conf.task_serializer == 'msgpack'
+        assert 'msgpack' in app.conf.accept_content
         assert 'json' in app.conf.accept_content
-        assert app.conf.result_serializer == 'json'
+        assert app.conf.result_serializer == 'msgpack'
+    
+    def test_task_result_is_msgpack_safe(self):
+        """Test that a conversion result round-trips through msgpack."""
+        from kombu.serialization import dumps, loads
+        
+        result = {
+            "success": True,
+            "job_id": "job-1",
+            "output_path": "/uploads/job-1/output.docx",
+            "pages_processed": 3,
+            "pages_failed": [2],
+            "errors": ["Page 2: OCR failed"]
+        }
+        
+        content_type, encoding, payload = dumps(result, serializer='msgpack')
+        
+        assert loads(payload, content_type, encoding, accept=[content_type]) == result
+    
+    def test_late_acknowledgement_settings(self):
+        """Test that tasks are acknowledged only after they finish."""
+        app = create_celery_app()
+        
+        assert app.conf.task_acks_late is True
+        assert app.conf.task_reject_on_worker_lost is True
+        assert app.conf.broker_transport_options['visibility_timeout'] > app.conf.task_time_limit
+    
+    def test_conversion_task_routing(self):
+        """Test that conversions go to their own queue, consumed by default workers."""
+        from app.celery_app import CONVERT_QUEUE, DEFAULT_QUEUE
+        
+        app = create_celery_app()
+        
+        assert app.conf.task_routes['app.tasks.convert_pdf_task'] == {'queue': CONVERT_QUEUE}
+        assert {queue.name for queue in app.conf.task_queues} == {DEFAULT_QUEUE, CONVERT_QUEUE}
     
     def test_result_expiration_setting(self):
         """Test that result expiration is set to 24 hours."""
@@ -216,7 +251,7 @@ class TestCeleryAppInstance:
         
         assert celery_app.conf.broker_url is not None
         assert celery_app.conf.result_backend is not None
-        assert celery_app.conf.task_serializer == 'json'
+        assert celery_app.conf.task_serializer == 'msgpack'
 
 
 class TestCeleryConfigurationConsistency:
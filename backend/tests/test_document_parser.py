@@ -7,6 +7,7 @@ Tests PDF validation, page extraction, and error handling.
 import os
 import tempfile
 import pytest
+from unittest.mock import patch
 from PIL import Image
 import fitz  # PyMuPDF
 
@@ -103,6 +104,23 @@ class TestDocumentParser:
         assert "not found" in str(exc_info.value).lower()
         assert exc_info.value.details["path"] == "/nonexistent/file.pdf"
     
+    def test_get_page_count_rejects_truncated_file(self, parser):
+        """Test that files too small to be a PDF are rejected before opening."""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        temp_file.write(b'%PDF-1.4\n')
+        temp_file.close()
+        
+        try:
+            with patch('app.document_parser.fitz.open') as mock_open:
+                with pytest.raises(PDFValidationError) as exc_info:
+                    parser.get_page_count(temp_file.name)
+            
+            mock_open.assert_not_called()
+            assert "invalid" in str(exc_info.value).lower()
+            assert exc_info.value.details["size"] == 9
+        finally:
+            os.unlink(temp_file.name)
+    
     def test_get_page_count_empty_pdf(self, parser, empty_pdf):
         """Test get_page_count with empty PDF (no pages)."""
         with pytest.raises(PDFValidationError) as exc_info:
@@ -209,9 +227,181 @@ class TestDocumentParser:
             # Image should be PIL Image
             assert isinstance(page.image, Image.Image)
             
-            # Image should have RGB mode (from PPM conversion)
+            # Image should have RGB mode (from the raw pixmap samples)
             assert page.image.mode == "RGB"
             
             # Image dimensions should match reported dimensions
             assert page.image.width == page.width
             assert page.image.height == page.height
+    
+    def test_extract_pages_keeps_order_of_differently_sized_pages(self):
+        """Test that pages of different sizes come back in page order."""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        temp_path = temp_file.name
+        temp_file.close()
+        
+        doc = fitz.open()
+        for i in range(7):
+            page = doc.new_page(width=200, height=200 + i)
+            page.insert_text((20, 20), f"Page {i + 1}", fontsize=12)
+        doc.save(temp_path)
+        doc.close()
+        
+        try:
+            pages = DocumentParser(dpi=72).extract_pages(temp_path)
+            
+            assert [page.page_number for page in pages] == list(range(1, 8))
+            # Each page has a distinct height, so order is verifiable
+            assert [page.height for page in pages] == [200 + i for i in range(7)]
+        finally:
+            os.unlink(temp_path)
+    
+    def test_extract_pages_matches_pixmap_pixels(self, parser, sample_pdf):
+        """Test that images built from raw samples match the rendered pixmap."""
+        import io
+        
+        pages = parser.extract_pages(sample_pdf)
+        
+        doc = fitz.open(sample_pdf)
+        zoom = parser.dpi / 72.0
+        pix = doc[0].get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False)
+        expected = Image.open(io.BytesIO(pix.tobytes("ppm")))
+        doc.close()
+        
+        assert pages[0].image.tobytes() == expected.tobytes()
+    
+    def test_extract_pages_never_renders_alpha(self):
+        """Test that pages with transparency are still rendered as plain RGB."""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        temp_path = temp_file.name
+        temp_file.close()
+        
+        doc = fitz.open()
+        page = doc.new_page(width=200, height=200)
+        page.draw_rect(fitz.Rect(20, 20, 120, 120), color=(1, 0, 0), fill=(0, 0, 1), fill_opacity=0.5)
+        doc.save(temp_path)
+        doc.close()
+        
+        try:
+            pages = DocumentParser(dpi=72).extract_pages(temp_path)
+            
+            assert pages[0].image.mode == "RGB"
+            assert len(pages[0].image.tobytes()) == pages[0].width * pages[0].height * 3
+        finally:
+            os.unlink(temp_path)
+    
+    def test_extract_pages_grayscale(self):
+        """Test that grayscale rendering yields single-channel pages on both paths."""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        temp_path = temp_file.name
+        temp_file.close()
+        
+        doc = fitz.open()
+        for i in range(5):
+            page = doc.new_page(width=200, height=200)
+            page.insert_text((20, 40), f"Page {i + 1}", fontsize=18)
+        doc.save(temp_path)
+        doc.close()
+        
+        try:
+            parser = DocumentParser(dpi=72, grayscale=True)
+            pages = parser.extract_pages(temp_path)
+            streamed = list(parser.iter_pages(temp_path))
+            
+            for page in pages:
+                assert page.image.mode == "L"
+                assert len(page.image.tobytes()) == page.width * page.height
+            assert [p.image.tobytes() for p in streamed] == [p.image.tobytes() for p in pages]
+        finally:
+            os.unlink(temp_path)
+    
+    def test_extract_pages_adaptive_dpi(self):
+        """Test that adaptive DPI lowers resolution only for text-dense pages."""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        temp_path = temp_file.name
+        temp_file.close()
+        
+        doc = fitz.open()
+        dense = doc.new_page(width=595, height=842)
+        dense.insert_textbox(fitz.Rect(36, 36, 559, 806), "lorem ipsum dolor " * 400, fontsize=9)
+        sparse = doc.new_page(width=595, height=842)
+        sparse.insert_text((50, 50), "Figure 1", fontsize=12)
+        doc.save(temp_path)
+        doc.close()
+        
+        try:
+            pages = DocumentParser(dpi=300, adaptive_dpi=True).extract_pages(temp_path)
+            
+            assert pages[0].dpi == DocumentParser.TEXT_DENSE_DPI
+            assert pages[0].width == round(595 * DocumentParser.TEXT_DENSE_DPI / 72)
+            assert pages[1].dpi == 300
+            
+            # Adaptive DPI is opt-in
+            pages = DocumentParser(dpi=300).extract_pages(temp_path)
+            assert [page.dpi for page in pages] == [300, 300]
+        finally:
+            os.unlink(temp_path)
+    
+    def test_iter_pages_matches_extract_pages(self, parser, sample_pdf):
+        """Test that streamed pages match the pages extract_pages renders."""
+        streamed = list(parser.iter_pages(sample_pdf, prefetch=1))
+        extracted = parser.extract_pages(sample_pdf)
+        
+        assert [p.page_number for p in streamed] == [1, 2]
+        assert [p.image.tobytes() for p in streamed] == [p.image.tobytes() for p in extracted]
+    
+    def test_iter_pages_renders_from_a_given_document(self, parser, sample_pdf):
+        """Test that iter_pages renders from an open document and leaves it open."""
+        doc = parser.open_document(sample_pdf)
+        try:
+            with patch('app.document_parser.fitz.open') as mock_open:
+                streamed = list(parser.iter_pages(sample_pdf, doc=doc))
+            
+            mock_open.assert_not_called()
+            assert [p.page_number for p in streamed] == [1, 2]
+            assert not doc.is_closed
+        finally:
+            doc.close()
+    
+    def test_iter_pages_renders_ahead_on_another_thread(self, parser, sample_pdf):
+        """Test that the next page is rendered off the caller's thread before it is asked for."""
+        import threading
+        from app import document_parser
+        
+        rendered = []
+        original = document_parser._page_from_pixmap
+        
+        def record(*args):
+            rendered.append(threading.current_thread())
+            return original(*args)
+        
+        with patch('app.document_parser._page_from_pixmap', side_effect=record):
+            pages = parser.iter_pages(sample_pdf, prefetch=2)
+            first = next(pages)
+            remaining = list(pages)
+        
+        assert first.page_number == 1 and len(remaining) == 1
+        assert len(rendered) == 2
+        assert threading.current_thread() not in rendered
+    
+    def test_iter_pages_empty_pdf(self, parser, empty_pdf):
+        """Test iter_pages with empty PDF."""
+        with pytest.raises(PDFValidationError) as exc_info:
+            list(parser.iter_pages(empty_pdf))
+        
+        assert "no pages" in str(exc_info.value).lower()
+    
+    def test_iter_pages_corrupted_pdf(self, parser, corrupted_pdf):
+        """Test iter_pages with corrupted PDF."""
+        with pytest.raises(PDFValidationError):
+            list(parser.iter_pages(corrupted_pdf))
+    
+    def test_zoom_matrix_is_cached_per_dpi(self):
+        """Test that render matrices are built once per DPI."""
+        from app.document_parser import _zoom_matrix
+        
+        mat = _zoom_matrix(144)
+        
+        assert _zoom_matrix(144) is mat
+        assert (mat.a, mat.d) == (2.0, 2.0)
+        assert _zoom_matrix(72) is not mat
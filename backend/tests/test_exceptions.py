@@ -37,6 +37,17 @@ class TestConversionError:
         """Test that ConversionError is an Exception."""
         error = ConversionError("Test")
         assert isinstance(error, Exception)
+    
+    def test_pickle_round_trip_keeps_details(self):
+        """Test that errors raised in worker processes keep their details."""
+        import pickle
+        
+        error = PDFValidationError("Bad page", details={"page_number": 3})
+        restored = pickle.loads(pickle.dumps(error))
+        
+        assert type(restored) is PDFValidationError
+        assert restored.message == "Bad page"
+        assert restored.details == {"page_number": 3}
 
 
 class TestPDFValidationError:
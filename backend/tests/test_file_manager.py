@@ -4,8 +4,11 @@ Unit tests for FileManager component.
 Tests file storage, retrieval, cleanup, and error handling.
 """
 
+import io
 import os
 import shutil
+import subprocess
+import sys
 import tempfile
 import time
 from datetime import datetime, timedelta
@@ -15,7 +18,7 @@ from unittest.mock import Mock, patch
 import pytest
 from werkzeug.datastructures import FileStorage
 
-from app.file_manager import FileManager
+from app.file_manager import FileManager, _fast_rmtree
 from app.exceptions import FileIOError, JobNotFoundError
 
 
@@ -40,6 +43,7 @@ def mock_file():
     """Create a mock FileStorage object."""
     mock = Mock(spec=FileStorage)
     mock.filename = "test_document.pdf"
+    mock.stream = io.BytesIO(b"%PDF-1.4 test content")
     return mock
 
 
@@ -89,8 +93,8 @@ class TestStoreUpload:
         assert expected_dir.is_dir()
         assert file_path == str(expected_file.absolute())
         
-        # Verify save was called
-        mock_file.save.assert_called_once_with(str(expected_file))
+        # Verify the upload's bytes were written
+        assert expected_file.read_bytes() == b"%PDF-1.4 test content"
     
     def test_creates_job_directory(self, file_manager, mock_file, temp_upload_folder):
         """Test that job directory is created if it doesn't exist."""
@@ -107,13 +111,114 @@ class TestStoreUpload:
     def test_raises_error_on_save_failure(self, file_manager, mock_file):
         """Test that FileIOError is raised when file save fails."""
         job_id = "error-job"
-        mock_file.save.side_effect = IOError("Disk full")
+        mock_file.stream = Mock()
+        mock_file.stream.fileno.side_effect = io.UnsupportedOperation()
+        mock_file.stream.read.side_effect = IOError("Disk full")
         
         with pytest.raises(FileIOError) as exc_info:
             file_manager.store_upload(mock_file, job_id)
         
         assert "Failed to store uploaded file" in str(exc_info.value)
         assert exc_info.value.details["job_id"] == job_id
+    
+    def test_copies_spooled_upload_with_sendfile(self, file_manager, mock_file):
+        """Test that uploads spilled to a temp file are copied in the kernel."""
+        if not hasattr(os, "sendfile"):
+            pytest.skip("os.sendfile not available")
+        
+        data = b"%PDF-1.4 " + os.urandom(3 * 1024 * 1024)
+        mock_file.stream = tempfile.TemporaryFile()
+        mock_file.stream.write(data)
+        mock_file.stream.seek(0)
+        
+        with patch("app.file_manager.shutil.copyfileobj") as mock_copy:
+            file_path = file_manager.store_upload(mock_file, "sendfile-job")
+        
+        mock_file.stream.close()
+        mock_copy.assert_not_called()
+        assert Path(file_path).read_bytes() == data
+    
+    def test_falls_back_to_buffered_copy_when_sendfile_fails(self, file_manager, mock_file):
+        """Test that a sendfile error before any bytes are sent uses copyfileobj."""
+        mock_file.stream = tempfile.TemporaryFile()
+        mock_file.stream.write(b"%PDF-1.4 fallback")
+        mock_file.stream.seek(0)
+        
+        with patch("app.file_manager.os.sendfile", side_effect=OSError("EINVAL"), create=True):
+            file_path = file_manager.store_upload(mock_file, "fallback-job")
+        
+        mock_file.stream.close()
+        assert Path(file_path).read_bytes() == b"%PDF-1.4 fallback"
+
+
+class TestOpenUploadStream:
+    """Test open_upload_stream method."""
+    
+    def test_opens_input_file_for_writing(self, file_manager, temp_upload_folder):
+        """Test that the stream writes to the job's input.pdf."""
+        job_id = "stream-job"
+        
+        with file_manager.open_upload_stream(job_id) as out:
+            out.write(b"%PDF-1.4 streamed")
+        
+        expected_file = Path(temp_upload_folder) / job_id / "input.pdf"
+        assert expected_file.read_bytes() == b"%PDF-1.4 streamed"
+        assert file_manager.get_input_path(job_id) == str(expected_file.absolute())
+    
+    def test_raises_error_on_open_failure(self, file_manager):
+        """Test that FileIOError is raised when the file cannot be opened."""
+        with patch("builtins.open", side_effect=IOError("Disk full")):
+            with pytest.raises(FileIOError) as exc_info:
+                file_manager.open_upload_stream("error-job")
+        
+        assert exc_info.value.details["job_id"] == "error-job"
+
+
+class TestHashFile:
+    """Test hash_file method."""
+    
+    def test_hash_matches_content_hasher(self, file_manager, temp_upload_folder):
+        """Test that file hashes match hashing the bytes directly."""
+        from app.file_manager import new_content_hasher
+        
+        content = b"%PDF-1.4 " + os.urandom(200 * 1024)
+        path = Path(temp_upload_folder) / "input.pdf"
+        path.write_bytes(content)
+        
+        hasher = new_content_hasher()
+        hasher.update(content)
+        
+        assert file_manager.hash_file(str(path)) == hasher.hexdigest()
+    
+    def test_missing_file_raises_file_io_error(self, file_manager):
+        """Test that unreadable files raise FileIOError."""
+        with pytest.raises(FileIOError):
+            file_manager.hash_file("/non/existent/input.pdf")
+
+
+class TestHasPdfTrailer:
+    """Test has_pdf_trailer method."""
+    
+    def test_detects_eof_marker(self, file_manager, temp_upload_folder):
+        """Test that a complete PDF is recognised."""
+        path = Path(temp_upload_folder) / "complete.pdf"
+        path.write_bytes(b"%PDF-1.4\n" + b"x" * 5000 + b"\n%%EOF\n")
+        
+        assert file_manager.has_pdf_trailer(str(path)) is True
+    
+    def test_rejects_truncated_file(self, file_manager, temp_upload_folder):
+        """Test that a file without the trailer is flagged."""
+        path = Path(temp_upload_folder) / "truncated.pdf"
+        path.write_bytes(b"%PDF-1.4\n" + b"x" * 5000)
+        
+        assert file_manager.has_pdf_trailer(str(path)) is False
+    
+    def test_only_scans_the_tail(self, file_manager, temp_upload_folder):
+        """Test that a marker far from the end does not count."""
+        path = Path(temp_upload_folder) / "early_marker.pdf"
+        path.write_bytes(b"%PDF-1.4\n%%EOF\n" + b"x" * 5000)
+        
+        assert file_manager.has_pdf_trailer(str(path)) is False
 
 
 class TestStoreOutput:
@@ -170,6 +275,31 @@ class TestStoreOutput:
             if os.path.exists(source_path):
                 os.unlink(source_path)
     
+    def test_moves_output_within_filesystem(self, file_manager, temp_upload_folder):
+        """Test that an output on the same filesystem is renamed, not copied."""
+        source_path = os.path.join(temp_upload_folder, "converted.docx")
+        with open(source_path, 'w') as f:
+            f.write("Renamed content")
+        
+        with patch("app.file_manager.shutil.copyfile") as mock_copy:
+            output_path = file_manager.store_output(source_path, "rename-job")
+        
+        mock_copy.assert_not_called()
+        assert not os.path.exists(source_path)
+        assert Path(output_path).read_text() == "Renamed content"
+    
+    def test_copies_output_across_filesystems(self, file_manager, temp_upload_folder):
+        """Test that a cross-device rename falls back to a plain copy."""
+        import errno
+        source_path = os.path.join(temp_upload_folder, "converted.docx")
+        with open(source_path, 'w') as f:
+            f.write("Copied content")
+        
+        with patch("app.file_manager.os.replace", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):
+            output_path = file_manager.store_output(source_path, "exdev-job")
+        
+        assert Path(output_path).read_text() == "Copied content"
+    
     def test_raises_error_on_copy_failure(self, file_manager):
         """Test that FileIOError is raised when file copy fails."""
         job_id = "copy-error-job"
@@ -182,6 +312,74 @@ class TestStoreOutput:
         assert exc_info.value.details["job_id"] == job_id
 
 
+class TestObjectStorage:
+    """Test S3 upload and presigned download support."""
+    
+    def test_local_mode_skips_object_storage(self, file_manager):
+        """Test that nothing is uploaded or signed without a bucket."""
+        file_manager.s3_bucket = None
+        
+        assert file_manager.upload_output("job-1", "/tmp/output.docx") is None
+        assert file_manager.get_download_url("job-1", "report.docx") is None
+    
+    def test_store_output_uploads_to_bucket(self, temp_upload_folder):
+        """Test that store_output puts the .docx into the bucket."""
+        manager = FileManager(upload_folder=temp_upload_folder, s3_bucket="outputs")
+        manager._s3_client = Mock()
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.docx', delete=False) as tmp:
+            tmp.write("Content")
+            source_path = tmp.name
+        
+        try:
+            output_path = manager.store_output(source_path, "s3-job")
+        finally:
+            if os.path.exists(source_path):
+                os.unlink(source_path)
+        
+        manager._s3_client.upload_file.assert_called_once()
+        args, kwargs = manager._s3_client.upload_file.call_args
+        assert args == (output_path, "outputs", "s3-job/output.docx")
+        assert "ContentType" in kwargs["ExtraArgs"]
+    
+    def test_get_download_url_presigns_get_object(self, temp_upload_folder):
+        """Test that download URLs are presigned with an attachment filename."""
+        manager = FileManager(upload_folder=temp_upload_folder, s3_bucket="outputs")
+        manager._s3_client = Mock()
+        manager._s3_client.generate_presigned_url.return_value = "https://s3/signed"
+        
+        url = manager.get_download_url("s3-job", "report.docx", expires_in=60)
+        
+        assert url == "https://s3/signed"
+        args, kwargs = manager._s3_client.generate_presigned_url.call_args
+        assert args == ("get_object",)
+        assert kwargs["ExpiresIn"] == 60
+        assert kwargs["Params"]["Bucket"] == "outputs"
+        assert kwargs["Params"]["Key"] == "s3-job/output.docx"
+        assert 'filename="report.docx"' in kwargs["Params"]["ResponseContentDisposition"]
+    
+    def test_upload_failure_raises_file_io_error(self, temp_upload_folder):
+        """Test that S3 errors are wrapped in FileIOError."""
+        manager = FileManager(upload_folder=temp_upload_folder, s3_bucket="outputs")
+        manager._s3_client = Mock()
+        manager._s3_client.upload_file.side_effect = Exception("Access Denied")
+        
+        with pytest.raises(FileIOError) as exc_info:
+            manager.upload_output("s3-job", "/tmp/output.docx")
+        
+        assert exc_info.value.details["bucket"] == "outputs"
+    
+    def test_missing_boto3_raises_file_io_error(self, temp_upload_folder):
+        """Test that a configured bucket without boto3 fails clearly."""
+        manager = FileManager(upload_folder=temp_upload_folder, s3_bucket="outputs")
+        
+        with patch.dict(sys.modules, {"boto3": None}):
+            with pytest.raises(FileIOError) as exc_info:
+                manager.get_download_url("s3-job", "report.docx")
+        
+        assert "boto3" in str(exc_info.value)
+
+
 class TestGetOutputPath:
     """Test get_output_path method."""
     
@@ -217,6 +415,55 @@ class TestGetOutputPath:
         assert result is None
 
 
+class TestPathLookupCache:
+    """Test the short-lived cache behind get_input_path/get_output_path."""
+    
+    def _make_output(self, root, job_id):
+        job_dir = Path(root) / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        output_file = job_dir / "output.docx"
+        output_file.write_text("Test output")
+        return output_file
+    
+    def test_repeated_hits_skip_stat(self, file_manager, temp_upload_folder):
+        """Test that a cached hit is served without checking the file again."""
+        self._make_output(temp_upload_folder, "cached-job")
+        first = file_manager.get_output_path("cached-job")
+        
+        with patch.object(Path, 'exists') as mock_exists:
+            second = file_manager.get_output_path("cached-job")
+        
+        mock_exists.assert_not_called()
+        assert second == first
+    
+    def test_misses_are_not_cached(self, file_manager, temp_upload_folder):
+        """Test that a file written after a miss is found immediately."""
+        assert file_manager.get_output_path("late-job") is None
+        
+        output_file = self._make_output(temp_upload_folder, "late-job")
+        
+        assert file_manager.get_output_path("late-job") == str(output_file.absolute())
+    
+    def test_expired_entries_are_rechecked(self, file_manager, temp_upload_folder):
+        """Test that hits are re-validated after the TTL."""
+        output_file = self._make_output(temp_upload_folder, "ttl-job")
+        file_manager.get_output_path("ttl-job")
+        output_file.unlink()
+        
+        file_manager.PATH_CACHE_TTL_SECONDS = 0
+        
+        assert file_manager.get_output_path("ttl-job") is None
+    
+    def test_delete_job_files_invalidates_cache(self, file_manager, temp_upload_folder):
+        """Test that deleting a job forgets its cached paths."""
+        self._make_output(temp_upload_folder, "deleted-job")
+        assert file_manager.get_output_path("deleted-job") is not None
+        
+        file_manager.delete_job_files("deleted-job")
+        
+        assert file_manager.get_output_path("deleted-job") is None
+
+
 class TestGetInputPath:
     """Test get_input_path method."""
     
@@ -305,6 +552,118 @@ class TestCleanupOldFiles:
         deleted_count = fm.cleanup_old_files(max_age_hours=24)
         
         assert deleted_count == 0
+    
+    def test_scan_skips_files_and_does_not_follow_symlinks(self, file_manager, temp_upload_folder):
+        """Test that stray files and symlinked directories are left alone."""
+        old_time = time.time() - 48 * 3600
+        
+        stray = Path(temp_upload_folder) / "stray.txt"
+        stray.write_text("keep")
+        os.utime(stray, (old_time, old_time))
+        
+        outside = tempfile.mkdtemp()
+        try:
+            os.utime(outside, (old_time, old_time))
+            link = Path(temp_upload_folder) / "linked-job"
+            try:
+                link.symlink_to(outside, target_is_directory=True)
+            except (OSError, NotImplementedError):
+                pytest.skip("symlinks not supported")
+            
+            deleted_count = file_manager.cleanup_old_files(max_age_hours=24)
+            
+            assert deleted_count == 0
+            assert stray.exists()
+            assert os.path.isdir(outside)
+        finally:
+            shutil.rmtree(outside, ignore_errors=True)
+
+
+class TestFastRmtree:
+    """Test the native directory removal helper."""
+    
+    def _make_tree(self, root, name):
+        job_dir = Path(root) / name
+        (job_dir / "pages").mkdir(parents=True)
+        (job_dir / "input.pdf").write_bytes(b"%PDF-1.4")
+        (job_dir / "pages" / "1.png").write_bytes(b"png")
+        return job_dir
+    
+    @pytest.mark.skipif(os.name != "posix", reason="rm -rf path is POSIX-only")
+    def test_uses_single_rm_for_all_paths(self, temp_upload_folder):
+        """Test that several directories are removed with one rm -rf call."""
+        dirs = [self._make_tree(temp_upload_folder, f"job-{i}") for i in range(3)]
+        
+        with patch('app.file_manager.Config.FAST_RM', True), \
+             patch('app.file_manager.subprocess.run', wraps=subprocess.run) as mock_run:
+            _fast_rmtree(*dirs)
+        
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][:3] == ["rm", "-rf", "--"]
+        assert not any(d.exists() for d in dirs)
+    
+    def test_python_path_when_disabled(self, temp_upload_folder):
+        """Test that FAST_RM=false uses shutil.rmtree only."""
+        job_dir = self._make_tree(temp_upload_folder, "job-py")
+        
+        with patch('app.file_manager.Config.FAST_RM', False), \
+             patch('app.file_manager.subprocess.run') as mock_run:
+            _fast_rmtree(job_dir)
+        
+        mock_run.assert_not_called()
+        assert not job_dir.exists()
+    
+    def test_falls_back_when_native_tool_fails(self, temp_upload_folder):
+        """Test that a failing rm falls back to shutil.rmtree."""
+        job_dir = self._make_tree(temp_upload_folder, "job-fallback")
+        
+        with patch('app.file_manager.Config.FAST_RM', True), \
+             patch('app.file_manager.subprocess.run', side_effect=OSError("no rm")):
+            _fast_rmtree(job_dir)
+        
+        assert not job_dir.exists()
+    
+    def test_falls_back_when_native_tool_leaves_paths(self, temp_upload_folder):
+        """Test that paths still present after a "successful" rm are removed anyway."""
+        job_dir = self._make_tree(temp_upload_folder, "job-leftover")
+        
+        with patch('app.file_manager.Config.FAST_RM', True), \
+             patch('app.file_manager.subprocess.run') as mock_run:
+            _fast_rmtree(job_dir)
+        
+        mock_run.assert_called_once()
+        assert not job_dir.exists()
+    
+    def test_cleanup_removes_expired_directories_in_one_batch(self, file_manager, temp_upload_folder):
+        """Test that a single cleanup worker deletes all expired directories together."""
+        dirs = [self._make_tree(temp_upload_folder, f"old-{i}") for i in range(4)]
+        old_time = time.time() - 48 * 3600
+        for d in dirs:
+            os.utime(d, (old_time, old_time))
+        
+        file_manager.CLEANUP_MAX_WORKERS = 1
+        with patch('app.file_manager._fast_rmtree', wraps=_fast_rmtree) as mock_rm:
+            deleted = file_manager.cleanup_old_files(max_age_hours=24)
+        
+        assert deleted == 4
+        mock_rm.assert_called_once()
+        assert not any(d.exists() for d in dirs)
+    
+    def test_cleanup_spreads_batches_across_workers(self, file_manager, temp_upload_folder):
+        """Test that expired directories are split into concurrent batches."""
+        dirs = [self._make_tree(temp_upload_folder, f"old-{i}") for i in range(5)]
+        old_time = time.time() - 48 * 3600
+        for d in dirs:
+            os.utime(d, (old_time, old_time))
+        
+        file_manager.CLEANUP_MAX_WORKERS = 2
+        with patch('app.file_manager._fast_rmtree', wraps=_fast_rmtree) as mock_rm:
+            deleted = file_manager.cleanup_old_files(max_age_hours=24)
+        
+        assert deleted == 5
+        assert mock_rm.call_count == 2
+        assert sorted(len(call.args) for call in mock_rm.call_args_list) == [2, 3]
+        assert not any(d.exists() for d in dirs)
 
 
 class TestDeleteJobFiles:
@@ -324,6 +683,19 @@ class TestDeleteJobFiles:
         
         assert not job_dir.exists()
     
+    def test_single_job_delete_skips_native_tool(self, file_manager, temp_upload_folder):
+        """Test that one job directory is removed without starting rm."""
+        job_dir = Path(temp_upload_folder) / "single-job"
+        job_dir.mkdir(parents=True)
+        (job_dir / "input.pdf").write_text("Input")
+        
+        with patch('app.file_manager.Config.FAST_RM', True), \
+             patch('app.file_manager.subprocess.run') as mock_run:
+            file_manager.delete_job_files("single-job")
+        
+        mock_run.assert_not_called()
+        assert not job_dir.exists()
+    
     def test_raises_error_when_job_not_found(self, file_manager):
         """Test that JobNotFoundError is raised for non-existent job."""
         job_id = "non-existent-job"
@@ -374,6 +746,16 @@ class TestFilenameSanitization:
         
         # Should return a default filename
         assert sanitized == "file"
+    
+    def test_repeat_filenames_hit_the_cache(self, file_manager):
+        """Test that sanitizing the same name twice is served from the cache."""
+        from app.file_manager import _sanitize
+        
+        file_manager._sanitize_filename("invoice (copy).pdf")
+        hits = _sanitize.cache_info().hits
+        
+        assert file_manager._sanitize_filename("invoice (copy).pdf") == "invoice_copy.pdf"
+        assert _sanitize.cache_info().hits == hits + 1
 
 
 class TestGetOriginalFilename:
@@ -399,3 +781,31 @@ class TestGetOriginalFilename:
         filename = file_manager.get_original_filename(job_id)
         
         assert filename is None
+    
+    def test_caches_missing_output_briefly(self, file_manager, temp_upload_folder):
+        """Test that repeated lookups before conversion finishes skip the stat."""
+        job_id = "pending-output-job"
+        assert file_manager.get_original_filename(job_id) is None
+        
+        job_dir = Path(temp_upload_folder) / job_id
+        job_dir.mkdir(parents=True)
+        (job_dir / "output.docx").write_text("Output")
+        
+        with patch.object(file_manager, "get_output_path") as mock_lookup:
+            assert file_manager.get_original_filename(job_id) is None
+        mock_lookup.assert_not_called()
+        
+        # get_output_path itself never caches misses
+        assert file_manager.get_output_path(job_id) is not None
+    
+    def test_missing_output_cache_expires(self, file_manager, temp_upload_folder):
+        """Test that the output is found once the negative entry expires."""
+        job_id = "finished-output-job"
+        assert file_manager.get_original_filename(job_id) is None
+        
+        job_dir = Path(temp_upload_folder) / job_id
+        job_dir.mkdir(parents=True)
+        (job_dir / "output.docx").write_text("Output")
+        file_manager._missing_outputs[job_id] -= FileManager.MISSING_OUTPUT_TTL_SECONDS
+        
+        assert file_manager.get_original_filename(job_id) == f"converted_{job_id}.docx"
@@ -4,10 +4,12 @@ Unit tests for JobManager class.
 Tests job creation, state transitions, progress tracking, and error handling.
 """
 
-import pytest
 import json
+import pytest
+import uuid
 from datetime import datetime
 from unittest.mock import Mock, patch
+from redis.exceptions import ResponseError, WatchError
 from app.job_manager import JobManager
 from app.exceptions import JobNotFoundError
 
@@ -15,7 +17,10 @@ from app.exceptions import JobNotFoundError
 @pytest.fixture
 def mock_redis():
     """Create a mock Redis client."""
-    return Mock()
+    redis = Mock()
+    # EXISTS, HSET, HINCRBY, EXPIRE results of a progress write
+    redis.pipeline.return_value.execute.return_value = [1, 3, 2, True]
+    return redis
 
 
 @pytest.fixture
@@ -24,6 +29,11 @@ def job_manager(mock_redis):
     return JobManager(redis_client=mock_redis)
 
 
+def stored_fields(mock_redis):
+    """Return the field mapping of the last pipelined HSET."""
+    return mock_redis.pipeline.return_value.hset.call_args[1]["mapping"]
+
+
 class TestJobCreation:
     """Tests for job creation functionality."""
     
@@ -33,13 +43,14 @@ class TestJobCreation:
         
         job_id = job_manager.create_job(file_path)
         
-        # Verify job_id is a valid UUID string
+        # Verify job_id is a valid hex UUID string
         assert isinstance(job_id, str)
-        assert len(job_id) == 36  # UUID format: 8-4-4-4-12
-        assert job_id.count('-') == 4
+        assert len(job_id) == 32  # UUID hex format, no dashes
+        assert uuid.UUID(hex=job_id).hex == job_id
         
-        # Verify Redis setex was called
-        assert mock_redis.setex.called
+        # Verify the job hash was written
+        assert mock_redis.pipeline.return_value.hset.called
+        mock_redis.pipeline.return_value.execute.assert_called_once()
     
     def test_create_job_initializes_pending_status(self, job_manager, mock_redis):
         """Test that new jobs start with 'pending' status."""
@@ -48,8 +59,9 @@ class TestJobCreation:
         job_id = job_manager.create_job(file_path)
         
         # Get the data that was stored in Redis
-        call_args = mock_redis.setex.call_args
-        stored_data = json.loads(call_args[0][2])
+        pipe = mock_redis.pipeline.return_value
+        assert pipe.hset.call_args[0][0] == f"job:{job_id}"
+        stored_data = stored_fields(mock_redis)
         
         assert stored_data["status"] == "pending"
         assert stored_data["job_id"] == job_id
@@ -62,12 +74,11 @@ class TestJobCreation:
         job_manager.create_job(file_path)
         
         # Get the data that was stored in Redis
-        call_args = mock_redis.setex.call_args
-        stored_data = json.loads(call_args[0][2])
+        stored_data = stored_fields(mock_redis)
         
-        assert stored_data["progress"]["current_page"] == 0
-        assert stored_data["progress"]["total_pages"] == 0
-        assert stored_data["progress"]["percentage"] == 0
+        assert stored_data["progress_current_page"] == 0
+        assert stored_data["progress_total_pages"] == 0
+        assert stored_data["progress_percentage"] == 0
     
     def test_create_job_sets_timestamps(self, job_manager, mock_redis):
         """Test that new jobs have created_at and updated_at timestamps."""
@@ -76,8 +87,7 @@ class TestJobCreation:
         job_manager.create_job(file_path)
         
         # Get the data that was stored in Redis
-        call_args = mock_redis.setex.call_args
-        stored_data = json.loads(call_args[0][2])
+        stored_data = stored_fields(mock_redis)
         
         assert "created_at" in stored_data
         assert "updated_at" in stored_data
@@ -85,18 +95,18 @@ class TestJobCreation:
         # Verify timestamps are valid ISO format
         datetime.fromisoformat(stored_data["created_at"])
         datetime.fromisoformat(stored_data["updated_at"])
+        assert stored_data["created_at"] == stored_data["updated_at"]
     
     def test_create_job_sets_expiration(self, job_manager, mock_redis):
         """Test that jobs are stored with expiration time."""
         file_path = "/uploads/test.pdf"
         
-        job_manager.create_job(file_path)
-        
-        # Verify setex was called with correct expiration
-        call_args = mock_redis.setex.call_args
-        expiration = call_args[0][1]
+        job_id = job_manager.create_job(file_path)
         
-        assert expiration == JobManager.JOB_EXPIRATION_SECONDS
+        # Verify expire was pipelined with correct expiration
+        mock_redis.pipeline.return_value.expire.assert_called_once_with(
+            f"job:{job_id}", JobManager.JOB_EXPIRATION_SECONDS
+        )
 
 
 class TestProgressUpdates:
@@ -106,93 +116,120 @@ class TestProgressUpdates:
         """Test that update_progress stores current and total page counts."""
         job_id = "test-job-123"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "processing",
-            "progress": {"current_page": 0, "total_pages": 0, "percentage": 0}
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.update_progress(job_id, current_page=3, total_pages=10)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
         
-        assert updated_data["progress"]["current_page"] == 3
-        assert updated_data["progress"]["total_pages"] == 10
+        assert updated_data["progress_current_page"] == 3
+        assert updated_data["progress_total_pages"] == 10
     
     def test_update_progress_calculates_percentage(self, job_manager, mock_redis):
         """Test that update_progress calculates percentage correctly."""
         job_id = "test-job-123"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "processing",
-            "progress": {"current_page": 0, "total_pages": 0, "percentage": 0}
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.update_progress(job_id, current_page=5, total_pages=10)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
         
-        assert updated_data["progress"]["percentage"] == 50
+        assert updated_data["progress_percentage"] == 50
     
     def test_update_progress_handles_zero_total_pages(self, job_manager, mock_redis):
         """Test that update_progress handles zero total pages without error."""
         job_id = "test-job-123"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "processing",
-            "progress": {"current_page": 0, "total_pages": 0, "percentage": 0}
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.update_progress(job_id, current_page=0, total_pages=0)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
         
-        assert updated_data["progress"]["percentage"] == 0
+        assert updated_data["progress_percentage"] == 0
     
     def test_update_progress_updates_timestamp(self, job_manager, mock_redis):
         """Test that update_progress updates the updated_at timestamp."""
         job_id = "test-job-123"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "processing",
-            "progress": {"current_page": 0, "total_pages": 0, "percentage": 0},
-            "updated_at": "2024-01-01T00:00:00"
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.update_progress(job_id, current_page=1, total_pages=10)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
+        
+        datetime.fromisoformat(updated_data["updated_at"])
+    
+    def test_update_progress_bumps_version(self, job_manager, mock_redis):
+        """Test that every saved change increments the job version."""
+        job_id = "test-job-123"
+        
+        job_manager.update_progress(job_id, current_page=1, total_pages=10)
+        
+        mock_redis.pipeline.return_value.hincrby.assert_called_once_with(
+            f"job:{job_id}", "version", 1
+        )
+    
+    def test_update_progress_is_one_round_trip(self, job_manager, mock_redis):
+        """Test that progress is written without reading the job back."""
+        job_manager.update_progress("test-job-123", current_page=1, total_pages=10)
         
-        assert updated_data["updated_at"] != "2024-01-01T00:00:00"
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        mock_redis.pipeline.return_value.execute.assert_called_once()
+        mock_redis.hgetall.assert_not_called()
     
     def test_update_progress_raises_on_nonexistent_job(self, job_manager, mock_redis):
         """Test that update_progress raises JobNotFoundError for nonexistent job."""
         job_id = "nonexistent-job"
-        mock_redis.get.return_value = None
+        mock_redis.pipeline.return_value.execute.return_value = [0, 4, 1, True]
         
         with pytest.raises(JobNotFoundError) as exc_info:
             job_manager.update_progress(job_id, current_page=1, total_pages=10)
         
         assert job_id in str(exc_info.value)
+        # The partial hash created by HSET is removed again
+        mock_redis.delete.assert_called_once_with(f"job:{job_id}")
+    
+    def test_update_progress_skips_pages_between_strides(self, job_manager, mock_redis):
+        """Test that large documents only write every total_pages // 100 pages."""
+        for page in range(1, 501):
+            job_manager.update_progress("test-job-123", current_page=page, total_pages=500)
+        
+        assert mock_redis.pipeline.return_value.execute.call_count == 100
+        assert stored_fields(mock_redis)["progress_current_page"] == 500
+    
+    def test_update_progress_always_writes_last_page(self, job_manager, mock_redis):
+        """Test that the final page is written even off a stride boundary."""
+        job_manager.update_progress("test-job-123", current_page=203, total_pages=203)
+        
+        assert stored_fields(mock_redis)["progress_percentage"] == 100
+    
+    def test_update_progress_writes_every_page_of_small_documents(self, job_manager, mock_redis):
+        """Test that documents of up to 100 pages are not throttled."""
+        for page in range(1, 51):
+            job_manager.update_progress("test-job-123", current_page=page, total_pages=50)
+        
+        assert mock_redis.pipeline.return_value.execute.call_count == 50
+    
+    def test_update_progress_batch_writes_latest_item_once(self, job_manager, mock_redis):
+        """Test that a batch of updates costs a single round trip."""
+        job_id = "test-job-123"
+        
+        job_manager.update_progress_batch(job_id, [(1, 10), (2, 10), (3, 10)])
+        
+        assert mock_redis.pipeline.return_value.execute.call_count == 1
+        updated_data = stored_fields(mock_redis)
+        assert updated_data["progress_current_page"] == 3
+        assert updated_data["progress_percentage"] == 30
+    
+    def test_update_progress_batch_is_not_throttled(self, job_manager, mock_redis):
+        """Test that buffered batches are written even between strides."""
+        job_manager.update_progress_batch("test-job-123", [(1, 500), (3, 500)])
+        
+        assert stored_fields(mock_redis)["progress_current_page"] == 3
+    
+    def test_update_progress_batch_ignores_empty_batch(self, job_manager, mock_redis):
+        """Test that an empty batch does not touch Redis."""
+        job_manager.update_progress_batch("test-job-123", [])
+        
+        mock_redis.pipeline.assert_not_called()
 
 
 class TestStateTransitions:
@@ -202,39 +239,36 @@ class TestStateTransitions:
         """Test that mark_processing changes status to 'processing'."""
         job_id = "test-job-123"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "pending"
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.mark_processing(job_id)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
         
         assert updated_data["status"] == "processing"
     
+    def test_mark_processing_is_one_round_trip(self, job_manager, mock_redis):
+        """Test that mark_processing writes without reading the job first."""
+        job_manager.mark_processing("test-job-123")
+        
+        mock_redis.hgetall.assert_not_called()
+        mock_redis.pipeline.return_value.execute.assert_called_once()
+    
+    def test_mark_processing_raises_on_nonexistent_job(self, job_manager, mock_redis):
+        """Test that mark_processing raises JobNotFoundError for nonexistent job."""
+        mock_redis.pipeline.return_value.execute.return_value = [0, 2, 1, True]
+        
+        with pytest.raises(JobNotFoundError):
+            job_manager.mark_processing("nonexistent-job")
+    
     def test_mark_completed_changes_status(self, job_manager, mock_redis):
         """Test that mark_completed changes status to 'completed'."""
         job_id = "test-job-123"
         output_path = "/uploads/test-job-123/output.docx"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "processing",
-            "progress": {"current_page": 5, "total_pages": 10, "percentage": 50}
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.mark_completed(job_id, output_path)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
         
         assert updated_data["status"] == "completed"
         assert updated_data["output_path"] == output_path
@@ -244,86 +278,87 @@ class TestStateTransitions:
         job_id = "test-job-123"
         output_path = "/uploads/test-job-123/output.docx"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "processing",
-            "progress": {"current_page": 5, "total_pages": 10, "percentage": 50}
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.mark_completed(job_id, output_path)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
+        
+        assert updated_data["progress_percentage"] == 100
+    
+    def test_completed_job_reports_every_page_done(self, job_manager, mock_redis):
+        """Test that completed jobs read back with current_page == total_pages."""
+        mock_redis.hgetall.return_value = {
+            "job_id": "test-job-123",
+            "status": "completed",
+            "progress_current_page": "5",
+            "progress_total_pages": "10",
+            "progress_percentage": "100"
+        }
+        
+        result = job_manager.get_status("test-job-123")
         
-        assert updated_data["progress"]["percentage"] == 100
-        assert updated_data["progress"]["current_page"] == 10
+        assert result["progress"] == {
+            "current_page": 10,
+            "total_pages": 10,
+            "percentage": 100
+        }
     
     def test_mark_completed_sets_timestamp(self, job_manager, mock_redis):
         """Test that mark_completed sets completed_at timestamp."""
         job_id = "test-job-123"
         output_path = "/uploads/test-job-123/output.docx"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "processing",
-            "progress": {"current_page": 5, "total_pages": 10, "percentage": 50}
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.mark_completed(job_id, output_path)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
         
         assert "completed_at" in updated_data
         datetime.fromisoformat(updated_data["completed_at"])
     
+    def test_mark_completed_is_one_round_trip(self, job_manager, mock_redis):
+        """Test that mark_completed writes without reading the job first."""
+        job_manager.mark_completed("test-job-123", "/uploads/test-job-123/output.docx")
+        
+        mock_redis.hget.assert_not_called()
+        mock_redis.hgetall.assert_not_called()
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        mock_redis.pipeline.return_value.execute.assert_called_once()
+    
+    def test_mark_completed_raises_on_nonexistent_job(self, job_manager, mock_redis):
+        """Test that mark_completed raises JobNotFoundError for nonexistent job."""
+        mock_redis.pipeline.return_value.execute.return_value = [0, 4, 1, True]
+        
+        with pytest.raises(JobNotFoundError):
+            job_manager.mark_completed("nonexistent-job", "/output.docx")
+    
     def test_mark_failed_changes_status(self, job_manager, mock_redis):
         """Test that mark_failed changes status to 'failed'."""
         job_id = "test-job-123"
         error_message = "OCR processing failed on page 3"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "processing"
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.mark_failed(job_id, error_message)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
         
         assert updated_data["status"] == "failed"
         assert updated_data["error"] == error_message
+        mock_redis.hgetall.assert_not_called()
     
     def test_mark_failed_sets_timestamp(self, job_manager, mock_redis):
         """Test that mark_failed sets completed_at timestamp."""
         job_id = "test-job-123"
         error_message = "Processing failed"
         
-        # Mock existing job data
-        existing_data = {
-            "job_id": job_id,
-            "status": "processing"
-        }
-        mock_redis.get.return_value = json.dumps(existing_data)
-        
         job_manager.mark_failed(job_id, error_message)
         
         # Get the updated data
-        call_args = mock_redis.setex.call_args
-        updated_data = json.loads(call_args[0][2])
+        updated_data = stored_fields(mock_redis)
         
         assert "completed_at" in updated_data
         datetime.fromisoformat(updated_data["completed_at"])
+        assert updated_data["completed_at"] == updated_data["updated_at"]
 
 
 class TestGetStatus:
@@ -333,27 +368,34 @@ class TestGetStatus:
         """Test that get_status returns complete job data."""
         job_id = "test-job-123"
         
-        # Mock job data
-        job_data = {
+        # Mock job hash
+        mock_redis.hgetall.return_value = {
             "job_id": job_id,
             "status": "processing",
-            "progress": {"current_page": 3, "total_pages": 10, "percentage": 30},
+            "progress_current_page": "3",
+            "progress_total_pages": "10",
+            "progress_percentage": "30",
             "created_at": "2024-01-01T00:00:00",
-            "updated_at": "2024-01-01T00:05:00"
+            "updated_at": "2024-01-01T00:05:00",
+            "version": "7"
         }
-        mock_redis.get.return_value = json.dumps(job_data)
         
         result = job_manager.get_status(job_id)
         
+        mock_redis.hgetall.assert_called_once_with(f"job:{job_id}")
         assert result["job_id"] == job_id
         assert result["status"] == "processing"
-        assert result["progress"]["current_page"] == 3
-        assert result["progress"]["total_pages"] == 10
+        assert result["progress"] == {
+            "current_page": 3,
+            "total_pages": 10,
+            "percentage": 30
+        }
+        assert result["version"] == 7
     
     def test_get_status_raises_on_nonexistent_job(self, job_manager, mock_redis):
         """Test that get_status raises JobNotFoundError for nonexistent job."""
         job_id = "nonexistent-job"
-        mock_redis.get.return_value = None
+        mock_redis.hgetall.return_value = {}
         
         with pytest.raises(JobNotFoundError) as exc_info:
             job_manager.get_status(job_id)
@@ -365,13 +407,12 @@ class TestGetStatus:
         job_id = "test-job-123"
         error_message = "Processing failed"
         
-        # Mock failed job data
-        job_data = {
+        # Mock failed job hash
+        mock_redis.hgetall.return_value = {
             "job_id": job_id,
             "status": "failed",
             "error": error_message
         }
-        mock_redis.get.return_value = json.dumps(job_data)
         
         result = job_manager.get_status(job_id)
         
@@ -383,13 +424,12 @@ class TestGetStatus:
         job_id = "test-job-123"
         output_path = "/uploads/test-job-123/output.docx"
         
-        # Mock completed job data
-        job_data = {
+        # Mock completed job hash
+        mock_redis.hgetall.return_value = {
             "job_id": job_id,
             "status": "completed",
             "output_path": output_path
         }
-        mock_redis.get.return_value = json.dumps(job_data)
         
         result = job_manager.get_status(job_id)
         
@@ -397,6 +437,154 @@ class TestGetStatus:
         assert result["output_path"] == output_path
 
 
+class TestLegacyJobs:
+    """Tests for jobs stored as JSON strings by older releases."""
+    
+    WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+    
+    def test_get_status_migrates_json_job_to_hash(self, job_manager, mock_redis):
+        """Test that a JSON job is rewritten as a hash keeping its TTL."""
+        job_id = "legacy-job"
+        mock_redis.hgetall.side_effect = ResponseError(self.WRONGTYPE)
+        pipe = mock_redis.pipeline.return_value
+        pipe.type.return_value = "string"
+        pipe.get.return_value = json.dumps({
+            "job_id": job_id,
+            "status": "processing",
+            "progress": {"current_page": 2, "total_pages": 4, "percentage": 50},
+            "error": None
+        })
+        pipe.ttl.return_value = 3600
+        pipe.execute.return_value = [1, 5, True, {
+            "job_id": job_id,
+            "status": "processing",
+            "progress_current_page": "2",
+            "progress_total_pages": "4",
+            "progress_percentage": "50"
+        }]
+        
+        result = job_manager.get_status(job_id)
+        
+        assert result["status"] == "processing"
+        assert result["progress"] == {"current_page": 2, "total_pages": 4, "percentage": 50}
+        pipe.watch.assert_called_once_with(f"job:{job_id}")
+        pipe.multi.assert_called_once()
+        pipe.delete.assert_called_once_with(f"job:{job_id}")
+        assert stored_fields(mock_redis) == {
+            "job_id": job_id,
+            "status": "processing",
+            "progress_current_page": 2,
+            "progress_total_pages": 4,
+            "progress_percentage": 50
+        }
+        pipe.expire.assert_called_once_with(f"job:{job_id}", 3600)
+        pipe.reset.assert_called_once()
+    
+    def test_unreadable_legacy_value_reads_as_not_found(self, job_manager, mock_redis):
+        """Test that a non-JSON string job is dropped and reported missing."""
+        mock_redis.hgetall.side_effect = ResponseError(self.WRONGTYPE)
+        pipe = mock_redis.pipeline.return_value
+        pipe.type.return_value = "string"
+        pipe.get.return_value = "not json"
+        pipe.execute.return_value = [1, {}]
+        
+        with pytest.raises(JobNotFoundError):
+            job_manager.get_status("legacy-job")
+        
+        pipe.delete.assert_called_once_with("job:legacy-job")
+        pipe.hset.assert_not_called()
+    
+    def test_update_progress_migrates_json_job_and_retries(self, job_manager, mock_redis):
+        """Test that writing to a JSON job converts it and then applies the write."""
+        pipe = mock_redis.pipeline.return_value
+        pipe.type.return_value = "string"
+        pipe.get.return_value = json.dumps({"job_id": "legacy-job", "status": "processing"})
+        pipe.ttl.return_value = 3600
+        pipe.execute.side_effect = [
+            ResponseError(self.WRONGTYPE),
+            [1, 2, True, {"job_id": "legacy-job", "status": "processing"}],
+            [1, 3, 2, True]
+        ]
+        
+        job_manager.update_progress("legacy-job", 5, 10)
+        
+        assert pipe.execute.call_count == 3
+        assert stored_fields(mock_redis)["progress_current_page"] == 5
+    
+    def test_racing_migration_rereads_the_hash(self, job_manager, mock_redis):
+        """Test that a rewrite aborted by WATCH doesn't overwrite the migrated hash."""
+        migrated = {"job_id": "legacy-job", "status": "processing", "progress_current_page": "7"}
+        mock_redis.hgetall.side_effect = [ResponseError(self.WRONGTYPE), migrated]
+        pipe = mock_redis.pipeline.return_value
+        # Read as JSON, then found converted and updated by the time of the retry
+        pipe.type.side_effect = ["string", "hash"]
+        pipe.get.return_value = json.dumps({"job_id": "legacy-job", "status": "processing"})
+        pipe.ttl.return_value = 3600
+        pipe.execute.side_effect = WatchError()
+        
+        result = job_manager.get_status("legacy-job")
+        
+        assert result["progress"]["current_page"] == 7
+        assert pipe.watch.call_count == 2
+        pipe.execute.assert_called_once()
+        pipe.reset.assert_called_once()
+    
+    def test_other_response_errors_propagate(self, job_manager, mock_redis):
+        """Test that only WRONGTYPE errors trigger a migration."""
+        mock_redis.hgetall.side_effect = ResponseError("ERR something else")
+        
+        with pytest.raises(ResponseError):
+            job_manager.get_status("job-1")
+        
+        mock_redis.pipeline.return_value.watch.assert_not_called()
+
+
+class TestContentDeduplication:
+    """Tests for the content hash -> job index."""
+    
+    def test_remember_content_hash_sets_expiring_key(self, job_manager, mock_redis):
+        """Test that the hash index is written with an expiry."""
+        job_manager.remember_content_hash("abc", "job-1")
+        
+        mock_redis.setex.assert_called_once_with(
+            "content:abc", JobManager.CONTENT_EXPIRATION_SECONDS, "job-1"
+        )
+    
+    def test_find_job_by_content_hash_returns_live_job(self, job_manager, mock_redis):
+        """Test that a completed job for the same content is returned."""
+        job_data = {"job_id": "job-1", "status": "completed"}
+        mock_redis.get.side_effect = lambda key: "job-1" if key == "content:abc" else None
+        mock_redis.hgetall.side_effect = lambda key: job_data if key == "job:job-1" else {}
+        
+        assert job_manager.find_job_by_content_hash("abc") == job_data
+    
+    def test_find_job_by_content_hash_skips_failed_job(self, job_manager, mock_redis):
+        """Test that failed jobs are not reused."""
+        mock_redis.get.side_effect = lambda key: "job-1" if key == "content:abc" else None
+        mock_redis.hgetall.return_value = {"job_id": "job-1", "status": "failed"}
+        
+        assert job_manager.find_job_by_content_hash("abc") is None
+    
+    def test_find_job_by_content_hash_handles_expired_job(self, job_manager, mock_redis):
+        """Test that an index entry pointing at a missing job is ignored."""
+        mock_redis.get.side_effect = lambda key: "job-1" if key == "content:abc" else None
+        mock_redis.hgetall.return_value = {}
+        
+        assert job_manager.find_job_by_content_hash("abc") is None
+    
+    def test_find_job_by_content_hash_miss(self, job_manager, mock_redis):
+        """Test that unknown content returns None."""
+        mock_redis.get.return_value = None
+        
+        assert job_manager.find_job_by_content_hash("abc") is None
+    
+    def test_delete_job_removes_key(self, job_manager, mock_redis):
+        """Test that delete_job removes the job's Redis key."""
+        job_manager.delete_job("job-1")
+        
+        mock_redis.delete.assert_called_once_with("job:job-1")
+
+
 class TestRedisKeyManagement:
     """Tests for Redis key management."""
     
@@ -7,25 +7,53 @@ These tests verify universal properties that should hold across all valid inputs
 """
 
 import pytest
+import uuid
 from hypothesis import given, strategies as st, settings
 from unittest.mock import Mock
 from app.job_manager import JobManager
 
 
 def create_mock_redis():
-    """Create a mock Redis client that stores data in memory."""
+    """Create a mock Redis client that stores hashes in memory."""
     storage = {}
     
     mock = Mock()
     
-    def setex(key, expiration, value):
-        storage[key] = value
+    def hset(key, mapping):
+        storage.setdefault(key, {}).update(
+            {field: str(value) for field, value in mapping.items()}
+        )
+        return len(mapping)
+    
+    def hgetall(key):
+        return dict(storage.get(key, {}))
+    
+    def hincrby(key, field, amount):
+        fields = storage.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + amount)
+        return int(fields[field])
     
-    def get(key):
-        return storage.get(key)
+    def exists(key):
+        return int(key in storage)
     
-    mock.setex = setex
-    mock.get = get
+    def delete(key):
+        storage.pop(key, None)
+    
+    def pipeline(transaction=True):
+        # Queue calls and run them in order on execute()
+        queued = []
+        pipe = Mock()
+        for name, func in (("hset", hset), ("hincrby", hincrby),
+                           ("exists", exists), ("expire", lambda key, ttl: True)):
+            setattr(pipe, name, lambda *args, _func=func, **kwargs:
+                    queued.append((_func, args, kwargs)))
+        pipe.execute = lambda: [func(*args, **kwargs) for func, args, kwargs in queued]
+        return pipe
+    
+    mock.hset = hset
+    mock.hgetall = hgetall
+    mock.delete = delete
+    mock.pipeline = pipeline
     mock.storage = storage
     
     return mock
@@ -76,11 +104,11 @@ class TestUniqueJobIDs:
         # Verify all IDs are unique
         assert len(job_ids) == len(set(job_ids)), "Job IDs must be unique"
         
-        # Verify all IDs are valid UUID format (36 characters with 4 dashes)
+        # Verify all IDs are valid UUID hex format (32 characters, no dashes)
         for job_id in job_ids:
             assert isinstance(job_id, str)
-            assert len(job_id) == 36
-            assert job_id.count('-') == 4
+            assert len(job_id) == 32
+            assert uuid.UUID(hex=job_id).hex == job_id
     
     @settings(max_examples=100)
     @given(
@@ -365,6 +393,12 @@ class TestProgressStorage:
         # Retrieve status
         status = job_manager.get_status(job_id)
         
+        # Writes between strides of total_pages // 100 are coalesced away
+        stride = max(1, total_pages // JobManager.PROGRESS_WRITES_PER_JOB)
+        if current_page % stride != 0 and current_page != total_pages:
+            assert status["progress"]["current_page"] == 0
+            return
+        
         # Verify progress is stored correctly
         assert status["progress"]["current_page"] == current_page
         assert status["progress"]["total_pages"] == total_pages
@@ -5,8 +5,11 @@ Tests the layout analysis functionality including paragraph boundary detection
 and heading detection based on font size.
 """
 
+from unittest.mock import patch
+
+import numpy as np
 import pytest
-from app.layout_analyzer import LayoutAnalyzer
+from app.layout_analyzer import LayoutAnalyzer, _count_alignments
 from app.models import OCRResult, WordBox, DocumentStructure, StructureElement
 
 
@@ -92,7 +95,28 @@ class TestLayoutAnalyzer:
         assert "continues here" in structure.elements[0].content
         assert structure.elements[1].type == "paragraph"
         assert structure.elements[1].content == "Second paragraph"
-    
+
+    def test_paragraph_breaks_adapt_to_line_spacing(self):
+        """Test that double-spaced lines stay together and only the wider gap breaks."""
+        # Lines 55px apart (35px gaps), with a 100px gap after the third line
+        tops = [10, 65, 120, 240, 295, 350]
+        words = [
+            WordBox(text=f"line{i}", x=10, y=y, width=60, height=20, confidence=0.95)
+            for i, y in enumerate(tops)
+        ]
+        ocr_result = OCRResult(
+            text="\n".join(word.text for word in words),
+            words=words,
+            confidence=0.95
+        )
+
+        structure = self.analyzer.analyze(ocr_result)
+
+        assert [element.content for element in structure.elements] == [
+            "line0\nline1\nline2",
+            "line3\nline4\nline5",
+        ]
+
     def test_analyze_multiple_headings_and_paragraphs(self):
         """Test analyzing document with multiple headings and paragraphs."""
         words = [
@@ -147,6 +171,20 @@ class TestLayoutAnalyzer:
         assert lines[1][0].text == "Second"
         assert lines[1][1].text == "line"
     
+    def test_group_words_into_lines_anchors_on_first_word(self):
+        """Test that line membership is measured from the line's first word, not the previous word."""
+        words = [
+            WordBox(text="c", x=10, y=16, width=10, height=10, confidence=0.95),
+            WordBox(text="a", x=30, y=10, width=10, height=10, confidence=0.95),
+            WordBox(text="b", x=20, y=14, width=10, height=10, confidence=0.95),
+        ]
+        
+        lines = self.analyzer._group_words_into_lines(words)
+        
+        # "b" is within 5px of "a"; "c" is 6px below "a" even though it is
+        # only 2px below "b", so it starts a new line
+        assert [[w.text for w in line] for line in lines] == [["a", "b"], ["c"]]
+    
     def test_heading_level_detection(self):
         """Test that heading levels are assigned based on relative font size."""
         # Create headings with different sizes
@@ -397,6 +435,16 @@ class TestLayoutAnalyzer:
         assert self.analyzer._is_list_item("Regular text")[0] is False
         assert self.analyzer._is_list_item("No bullet here")[0] is False
     
+    def test_is_list_item_reports_list_type(self):
+        """Test that the fused pattern reports bullet vs numbered items."""
+        assert self.analyzer._is_list_item("  ◦ Nested bullet") == (True, "bullet")
+        assert self.analyzer._is_list_item("iv) Roman numeral") == (True, "numbered")
+        assert self.analyzer._is_list_item("XII. Upper roman") == (True, "numbered")
+        # Mixed-case roman numerals and words are not list markers
+        assert self.analyzer._is_list_item("Iv. Mixed case") == (False, "")
+        assert self.analyzer._is_list_item("ab. Two letters") == (False, "")
+        assert self.analyzer._is_list_item("1.No space") == (False, "")
+    
     def test_table_not_detected_for_short_sequences(self):
         """Test that short sequences of lines are not detected as tables."""
         # Only 2 lines - should not be detected as table
@@ -443,3 +491,154 @@ class TestLayoutAnalyzer:
         assert structure.elements[0].type == "list"
         assert structure.elements[1].type == "paragraph"
         assert "This is text" in structure.elements[1].content
+    
+    def test_count_alignments_per_row_and_column(self):
+        """Test the alignment kernel on flat positions with row offsets."""
+        # Rows: [10, 100], [12, 250], [98]
+        positions = np.array([10.0, 100.0, 12.0, 250.0, 98.0])
+        row_offsets = np.array([0, 2, 4])
+        columns = np.array([11.0, 99.0])
+        
+        column_appearances, aligned_words = _count_alignments(positions, row_offsets, columns, 15)
+        
+        assert column_appearances.tolist() == [2, 2]
+        assert aligned_words.tolist() == [2, 1, 1]
+    
+    def test_cluster_positions_sweep_matches_numpy_path(self):
+        """Test the short-input sweep and the NumPy path give the same centers."""
+        positions = [100, 10, 212, 20, 105, 200, 400]
+        
+        swept = self.analyzer._cluster_positions(positions, 15)
+        with patch.object(LayoutAnalyzer, "CLUSTER_SWEEP_MAX", 0):
+            vectorized = self.analyzer._cluster_positions(positions, 15)
+        
+        assert swept.tolist() == [15.0, 102.5, 206.0, 400.0]
+        assert vectorized.tolist() == swept.tolist()
+    
+    def test_find_table_end_returns_columns_of_table_rows(self):
+        """Test detected columns cover only the rows inside the table."""
+        lines = [
+            [WordBox(text="c", x=x, y=row * 25, width=20, height=20, confidence=0.95)
+             for x in (10, 100, 200, 300)]
+            for row in range(9)
+        ]
+        # A tenth row whose words spread away from their column center ends it
+        lines.append([WordBox(text="c", x=x, y=225, width=20, height=20, confidence=0.95)
+                      for x in (10, 500, 514, 528, 542)])
+        
+        end, columns = self.analyzer._find_table_end(lines, 0)
+        
+        assert end == 9
+        assert columns.tolist() == [10.0, 100.0, 200.0, 300.0]
+        table = self.analyzer._extract_table_structure(lines, 0, end, columns)
+        assert table.style == {"rows": 9, "columns": 4}
+    
+    def _two_column_page(self):
+        """Build a page with two text columns of three lines each."""
+        words = [
+            WordBox(text=f"w{row}{col}{k}", x=x0 + k * 60, y=y0 + row * 25,
+                    width=50, height=20, confidence=0.95)
+            for x0, y0, col in ((10, 10, "L"), (600, 200, "R"))
+            for row in range(3)
+            for k in range(3)
+        ]
+        return OCRResult(text="", words=words, confidence=0.95)
+    
+    def test_columns_analyzed_in_order(self):
+        """Test that each column's elements follow the previous column's."""
+        structure = LayoutAnalyzer().analyze(self._two_column_page())
+        
+        assert len(structure.elements) == 2
+        assert structure.elements[0].content.startswith("w0L0")
+        assert structure.elements[1].content.startswith("w0R0")
+    
+    def test_full_width_lines_keep_single_column(self):
+        """Test that enough page-wide lines rule out a column gap."""
+        lines = [[WordBox(text="Wide", x=10, y=10, width=590, height=20, confidence=0.95)]]
+        lines += [
+            [WordBox(text="left", x=10, y=40 + row * 25, width=90, height=20, confidence=0.95)]
+            for row in range(4)
+        ]
+
+        assert self.analyzer._detect_columns(lines) == [lines]
+
+    def test_analyze_reuses_scratch_buffers_across_pages(self):
+        """Test that smaller pages reuse the buffers sized by an earlier page."""
+        pages = [
+            self._two_column_page(),
+            OCRResult(text="", words=[], confidence=0.0),
+            OCRResult(text="", words=[
+                WordBox(text="Short", x=10, y=10, width=50, height=20, confidence=0.95),
+            ], confidence=0.95),
+        ]
+        expected = [LayoutAnalyzer().analyze(page) for page in pages]
+        
+        analyzer = LayoutAnalyzer()
+        assert analyzer.analyze(pages[0]) == expected[0]
+        scratch = analyzer._scratch_y
+        
+        assert analyzer._scratch_size >= len(pages[0].words)
+        assert [analyzer.analyze(page) for page in pages[1:]] == expected[1:]
+        assert analyzer._scratch_y is scratch
+
+
+class TestClusterLineGrouping:
+    """Test suite for density-clustered line grouping."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.analyzer = LayoutAnalyzer(line_grouping="cluster")
+    
+    def test_groups_separate_lines(self):
+        """Test that well separated lines are grouped top to bottom, left to right."""
+        words = [
+            WordBox(text="line", x=80, y=40, width=40, height=20, confidence=0.95),
+            WordBox(text="world", x=70, y=12, width=50, height=20, confidence=0.95),
+            WordBox(text="Second", x=10, y=40, width=60, height=20, confidence=0.95),
+            WordBox(text="Hello", x=10, y=10, width=50, height=20, confidence=0.95),
+        ]
+        
+        lines = self.analyzer._group_words_into_lines(words)
+        
+        assert [[w.text for w in line] for line in lines] == [
+            ["Hello", "world"], ["Second", "line"]
+        ]
+    
+    def test_keeps_skewed_line_together(self):
+        """Test that a line drifting down a skewed page stays one line."""
+        words = [
+            WordBox(text=f"w{i}", x=10 + i * 60, y=10 + i * 3, width=50, height=10, confidence=0.95)
+            for i in range(8)
+        ]
+        
+        anchored = LayoutAnalyzer()._group_words_into_lines(words)
+        clustered = self.analyzer._group_words_into_lines(words)
+        
+        assert len(anchored) > 1
+        assert len(clustered) == 1
+        assert [w.text for w in clustered[0]] == [f"w{i}" for i in range(8)]
+    
+    def test_isolated_word_becomes_own_line(self):
+        """Test that words with no neighbours are kept, not dropped as noise."""
+        words = [
+            WordBox(text="Hello", x=10, y=10, width=50, height=20, confidence=0.95),
+            WordBox(text="world", x=70, y=10, width=50, height=20, confidence=0.95),
+            WordBox(text="footer", x=900, y=500, width=50, height=20, confidence=0.95),
+        ]
+        
+        lines = self.analyzer._group_words_into_lines(words)
+        
+        assert [[w.text for w in line] for line in lines] == [["Hello", "world"], ["footer"]]
+    
+    def test_analyze_matches_anchor_grouping_on_clean_page(self):
+        """Test that clean, unskewed pages produce the same structure either way."""
+        words = [
+            WordBox(text="Title", x=10, y=10, width=80, height=40, confidence=0.95),
+            WordBox(text="Body", x=10, y=70, width=40, height=20, confidence=0.95),
+            WordBox(text="text", x=55, y=70, width=40, height=20, confidence=0.95),
+            WordBox(text="More", x=10, y=95, width=40, height=20, confidence=0.95),
+            WordBox(text="text", x=55, y=95, width=40, height=20, confidence=0.95),
+        ]
+        ocr_result = OCRResult(text="", words=words, confidence=0.95)
+        
+        assert self.analyzer.analyze(ocr_result) == LayoutAnalyzer().analyze(ocr_result)
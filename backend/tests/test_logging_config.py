@@ -0,0 +1,65 @@
+"""
+Tests for logging configuration.
+"""
+
+import logging
+import sys
+from unittest.mock import patch
+
+from app.logging_config import (
+    HealthCheckFilter,
+    configure_logging,
+    _build_formatter,
+    ACCESS_LOGGERS,
+)
+
+
+def _record(message):
+    return logging.LogRecord("werkzeug", logging.INFO, __file__, 1, message, None, None)
+
+
+class TestHealthCheckFilter:
+    """Test suite for HealthCheckFilter."""
+    
+    def test_drops_health_check_requests(self):
+        """Test that health check access lines are filtered out."""
+        record = _record('127.0.0.1 - - "GET /api/health HTTP/1.1" 200 -')
+        
+        assert HealthCheckFilter().filter(record) is False
+    
+    def test_keeps_other_requests(self):
+        """Test that other requests are still logged."""
+        record = _record('127.0.0.1 - - "GET /api/jobs/abc HTTP/1.1" 200 -')
+        
+        assert HealthCheckFilter().filter(record) is True
+
+
+class TestConfigureLogging:
+    """Test suite for configure_logging."""
+    
+    def test_filter_attached_once_per_access_logger(self):
+        """Test that repeated configuration does not stack filters."""
+        configure_logging()
+        configure_logging()
+        
+        for name in ACCESS_LOGGERS:
+            filters = [
+                f for f in logging.getLogger(name).filters
+                if isinstance(f, HealthCheckFilter)
+            ]
+            assert len(filters) == 1
+    
+    def test_json_format_falls_back_to_text_without_dependency(self):
+        """Test that a missing python-json-logger falls back to plain text."""
+        with patch.dict(sys.modules, {"pythonjsonlogger": None}):
+            formatter = _build_formatter("json")
+        
+        assert type(formatter) is logging.Formatter
+    
+    def test_text_format_defers_message_formatting(self):
+        """Test that arguments are only interpolated when the record is emitted."""
+        record = logging.LogRecord(
+            "app.api", logging.INFO, __file__, 1, "Created job %s", ("abc",), None
+        )
+        
+        assert _build_formatter("text").format(record) == "INFO:app.api:Created job abc"
@@ -87,6 +87,14 @@ class TestWordBox:
         assert word.text == "Hello, World!"
         assert word.confidence == 0.88
 
+    def test_word_box_has_no_instance_dict(self):
+        """Test WordBox uses slots, so stray attributes are rejected."""
+        word = WordBox(text="Hi", x=0, y=0, width=10, height=10, confidence=0.9)
+
+        assert not hasattr(word, "__dict__")
+        with pytest.raises(AttributeError):
+            word.colour = "red"
+
 
 class TestOCRResult:
     """Tests for OCRResult data model."""
@@ -5,6 +5,8 @@ Tests the OCREngine class functionality including text extraction,
 bounding box detection, confidence scoring, and error handling.
 """
 
+from unittest.mock import patch
+
 import pytest
 from PIL import Image, ImageDraw, ImageFont
 from app.ocr_engine import OCREngine
@@ -60,6 +62,27 @@ class TestOCREngineInitialization:
         """Test that OCREngine can be instantiated."""
         engine = OCREngine()
         assert engine is not None
+    
+    def test_first_engine_warms_up_tesseract_once(self):
+        """Test that only the first engine in a process loads the language model."""
+        with patch.object(OCREngine, '_warmed_up', False), \
+                patch('app.ocr_engine.tesserocr', None), \
+                patch('app.ocr_engine.pytesseract.image_to_string') as mock_string:
+            OCREngine()
+            OCREngine()
+        
+        mock_string.assert_called_once()
+        assert mock_string.call_args.kwargs['config'] == OCREngine.CONFIG
+    
+    def test_warm_up_failure_is_ignored(self):
+        """Test that a missing Tesseract doesn't prevent creating an engine."""
+        import pytesseract
+        
+        with patch.object(OCREngine, '_warmed_up', False), \
+                patch('app.ocr_engine.tesserocr', None), \
+                patch('app.ocr_engine.pytesseract.image_to_string',
+                      side_effect=pytesseract.TesseractNotFoundError()):
+            assert OCREngine() is not None
 
 
 class TestExtractText:
@@ -226,10 +249,42 @@ class TestPreprocessImage:
         
         result = ocr_engine.preprocess_image(img)
         
-        # Dimensions may be increased for better OCR (images < 1800px are upscaled)
+        # Dimensions may be increased for better OCR (images < 1000px are upscaled)
         assert result.size[0] >= img.size[0]
         assert result.size[1] >= img.size[1]
     
+    def test_preprocess_upscales_only_small_images(self, ocr_engine):
+        """Test that small images are scaled up and page-sized ones are not."""
+        assert ocr_engine.preprocess_image(Image.new('L', (300, 200), color=255)).size == (1500, 1000)
+        assert ocr_engine.preprocess_image(Image.new('L', (1700, 1200), color=255)).size == (1700, 1200)
+    
+    def test_preprocess_skips_upscale_for_high_dpi(self, ocr_engine):
+        """Test that images tagged with a high DPI keep their size."""
+        img = Image.new('L', (300, 200), color=255)
+        img.info['dpi'] = (300, 300)
+        
+        assert ocr_engine.preprocess_image(img).size == (300, 200)
+    
+    def test_preprocess_output_is_binary(self, ocr_engine, simple_text_image):
+        """Test that thresholded images contain only black and white pixels."""
+        result = ocr_engine.preprocess_image(simple_text_image)
+        
+        assert {value for _, value in result.getcolors()} <= {0, 255}
+    
+    def test_preprocess_leaves_clean_images_unthresholded(self, ocr_engine):
+        """Test that large, sharp images are only converted to grayscale."""
+        img = Image.new('RGB', (1600, 400), color='white')
+        draw = ImageDraw.Draw(img)
+        for y in range(0, 400, 6):
+            draw.line([(0, y), (1599, y)], fill=(100, 100, 100), width=2)
+        
+        result = ocr_engine.preprocess_image(img)
+        
+        assert result.mode == 'L'
+        assert result.size == (1600, 400)
+        # Thresholding would have turned the gray lines black
+        assert 100 in {value for _, value in result.getcolors()}
+    
     def test_preprocess_with_text_image(self, ocr_engine, simple_text_image):
         """Test that preprocessing works with text images."""
         result = ocr_engine.preprocess_image(simple_text_image)
@@ -264,9 +319,185 @@ class TestPreprocessImage:
         assert result_with.confidence >= 0.0
 
 
+class TestBatchExtraction:
+    """Test OCR of several pages in one Tesseract call."""
+    
+    @staticmethod
+    def _ocr_data(rows):
+        """Build image_to_data output from (page, block, par, line, text, conf) rows."""
+        columns = ['page_num', 'block_num', 'par_num', 'line_num', 'text', 'conf']
+        data = {name: [row[i] for row in rows] for i, name in enumerate(columns)}
+        data.update({name: [5] * len(rows) for name in ('left', 'top', 'width', 'height')})
+        return data
+    
+    def test_extract_text_batch_splits_pages(self, ocr_engine):
+        """Test that batch output is split into one result per page."""
+        ocr_data = self._ocr_data([
+            (1, 1, 1, 1, 'Hello', 90),
+            (1, 1, 1, 1, 'World', 80),
+            (1, 1, 1, 2, 'again', 70),
+            (1, 2, 1, 1, 'Next', 60),
+            (2, 0, 0, 0, '', -1),
+            (3, 1, 1, 1, 'Third', 50),
+        ])
+        images = [Image.new('L', (20, 20), color=255) for _ in range(3)]
+        
+        with patch('app.ocr_engine.tesserocr', None), \
+                patch('app.ocr_engine.pytesseract.image_to_data', return_value=ocr_data) as mock_data:
+            results = ocr_engine.extract_text_batch(images)
+        
+        mock_data.assert_called_once()
+        assert mock_data.call_args[0][0].endswith('images.txt')
+        assert [result.text for result in results] == ["Hello World\nagain\n\nNext", "", "Third"]
+        assert [len(result.words) for result in results] == [4, 0, 1]
+        assert results[0].confidence == pytest.approx(0.75)
+        assert results[1].confidence == 0.0
+    
+    def test_extract_text_runs_tesseract_once(self, ocr_engine):
+        """Test that single-page text is rebuilt from the word data."""
+        ocr_data = self._ocr_data([
+            (1, 1, 1, 1, 'Hello', 90),
+            (1, 1, 1, 2, 'World', 90),
+        ])
+        
+        with patch('app.ocr_engine.tesserocr', None), \
+                patch('app.ocr_engine.pytesseract.image_to_data', return_value=ocr_data), \
+                patch('app.ocr_engine.pytesseract.image_to_string') as mock_string:
+            result = ocr_engine.extract_text(Image.new('L', (20, 20), color=255))
+        
+        mock_string.assert_not_called()
+        assert result.text == "Hello\nWorld"
+        assert [word.text for word in result.words] == ["Hello", "World"]
+    
+    def test_tesseract_runs_hold_the_ocr_semaphore(self, ocr_engine):
+        """Test that every Tesseract run is bounded by the process-wide semaphore."""
+        ocr_data = self._ocr_data([(1, 1, 1, 1, 'Hello', 90)])
+        images = [Image.new('L', (20, 20), color=255) for _ in range(2)]
+        
+        with patch('app.ocr_engine.tesserocr', None), \
+                patch('app.ocr_engine._OCR_SEMAPHORE') as mock_semaphore, \
+                patch('app.ocr_engine.pytesseract.image_to_data', return_value=ocr_data):
+            ocr_engine.extract_text(images[0])
+            ocr_engine.extract_text_batch(images)
+        
+        assert mock_semaphore.__enter__.call_count == 2
+        assert mock_semaphore.__exit__.call_count == 2
+    
+    def test_extract_text_batch_empty(self, ocr_engine):
+        """Test that an empty batch doesn't run Tesseract."""
+        with patch('app.ocr_engine.pytesseract.image_to_data') as mock_data:
+            assert ocr_engine.extract_text_batch([]) == []
+        mock_data.assert_not_called()
+    
+    def test_tesserocr_api_is_reused(self, ocr_engine):
+        """Test that the tesserocr path loads the model once and parses its TSV."""
+        tsv = (
+            "1\t1\t0\t0\t0\t0\t0\t0\t20\t20\t-1\t\n"
+            "5\t1\t1\t1\t1\t1\t2\t3\t4\t5\t90.5\tHello\n"
+            "5\t1\t1\t1\t2\t1\t2\t9\t4\t5\t80.5\tWorld\n"
+        )
+        
+        with patch('app.ocr_engine.tesserocr') as mock_tesserocr, \
+                patch('app.ocr_engine.pytesseract.image_to_data') as mock_data:
+            mock_tesserocr.PyTessBaseAPI.return_value.GetTSVText.return_value = tsv
+            results = ocr_engine.extract_text_batch(
+                [Image.new('L', (20, 20), color=255) for _ in range(2)]
+            )
+        
+        mock_data.assert_not_called()
+        mock_tesserocr.PyTessBaseAPI.assert_called_once()
+        assert [result.text for result in results] == ["Hello\nWorld"] * 2
+        assert results[0].words[1] == WordBox(
+            text="World", x=2, y=9, width=4, height=5, confidence=pytest.approx(0.805)
+        )
+
+
 class TestErrorHandling:
     """Test error handling in OCR processing."""
     
+    def test_transient_tesseract_failure_is_retried(self, ocr_engine):
+        """Test that a failed tesseract run is retried before the page fails."""
+        from app.ocr_engine import _image_to_data
+        
+        ocr_data = TestBatchExtraction._ocr_data([(1, 1, 1, 1, 'Hello', 90)])
+        
+        with patch('app.ocr_engine.tesserocr', None), \
+                patch.object(_image_to_data.retry, 'sleep') as mock_sleep, \
+                patch('app.ocr_engine.pytesseract.image_to_data',
+                      side_effect=[OSError('Broken pipe'), ocr_data]) as mock_data:
+            result = ocr_engine.extract_text(Image.new('L', (20, 20), color=255))
+        
+        assert result.text == "Hello"
+        assert mock_data.call_count == 2
+        mock_sleep.assert_called_once()
+    
+    def test_crashed_or_timed_out_tesseract_is_retried(self, ocr_engine):
+        """Test that pytesseract's crash and timeout errors are retried with a timeout set."""
+        import pytesseract
+        from app.ocr_engine import TESSERACT_PAGE_TIMEOUT, _image_to_data
+        
+        ocr_data = TestBatchExtraction._ocr_data([(1, 1, 1, 1, 'Hello', 90)])
+        failures = [
+            pytesseract.TesseractError(-9, 'Killed'),
+            RuntimeError('Tesseract process timeout'),
+        ]
+        
+        with patch('app.ocr_engine.tesserocr', None), \
+                patch.object(_image_to_data.retry, 'sleep'), \
+                patch('app.ocr_engine.pytesseract.image_to_data',
+                      side_effect=failures + [ocr_data]) as mock_data:
+            result = ocr_engine.extract_text(Image.new('L', (20, 20), color=255))
+        
+        assert result.text == "Hello"
+        assert mock_data.call_count == 3
+        assert mock_data.call_args.kwargs['timeout'] == TESSERACT_PAGE_TIMEOUT
+    
+    def test_retry_backoff_does_not_hold_the_ocr_semaphore(self, ocr_engine):
+        """Test that the semaphore is released before sleeping between attempts."""
+        import threading
+        from app.ocr_engine import _image_to_data
+        
+        ocr_data = TestBatchExtraction._ocr_data([(1, 1, 1, 1, 'Hello', 90)])
+        semaphore = threading.BoundedSemaphore(1)
+        free_while_sleeping = []
+        
+        def sleep(seconds):
+            acquired = semaphore.acquire(blocking=False)
+            if acquired:
+                semaphore.release()
+            free_while_sleeping.append(acquired)
+        
+        with patch('app.ocr_engine.tesserocr', None), \
+                patch('app.ocr_engine._OCR_SEMAPHORE', semaphore), \
+                patch.object(_image_to_data.retry, 'sleep', side_effect=sleep), \
+                patch('app.ocr_engine.pytesseract.image_to_data',
+                      side_effect=[OSError('Broken pipe'), ocr_data]):
+            ocr_engine.extract_text(Image.new('L', (20, 20), color=255))
+        
+        assert free_while_sleeping == [True]
+    
+    def test_unrelated_runtime_error_is_not_retried(self, ocr_engine):
+        """Test that only pytesseract's timeout RuntimeError is retried."""
+        with patch('app.ocr_engine.tesserocr', None), \
+                patch('app.ocr_engine.pytesseract.image_to_data',
+                      side_effect=RuntimeError('boom')) as mock_data:
+            with pytest.raises(OCRProcessingError):
+                ocr_engine.extract_text(Image.new('L', (20, 20), color=255))
+        
+        mock_data.assert_called_once()
+    
+    def test_missing_tesseract_is_not_retried(self, ocr_engine):
+        """Test that a missing tesseract binary fails immediately."""
+        import pytesseract
+        
+        with patch('app.ocr_engine.tesserocr', None), \
+                patch('app.ocr_engine.pytesseract.image_to_data',
+                      side_effect=pytesseract.TesseractNotFoundError()) as mock_data:
+            with pytest.raises(OCRProcessingError):
+                ocr_engine.extract_text(Image.new('L', (20, 20), color=255))
+        
+        mock_data.assert_called_once()
+    
     def test_extract_text_with_invalid_image_type(self, ocr_engine):
         """Test that invalid image types raise appropriate errors."""
         with pytest.raises((OCRProcessingError, TypeError, AttributeError)):
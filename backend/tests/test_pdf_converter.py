@@ -8,7 +8,7 @@ error handling, and multi-page processing.
 import pytest
 import os
 import tempfile
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, call
 from PIL import Image
 from app.pdf_converter import PDFConverter
 from app.models import PageImage, OCRResult, WordBox, DocumentStructure, StructureElement
@@ -129,9 +129,9 @@ class TestPDFConverter:
         
         # Mock parser
         mock_parser = Mock()
-        mock_parser.get_page_count.return_value = 1
+        mock_parser.open_document.return_value = MagicMock(**{'__len__.return_value': 1})
         mock_image = Image.new('RGB', (100, 100))
-        mock_parser.extract_pages.return_value = [
+        mock_parser.iter_pages.return_value = [
             PageImage(page_number=1, image=mock_image, width=100, height=100, dpi=300)
         ]
         mock_parser_class.return_value = mock_parser
@@ -170,7 +170,12 @@ class TestPDFConverter:
         assert result["errors"] == []
         
         # Verify components were called
-        mock_parser.extract_pages.assert_called_once_with(pdf_path)
+        mock_parser.open_document.assert_called_once_with(pdf_path)
+        mock_parser.iter_pages.assert_called_once_with(
+            pdf_path,
+            prefetch=PDFConverter.RENDER_PREFETCH_PAGES,
+            doc=mock_parser.open_document.return_value
+        )
         mock_ocr.extract_text.assert_called_once()
         mock_layout.analyze.assert_called_once()
         mock_word_gen.create_document.assert_called_once()
@@ -199,9 +204,9 @@ class TestPDFConverter:
         
         # Mock parser with 3 pages
         mock_parser = Mock()
-        mock_parser.get_page_count.return_value = 3
+        mock_parser.open_document.return_value = MagicMock(**{'__len__.return_value': 3})
         mock_image = Image.new('RGB', (100, 100))
-        mock_parser.extract_pages.return_value = [
+        mock_parser.iter_pages.return_value = [
             PageImage(page_number=i, image=mock_image, width=100, height=100, dpi=300)
             for i in range(1, 4)
         ]
@@ -266,9 +271,9 @@ class TestPDFConverter:
         
         # Mock parser with 3 pages
         mock_parser = Mock()
-        mock_parser.get_page_count.return_value = 3
+        mock_parser.open_document.return_value = MagicMock(**{'__len__.return_value': 3})
         mock_image = Image.new('RGB', (100, 100))
-        mock_parser.extract_pages.return_value = [
+        mock_parser.iter_pages.return_value = [
             PageImage(page_number=i, image=mock_image, width=100, height=100, dpi=300)
             for i in range(1, 4)
         ]
@@ -316,6 +321,7 @@ class TestPDFConverter:
         structures = mock_word_gen.create_document.call_args[0][0]
         assert len(structures) == 3
     
+    @patch.object(PDFConverter, '_convert_with_pymupdf_text_extraction', return_value=False)
     @patch('os.path.isfile', return_value=True)
     @patch('os.access', return_value=True)
     @patch('os.path.exists', return_value=True)
@@ -331,7 +337,8 @@ class TestPDFConverter:
         mock_parser_class,
         mock_exists,
         mock_access,
-        mock_isfile
+        mock_isfile,
+        mock_text_extraction
     ):
         """Test that progress callback is called during conversion."""
         pdf_path = "/fake/test.pdf"
@@ -339,9 +346,9 @@ class TestPDFConverter:
         
         # Mock parser with 2 pages
         mock_parser = Mock()
-        mock_parser.get_page_count.return_value = 2
+        mock_parser.open_document.return_value = MagicMock(**{'__len__.return_value': 2})
         mock_image = Image.new('RGB', (100, 100))
-        mock_parser.extract_pages.return_value = [
+        mock_parser.iter_pages.return_value = [
             PageImage(page_number=i, image=mock_image, width=100, height=100, dpi=300)
             for i in range(1, 3)
         ]
@@ -405,9 +412,9 @@ class TestPDFConverter:
         
         # Mock all components
         mock_parser = Mock()
-        mock_parser.get_page_count.return_value = 1
+        mock_parser.open_document.return_value = MagicMock(**{'__len__.return_value': 1})
         mock_image = Image.new('RGB', (100, 100))
-        mock_parser.extract_pages.return_value = [
+        mock_parser.iter_pages.return_value = [
             PageImage(page_number=1, image=mock_image, width=100, height=100, dpi=300)
         ]
         mock_parser_class.return_value = mock_parser
@@ -432,3 +439,191 @@ class TestPDFConverter:
         
         assert result["success"] is True
         assert result["output_path"] == expected_output
+    
+    def test_ocr_page_stream_recognizes_runs_as_pages_arrive(self):
+        """Test that each run is OCRed before the previous run is handed out."""
+        converter = PDFConverter(ocr_engine='surya')
+        converter.ocr_engine = Mock()
+        converter.ocr_engine.extract_text_batch.side_effect = lambda images: [image.size for image in images]
+        pulled = []
+        
+        def rendered_pages():
+            for i in range(PDFConverter.OCR_BATCH_PAGES + 2):
+                pulled.append(i)
+                yield PageImage(page_number=i + 1, image=Image.new('RGB', (10 + i, 10)),
+                                width=10 + i, height=10, dpi=150)
+        
+        stream = converter._ocr_page_stream(rendered_pages())
+        first_page, first_job = next(stream)
+        
+        # The second run was rendered and submitted before the first was handed out
+        assert len(pulled) == PDFConverter.OCR_BATCH_PAGES + 2
+        pages = [(first_page, first_job)] + list(stream)
+        assert [page.page_number for page, _ in pages] == list(range(1, PDFConverter.OCR_BATCH_PAGES + 3))
+        assert [job() for _, job in pages] == [page.image.size for page, _ in pages]
+        assert [len(c.args[0]) for c in converter.ocr_engine.extract_text_batch.call_args_list] == [
+            PDFConverter.OCR_BATCH_PAGES, 2
+        ]
+    
+    def test_convert_streams_pages_into_ocr(self):
+        """Test that the OCR fallback renders pages from the converter's open document."""
+        converter = PDFConverter(ocr_engine='surya')
+        converter.parser = Mock()
+        doc = MagicMock(**{'__len__.return_value': 1})
+        converter.parser.open_document.return_value = doc
+        converter.parser.iter_pages.return_value = iter([
+            PageImage(page_number=1, image=Image.new('RGB', (10, 10)), width=10, height=10, dpi=150)
+        ])
+        converter.ocr_engine = Mock()
+        converter.ocr_engine.extract_text_batch.side_effect = lambda images: [
+            OCRResult(text="Text", words=[], confidence=0.9) for _ in images
+        ]
+        converter.layout_analyzer = Mock()
+        converter.layout_analyzer.analyze.return_value = DocumentStructure(elements=[])
+        converter.word_generator = Mock()
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.access', return_value=True), \
+             patch.object(converter, '_convert_with_pymupdf_text_extraction', return_value=False) as mock_text, \
+             patch.object(converter, '_convert_with_pdf2docx', return_value=False):
+            result = converter.convert("/fake/scan.pdf", "/fake/scan.docx")
+        
+        assert result["success"] is True
+        assert result["pages_failed"] == []
+        converter.parser.open_document.assert_called_once_with("/fake/scan.pdf")
+        assert mock_text.call_args.args[0] is doc
+        converter.parser.iter_pages.assert_called_once_with(
+            "/fake/scan.pdf", prefetch=PDFConverter.RENDER_PREFETCH_PAGES, doc=doc
+        )
+        converter.parser.extract_pages.assert_not_called()
+        converter.word_generator.save.assert_called_once()
+        doc.close.assert_called_once()
+    
+    def test_convert_opens_the_pdf_once(self, tmp_path):
+        """Test that a full conversion through the OCR fallback opens the PDF once."""
+        import fitz
+        
+        pdf_path = str(tmp_path / "scan.pdf")
+        pdf = fitz.open()
+        for _ in range(3):
+            pdf.new_page(width=200, height=200)
+        pdf.save(pdf_path)
+        pdf.close()
+        
+        converter = PDFConverter(ocr_engine='surya')
+        converter.ocr_engine = Mock()
+        converter.ocr_engine.extract_text_batch.side_effect = lambda images: [
+            OCRResult(text="", words=[], confidence=0.0) for _ in images
+        ]
+        
+        with patch('app.document_parser.fitz.open', wraps=fitz.open) as mock_open, \
+             patch.object(converter, '_convert_with_pymupdf_text_extraction', return_value=False), \
+             patch.object(converter, '_convert_with_pdf2docx', return_value=False):
+            result = converter.convert(pdf_path, str(tmp_path / "scan.docx"))
+        
+        assert result["success"] is True
+        assert result["pages_processed"] == 3
+        mock_open.assert_called_once_with(pdf_path)
+    
+    def test_ocr_page_stream_runs_batches_off_the_calling_thread(self):
+        """Test that OCR overlaps the caller on one background thread."""
+        import threading
+        
+        converter = PDFConverter()
+        converter.ocr_engine = Mock()
+        threads = []
+        
+        def extract_text_batch(images):
+            threads.append(threading.current_thread())
+            return [image.size for image in images]
+        converter.ocr_engine.extract_text_batch.side_effect = extract_text_batch
+        page_images = [
+            PageImage(page_number=i + 1, image=Image.new('L', (10 + i, 10)), width=10 + i, height=10, dpi=200)
+            for i in range(PDFConverter.OCR_BATCH_PAGES * 2)
+        ]
+        
+        pages = list(converter._ocr_page_stream(iter(page_images)))
+        
+        assert [job() for _, job in pages] == [page.image.size for page in page_images]
+        assert len(threads) == 2
+        assert threads[0] is threads[1]
+        assert threads[0] is not threading.current_thread()
+    
+    def test_ocr_page_stream_reports_only_failing_page_of_batch(self):
+        """Test that a failed batch is retried page by page."""
+        converter = PDFConverter()
+        converter.ocr_engine = Mock()
+        converter.ocr_engine.extract_text_batch.side_effect = OCRProcessingError("batch failed")
+        
+        def extract_text(image):
+            if image.size == (11, 10):
+                raise OCRProcessingError("bad page")
+            return image.size
+        converter.ocr_engine.extract_text.side_effect = extract_text
+        page_images = [
+            PageImage(page_number=i + 1, image=Image.new('L', (10 + i, 10)), width=10 + i, height=10, dpi=200)
+            for i in range(3)
+        ]
+        
+        jobs = [job for _, job in converter._ocr_page_stream(iter(page_images))]
+        
+        assert jobs[0]() == (10, 10)
+        with pytest.raises(OCRProcessingError, match="bad page"):
+            jobs[1]()
+        assert jobs[2]() == (12, 10)
+    
+    @patch('app.pdf_converter.Converter')
+    def test_run_pdf2docx_splits_long_documents(self, mock_converter_class):
+        """Test that long documents use pdf2docx's multi-process mode."""
+        converter = PDFConverter()
+        cv = Mock()
+        
+        with patch('app.pdf_converter.os.cpu_count', return_value=4):
+            converter._run_pdf2docx(cv, "/fake/test.docx", 10)
+        
+        cv.convert.assert_called_once_with(
+            "/fake/test.docx", start=0, end=None, multi_processing=True, cpu_count=4
+        )
+        cv.close.assert_called_once()
+        mock_converter_class.assert_not_called()
+    
+    @patch('app.pdf_converter.Converter')
+    def test_run_pdf2docx_in_process_inside_daemonic_worker(self, mock_converter_class):
+        """Test that a daemonic worker converts in-process without trying processes."""
+        converter = PDFConverter()
+        cv = Mock()
+        
+        with patch('app.pdf_converter.os.cpu_count', return_value=4), \
+             patch('app.pdf_converter.multiprocessing.current_process', return_value=Mock(daemon=True)):
+            converter._run_pdf2docx(cv, "/fake/test.docx", 10)
+        
+        cv.convert.assert_called_once_with("/fake/test.docx", start=0, end=None)
+        cv.close.assert_called_once()
+        mock_converter_class.assert_not_called()
+    
+    @patch('app.pdf_converter.Converter')
+    def test_run_pdf2docx_short_documents_in_process(self, mock_converter_class):
+        """Test that short documents are converted in a single process."""
+        converter = PDFConverter()
+        cv = Mock()
+        
+        converter._run_pdf2docx(cv, "/fake/test.docx", 2)
+        
+        cv.convert.assert_called_once_with("/fake/test.docx", start=0, end=None)
+    
+    def test_run_pdf2docx_reports_each_parsed_page(self):
+        """Test that in-process conversions report progress as pages are parsed."""
+        converter = PDFConverter()
+        pages = [Mock(skip_parsing=False), Mock(skip_parsing=True), Mock(skip_parsing=False)]
+        progress = Mock()
+        cv = Mock(pages=pages)
+        # Stand-in for pdf2docx: convert() parses every page not skipped
+        cv.parse_pages.side_effect = lambda **kwargs: [
+            page.parse(**kwargs) for page in pages if not page.skip_parsing
+        ]
+        cv.convert.side_effect = lambda *args, **kwargs: cv.parse_pages(debug=False)
+        
+        converter._run_pdf2docx(cv, "/fake/test.docx", 3, progress)
+        
+        assert progress.call_args_list == [call(1, 2), call(2, 2)]
+        pages[1].parse.assert_not_called()
@@ -4,7 +4,7 @@ Unit tests for Redis client configuration and connection pooling.
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from app.redis_client import RedisClient, get_redis_client
+from app.redis_client import RedisClient, get_redis_client, _keepalive_options
 from app.config import Config, TestingConfig
 
 
@@ -25,7 +25,7 @@ class TestRedisClient:
         """Test that initialize creates a connection pool with correct settings."""
         config = TestingConfig()
         
-        with patch('app.redis_client.ConnectionPool') as mock_pool_class, \
+        with patch('app.redis_client.BlockingConnectionPool') as mock_pool_class, \
              patch('app.redis_client.redis.Redis') as mock_redis_class:
             
             mock_pool = Mock()
@@ -35,16 +35,19 @@ class TestRedisClient:
             
             RedisClient.initialize(config)
             
-            # Verify ConnectionPool was created with correct parameters
+            # Verify BlockingConnectionPool was created with correct parameters
             mock_pool_class.assert_called_once_with(
                 host=config.REDIS_HOST,
                 port=config.REDIS_PORT,
                 db=config.REDIS_DB,
                 password=config.REDIS_PASSWORD,
                 max_connections=config.REDIS_MAX_CONNECTIONS,
+                timeout=config.REDIS_SOCKET_TIMEOUT,
                 socket_timeout=config.REDIS_SOCKET_TIMEOUT,
                 socket_connect_timeout=config.REDIS_SOCKET_CONNECT_TIMEOUT,
                 socket_keepalive=config.REDIS_SOCKET_KEEPALIVE,
+                socket_keepalive_options=_keepalive_options(config),
+                health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
                 retry_on_timeout=config.REDIS_RETRY_ON_TIMEOUT,
                 decode_responses=True
             )
@@ -59,7 +62,7 @@ class TestRedisClient:
         """Test that calling initialize multiple times doesn't recreate the pool."""
         config = TestingConfig()
         
-        with patch('app.redis_client.ConnectionPool') as mock_pool_class, \
+        with patch('app.redis_client.BlockingConnectionPool') as mock_pool_class, \
              patch('app.redis_client.redis.Redis'):
             
             mock_pool = Mock()
@@ -77,11 +80,35 @@ class TestRedisClient:
             # ConnectionPool should only be called once
             assert mock_pool_class.call_count == 1
     
+    def test_keepalive_options_use_configured_idle(self):
+        """Test that keep-alive options honour REDIS_KEEPALIVE_IDLE."""
+        import socket
+        
+        options = _keepalive_options(TestingConfig())
+        
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            assert options[socket.TCP_KEEPIDLE] == TestingConfig.REDIS_KEEPALIVE_IDLE
+        assert all(value >= 1 for value in options.values())
+    
+    def test_keepalive_options_probe_schedule(self):
+        """Test that dead peers are detected a few probes after the idle period."""
+        import socket
+        
+        class ShortIdleConfig(TestingConfig):
+            REDIS_KEEPALIVE_IDLE = 60
+        
+        options = _keepalive_options(ShortIdleConfig())
+        
+        if hasattr(socket, 'TCP_KEEPINTVL'):
+            assert options[socket.TCP_KEEPINTVL] == 10
+        if hasattr(socket, 'TCP_KEEPCNT'):
+            assert options[socket.TCP_KEEPCNT] == 3
+    
     def test_get_client_returns_client(self):
         """Test that get_client returns the Redis client."""
         config = TestingConfig()
         
-        with patch('app.redis_client.ConnectionPool'), \
+        with patch('app.redis_client.BlockingConnectionPool'), \
              patch('app.redis_client.redis.Redis') as mock_redis_class:
             
             mock_client = Mock()
@@ -101,7 +128,7 @@ class TestRedisClient:
         """Test that ping returns True when connection is successful."""
         config = TestingConfig()
         
-        with patch('app.redis_client.ConnectionPool'), \
+        with patch('app.redis_client.BlockingConnectionPool'), \
              patch('app.redis_client.redis.Redis') as mock_redis_class:
             
             mock_client = Mock()
@@ -118,7 +145,7 @@ class TestRedisClient:
         """Test that ping returns False when connection fails."""
         config = TestingConfig()
         
-        with patch('app.redis_client.ConnectionPool'), \
+        with patch('app.redis_client.BlockingConnectionPool'), \
              patch('app.redis_client.redis.Redis') as mock_redis_class:
             
             mock_client = Mock()
@@ -134,7 +161,7 @@ class TestRedisClient:
         """Test that close properly disconnects the connection pool."""
         config = TestingConfig()
         
-        with patch('app.redis_client.ConnectionPool') as mock_pool_class, \
+        with patch('app.redis_client.BlockingConnectionPool') as mock_pool_class, \
              patch('app.redis_client.redis.Redis'):
             
             mock_pool = Mock()
@@ -147,11 +174,43 @@ class TestRedisClient:
             assert RedisClient._pool is None
             assert RedisClient._client is None
     
+    def test_initialize_enables_client_side_cache(self):
+        """Test that a cache size switches the pool to RESP3 with a cache."""
+        config = TestingConfig()
+        config.REDIS_CLIENT_CACHE_SIZE = 1024
+        
+        with patch('app.redis_client.BlockingConnectionPool') as mock_pool_class, \
+             patch('app.redis_client.redis.Redis'), \
+             patch('redis.cache.CacheConfig') as mock_cache_config:
+            
+            RedisClient.initialize(config)
+            
+            kwargs = mock_pool_class.call_args.kwargs
+            assert kwargs['protocol'] == 3
+            assert kwargs['cache_config'] is mock_cache_config.return_value
+            mock_cache_config.assert_called_once_with(max_size=1024)
+    
+    def test_pipeline_uses_shared_client(self):
+        """Test that pipeline() builds a non-transactional pipeline by default."""
+        config = TestingConfig()
+        
+        with patch('app.redis_client.BlockingConnectionPool'), \
+             patch('app.redis_client.redis.Redis') as mock_redis_class:
+            
+            mock_client = Mock()
+            mock_redis_class.return_value = mock_client
+            
+            RedisClient.initialize(config)
+            pipe = RedisClient.pipeline()
+            
+            mock_client.pipeline.assert_called_once_with(transaction=False)
+            assert pipe is mock_client.pipeline.return_value
+    
     def test_get_redis_client_convenience_function(self):
         """Test the convenience function get_redis_client."""
         config = TestingConfig()
         
-        with patch('app.redis_client.ConnectionPool'), \
+        with patch('app.redis_client.BlockingConnectionPool'), \
              patch('app.redis_client.redis.Redis') as mock_redis_class:
             
             mock_client = Mock()
@@ -190,6 +249,15 @@ class TestConfig:
         url = config.get_redis_url()
         assert url == 'redis://:secret123@localhost:6379/0'
     
+    def test_celery_urls_are_plain_class_strings(self):
+        """Test that Celery URLs are real strings built from each class's settings."""
+        from app.config import TestingConfig
+        
+        assert isinstance(Config.CELERY_BROKER_URL, str)
+        assert Config.CELERY_BROKER_URL == Config.get_redis_url()
+        assert TestingConfig.CELERY_BROKER_URL.endswith('/1')
+        assert TestingConfig.CELERY_RESULT_BACKEND == TestingConfig.CELERY_BROKER_URL
+    
     def test_default_configuration_values(self):
         """Test that default configuration values are set correctly."""
         config = Config()
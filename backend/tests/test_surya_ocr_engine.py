@@ -160,6 +160,81 @@ class TestExtractTextMocked:
             assert result.text == ""
             assert len(result.words) == 0
             assert result.confidence == 0.0
+    
+    def test_extract_text_batch_runs_surya_once(self, surya_engine, simple_text_image, blank_image):
+        """Test that a batch of pages is recognized with one run_ocr call."""
+        surya_engine._initialized = True
+        surya_engine._det_model = Mock()
+        surya_engine._det_processor = Mock()
+        surya_engine._rec_model = Mock()
+        surya_engine._rec_processor = Mock()
+        
+        line = Mock(text=" Hello World ", bbox=[10, 20, 110, 40], confidence=0.9)
+        predictions = [Mock(text_lines=[line]), Mock(text_lines=[])]
+        
+        with patch('surya.ocr.run_ocr', return_value=predictions) as mock_run_ocr:
+            results = surya_engine.extract_text_batch([simple_text_image, blank_image])
+        
+        mock_run_ocr.assert_called_once()
+        assert len(mock_run_ocr.call_args[0][0]) == 2
+        assert mock_run_ocr.call_args[0][1] == [["en"], ["en"]]
+        assert [result.text for result in results] == ["Hello World", ""]
+        assert [word.x for word in results[0].words] == [10, 60]
+        assert results[1].confidence == 0.0
+    
+    def test_size_buckets_group_similar_pages(self, surya_engine):
+        """Test that pages are bucketed by size, smallest first, up to the batch limit."""
+        sizes = [(1000, 800), (3000, 2000), (800, 1100), (2900, 2000), (1050, 700)]
+        images = [Image.new('RGB', size) for size in sizes]
+        
+        assert surya_engine._size_buckets(images) == [[0, 4, 2], [3, 1]]
+        
+        with patch.object(SuryaOCREngine, 'BUCKET_MAX_BATCH', 2):
+            assert surya_engine._size_buckets(images) == [[0, 4], [2], [3, 1]]
+    
+    def test_extract_text_batch_keeps_page_order_across_buckets(self, surya_engine):
+        """Test that results from different size buckets are returned in page order."""
+        surya_engine._initialized = True
+        surya_engine._det_model = Mock()
+        surya_engine._det_processor = Mock()
+        surya_engine._rec_model = Mock()
+        surya_engine._rec_processor = Mock()
+        
+        def run_ocr(images, langs, *models):
+            return [
+                Mock(text_lines=[Mock(text=str(image.width), bbox=[0, 0, 10, 10], confidence=0.9)])
+                for image in images
+            ]
+        
+        images = [Image.new('RGB', (width, 100)) for width in (2000, 500, 2100, 510)]
+        with patch('surya.ocr.run_ocr', side_effect=run_ocr) as mock_run_ocr:
+            results = surya_engine.extract_text_batch(images)
+        
+        assert mock_run_ocr.call_count == 2
+        assert [result.text for result in results] == ["2000", "500", "2100", "510"]
+    
+    def test_estimate_word_boxes_split_each_line(self, surya_engine):
+        """Test that each line's width is shared evenly between its words."""
+        lines = [
+            (["one", "two", "three"], [0, 10, 90, 30], 0.8),
+            (["four"], [5.5, 40.2, 50.9, 60.7], 0.6),
+        ]
+        
+        words = surya_engine._estimate_word_boxes(lines)
+        
+        assert words == [
+            WordBox("one", 0, 10, 30, 20, 0.8),
+            WordBox("two", 30, 10, 30, 20, 0.8),
+            WordBox("three", 60, 10, 30, 20, 0.8),
+            WordBox("four", 5, 40, 45, 20, 0.6),
+        ]
+        assert surya_engine._estimate_word_boxes([]) == []
+    
+    def test_extract_text_batch_empty(self, surya_engine):
+        """Test that an empty batch doesn't load or run Surya."""
+        with patch.object(surya_engine, '_ensure_initialized') as mock_init:
+            assert surya_engine.extract_text_batch([]) == []
+        mock_init.assert_not_called()
 
 
 class TestErrorHandling:
@@ -244,3 +319,15 @@ class TestModelCaching:
         assert surya_engine._rec_model is rec_model_ref
         assert surya_engine._rec_processor is rec_proc_ref
         assert surya_engine._initialized is True
+    
+    def test_models_are_shared_across_engines(self):
+        """Test that each model is loaded once per process, not per engine."""
+        from app import surya_ocr_engine
+        
+        loader = Mock(side_effect=lambda: object())
+        with patch.dict(surya_ocr_engine._MODEL_CACHE, clear=True):
+            first = surya_ocr_engine._cached_model('detection_model', loader)
+            second = surya_ocr_engine._cached_model('detection_model', loader)
+        
+        assert first is second
+        loader.assert_called_once()
@@ -0,0 +1,121 @@
+"""
+Unit tests for Text Processor component.
+
+Tests the TextProcessor spacing heuristics, common word fixes and
+Word document post-processing.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from docx import Document
+from app.text_processor import TextProcessor
+
+
+@pytest.fixture
+def text_processor():
+    """Create a TextProcessor instance for testing."""
+    return TextProcessor()
+
+
+class TestAddSpacesToText:
+    """Test word boundary heuristics."""
+    
+    def test_empty_text(self, text_processor):
+        """Test that empty text is returned unchanged."""
+        assert text_processor.add_spaces_to_text("") == ""
+    
+    def test_splits_joined_words(self, text_processor):
+        """Test camelCase, letter/digit, acronym and punctuation boundaries."""
+        result = text_processor.add_spaces_to_text("helloWorld page12of3 RFPis due.Next")
+        
+        assert result == "hello World page 12 of 3 RFP is due. Next"
+    
+    def test_common_fixes_ignore_case(self, text_processor):
+        """Test that common joined words are fixed in any case."""
+        result = text_processor.add_spaces_to_text("go tothe store, Itis fine ABOUTTHE end")
+        
+        assert result == "go to the store, it is fine about the end"
+    
+    def test_common_fixes_with_unicode_case_matches(self, text_processor):
+        """Test that non-ASCII case-insensitive matches are fixed too."""
+        assert text_processor.add_spaces_to_text("ıtis and tothe") == "it is and to the"
+    
+    def test_common_fixes_match_whole_words_only(self, text_processor):
+        """Test that fixes don't split words containing a joined pair."""
+        assert text_processor.add_spaces_to_text("inthemiddle") == "inthemiddle"
+    
+    def test_non_ascii_digits_are_not_split(self, text_processor):
+        """Test that only ASCII digits count as numbers on every scanner."""
+        text = "page\u0661\u0662 and x\uff11\uff12 but page12 "
+        expected = "page\u0661\u0662 and x\uff11\uff12 but page 12 "
+        
+        with patch('app.text_processor._HYPERSCAN_DATABASE', None):
+            assert text_processor.add_spaces_to_text(text) == expected
+        assert text_processor.add_spaces_to_text(text) == expected
+        assert text_processor.add_spaces_to_text(text * 20) == expected * 20
+    
+    def test_hyperscan_matches_regex_fallback(self, text_processor):
+        """Test that the Hyperscan scanner inserts the same spaces as re."""
+        pytest.importorskip("hyperscan")
+        text = "aBc1d2E RFPis ABCdEf.g,h 3rd café2go"
+        
+        with patch('app.text_processor._HYPERSCAN_DATABASE', None):
+            expected = text_processor.add_spaces_to_text(text)
+        
+        assert text_processor.add_spaces_to_text(text) == expected
+    
+    def test_long_text_vector_scan_matches_regex(self, text_processor):
+        """Test that long texts get the same spaces from the NumPy scanner."""
+        text = "aBc1d2E RFPis ABCdEf.g,h 3rd café2go " * 20
+        
+        with patch('app.text_processor._VECTOR_SCAN_MIN_LENGTH', len(text) + 1), \
+             patch('app.text_processor._HYPERSCAN_DATABASE', None):
+            expected = text_processor.add_spaces_to_text(text)
+        
+        assert text_processor.add_spaces_to_text(text) == expected
+    
+    def test_re2_precheck_skips_text_without_fixes(self, text_processor):
+        """Test that the RE2 pre-check doesn't change which fixes apply."""
+        pytest.importorskip("re2")
+        
+        for text in ("nothing to fix here", "go tothe store", "Itis café tothe end"):
+            with patch('app.text_processor._COMMON_FIXES_RE2', None):
+                expected = text_processor.add_spaces_to_text(text)
+            assert text_processor.add_spaces_to_text(text) == expected
+    
+    def test_clean_text_is_returned_unchanged(self, text_processor):
+        """Test that text without boundaries or joined words skips the fixes."""
+        text = "Already spaced text, with 12 numbers and a dot."
+        
+        with patch('app.text_processor._COMMON_FIXES_RE') as mock_fixes:
+            assert text_processor.add_spaces_to_text(text) is text
+        
+        mock_fixes.sub.assert_not_called()
+    
+    def test_lowercase_precheck_without_re2(self, text_processor):
+        """Test that the plain re pre-check still finds joined words in any case."""
+        with patch('app.text_processor._COMMON_FIXES_RE2', None):
+            assert text_processor.add_spaces_to_text("Itis ABOUTTHE end") == "it is about the end"
+
+
+class TestFixWordDocument:
+    """Test fixing spacing in saved Word documents."""
+    
+    def test_fixes_paragraphs_and_tables_keeping_runs(self, text_processor, tmp_path):
+        """Test that run text is fixed in place without dropping formatting."""
+        doc_path = str(tmp_path / "joined.docx")
+        doc = Document()
+        paragraph = doc.add_paragraph()
+        paragraph.add_run("helloWorld").bold = True
+        paragraph.add_run(" tothe end")
+        doc.add_table(rows=1, cols=1).cell(0, 0).text = "page12"
+        doc.save(doc_path)
+        
+        text_processor.fix_word_document(doc_path)
+        
+        fixed = Document(doc_path)
+        runs = fixed.paragraphs[0].runs
+        assert [run.text for run in runs] == ["hello World", " to the end"]
+        assert runs[0].bold is True
+        assert fixed.tables[0].cell(0, 0).text == "page 12"